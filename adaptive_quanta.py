@@ -0,0 +1,96 @@
+"""
+    Online adaptive tuning of the queue quanta and task quanta of the MLFQ and SVR2 schedulers.
+
+    The right quanta depend on the distribution of the CPU bursts, which drifts over time.
+    Instead of fixed `queue_quanta` and `task_quantum`, AdaptiveQuanta keeps a streaming
+    estimate per queue and retunes the quanta while the scheduler runs.
+
+    - Task quantum: the classic rule of thumb is that most CPU bursts (e.g., 80%) should finish
+    within one quantum, which keeps the number of context switches low without letting long tasks
+    hold the CPU. Each queue tracks the `target_fraction` quantile of its CPU bursts with a
+    stochastic approximation in O(1) per slice: when a burst finishes within the quantum,
+    the quantum shrinks a little; when the task is preempted by the quantum, it grows.
+    The steps are balanced so the quantum settles where `target_fraction` of the bursts fit.
+    Slices cut short by the queue quantum tell nothing about the burst and are ignored.
+
+    - Queue quanta: each queue keeps its initial ratio of queue quantum to task quantum,
+    or, if `target_response_time` is given, the queue quanta are scaled so that a full rotation
+    over the queues takes about that long (this bounds the time a task waits for its queue).
+
+    An exponential average of the slice lengths per queue is also kept, for reporting.
+"""
+
+
+class AdaptiveQuanta:
+
+    def __init__(self, queue_quanta, task_quantum, target_fraction=0.8, step=0.1,
+                 min_quantum=1, max_quantum=1000, target_response_time=None, alpha=0.125):
+        """
+        Initialize the tuner with the starting quanta.
+
+        Args:
+            queue_quanta (list): The initial time quanta of each queue
+            task_quantum (int): The initial maximum time of a task per turn (the same for every queue)
+            target_fraction (float, optional): Fraction of CPU bursts that should finish within one task quantum.
+                Defaults to 0.8.
+            step (float, optional): Relative step of the quantile estimate. Defaults to 0.1.
+            min_quantum (int, optional): The smallest task quantum. Defaults to 1.
+            max_quantum (int, optional): The largest task quantum. Defaults to 1000.
+            target_response_time (int, optional): Target duration of a rotation over all the queues.
+                Defaults to None (keep the initial ratio of queue quantum to task quantum).
+            alpha (float, optional): Weight of the last slice in the exponential average. Defaults to 0.125.
+        """
+        self.queue_quanta = list(queue_quanta)
+        self.task_quanta = [task_quantum] * len(queue_quanta)
+        self.estimates = [float(task_quantum)] * len(queue_quanta)  # Quantile estimates per queue
+        self.ratios = [quantum / task_quantum for quantum in queue_quanta]
+        self.average_slice = [float(task_quantum)] * len(queue_quanta)
+        self.target_fraction = target_fraction
+        self.step = step
+        self.min_quantum = min_quantum
+        self.max_quantum = max_quantum
+        self.target_response_time = target_response_time
+        self.alpha = alpha
+
+    def observe(self, queue_index, execution_time, task_quantum, burst_done):
+        """
+        Update the estimates of a queue with a slice that just ran. O(1), plus O(queues) when a quantum changes.
+
+        Parameters:
+            queue_index (int): The queue of the task
+            execution_time (int): The length of the slice
+            task_quantum (int): The task quantum in effect for the slice
+            burst_done (bool): True if the CPU burst of the task finished in this slice
+        """
+        self.average_slice[queue_index] += self.alpha * (execution_time - self.average_slice[queue_index])
+        if burst_done:
+            fit = 1.0  # The burst was no longer than the quantum
+        elif execution_time >= task_quantum:
+            fit = 0.0  # Preempted by the quantum: the burst was longer
+        else:
+            return  # Cut short by the queue quantum
+
+        estimate = self.estimates[queue_index] * (1 + self.step * (self.target_fraction - fit))
+        estimate = min(self.max_quantum, max(self.min_quantum, estimate))
+        self.estimates[queue_index] = estimate
+
+        quantum = max(self.min_quantum, round(estimate))
+        if quantum != self.task_quanta[queue_index]:
+            self.task_quanta[queue_index] = quantum
+            self._retune_queue_quanta()
+
+    def _retune_queue_quanta(self):
+        quanta = [max(task_quantum, round(ratio * task_quantum))
+                  for task_quantum, ratio in zip(self.task_quanta, self.ratios)]
+        if self.target_response_time is not None:
+            scale = self.target_response_time / sum(quanta)
+            quanta = [max(task_quantum, round(quantum * scale)) for task_quantum, quantum in zip(self.task_quanta, quanta)]
+        self.queue_quanta[:] = quanta  # In place: the scheduler holds a reference to this list
+
+    def report(self):
+        """
+        Print the current quanta and burst estimates of each queue.
+        """
+        for i, (queue_quantum, task_quantum) in enumerate(zip(self.queue_quanta, self.task_quanta)):
+            print(f"Queue {i}: queue quantum {queue_quantum}, task quantum {task_quantum}, "
+                  f"average slice {self.average_slice[i]:.1f} units")
@@ -0,0 +1,174 @@
+"""
+    Admission control for bounded queues.
+
+    Without limits, every submitted task enters its queue, and under overload the backlog
+    (and the latency of every band) grows without bound. An AdmissionControl gives each queue
+    a capacity and decides what happens to a task submitted to a full queue:
+
+    - "reject": the new task is refused.
+    - "shed": the lowest-priority task of the queue is dropped to make room, if its priority is lower
+    than the priority of the new task; otherwise the new task is refused.
+    - "spill": the new task goes to the next lower-priority queue with room; if every lower queue
+    is full, it is refused.
+
+    Refused and shed tasks are cancelled (`task.cancelled = True`, with a cascade to their dependants
+    when a CancellationIndex is given), so the metrics count them and the schedulers never run them.
+
+    - Tasks enter through `submit`: `create_queues` and `create_priority_queues` take an `admission`
+    argument for the initial tasks, and the timer wheel (`schedule_arrivals`) for the tasks
+    that arrive online. `submit` returns the queue of the task, or None if it was refused:
+    this is the backpressure signal of a producer, and `headroom` tells how many tasks a queue
+    still accepts before submitting.
+
+    - Only new tasks are checked: the moves of tasks that were already admitted (demotions, returns
+    from I/O, aging) are never refused.
+
+    - While a queue is below its capacity, `submit` costs O(1) plus the push. At capacity, the queue
+    is scanned once (O(capacity)) to skip the cancelled tasks that have not been popped yet,
+    and to find the task to shed.
+"""
+import heapq
+import math
+
+from tasks import enqueue
+from tasks import find_queue
+
+POLICIES = ("reject", "shed", "spill")
+
+
+class AdmissionControl:
+
+    def __init__(self, priority_ranges, capacities, policy="reject", cancellations=None):
+        """
+        Initialize the admission control.
+
+        Args:
+            priority_ranges (list): list of tuples of (low, high) priority ranges, used to route the tasks
+            capacities (list): The maximum number of tasks of each queue (None for no limit)
+            policy (str, optional): "reject", "shed" or "spill". Defaults to "reject".
+            cancellations (CancellationIndex, optional): Cascades the cancellation of a refused or shed task
+                to its dependants. Defaults to None (only the task is cancelled).
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown admission policy: {policy}")
+        if len(capacities) != len(priority_ranges):
+            raise ValueError(f"{len(capacities)} capacities given for {len(priority_ranges)} queues")
+        self.priority_ranges = priority_ranges
+        self.capacities = [math.inf if capacity is None else capacity for capacity in capacities]
+        self.policy = policy
+        self.cancellations = cancellations
+        self.admitted = 0
+        self.rejected = 0
+        self.shed = 0
+        self.spilled = 0
+
+    def headroom(self, queues, level):
+        """
+        Return the number of tasks a queue accepts before it is full (math.inf without limit).
+
+        Parameters:
+            queues (list): The scheduler queues
+            level (int): The index of the queue
+
+        Returns:
+            int or float: The free slots of the queue.
+        """
+        capacity = self.capacities[level]
+        if len(queues[level]) < capacity:
+            return capacity - len(queues[level])
+        return max(0, capacity - sum(1 for task in queues[level] if not task.cancelled))
+
+    def submit(self, queues, task):
+        """
+        Admit a task into the queue of its priority range, or apply the policy if the queue is full.
+
+        Parameters:
+            queues (list): The scheduler queues (deques, heaps or AgingQueues)
+            task (Task): The submitted task
+
+        Returns:
+            int or None: The queue the task entered, or None if it was refused
+            (or if its priority is outside every range).
+        """
+        level = find_queue(task, self.priority_ranges)
+        if level is None:
+            return None
+        if self.headroom(queues, level) > 0:
+            return self._admit(queues, level, task)
+
+        if self.policy == "spill":
+            for lower in range(level - 1, -1, -1):
+                if self.headroom(queues, lower) > 0:
+                    self.spilled += 1
+                    print(f"Task {task.name} spilled from Queue {level} to Queue {lower}")
+                    return self._admit(queues, lower, task)
+        elif self.policy == "shed":
+            victim = min((queued for queued in queues[level] if not queued.cancelled),
+                         key=lambda queued: queued.priority, default=None)
+            if victim is not None and victim.priority < task.priority:
+                remove(queues[level], victim)
+                self.shed += 1
+                print(f"Task {victim.name} (Queue {level}) shed for Task {task.name}")
+                self._drop(victim)
+                return self._admit(queues, level, task)
+
+        self.rejected += 1
+        print(f"Task {task.name} rejected: Queue {level} is full")
+        self._drop(task)
+        return None
+
+    def _admit(self, queues, level, task):
+        task.admitted_queue = level  # The queue it entered, after a spill too
+        enqueue(queues[level], task)
+        self.admitted += 1
+        return level
+
+    def _drop(self, task):
+        if self.cancellations is not None and task.name in self.cancellations.task_map:
+            self.cancellations.cancel(task.name)  # Its dependants fail too
+        task.cancelled = True
+
+    def report(self):
+        """
+        Print the number of admitted, spilled, shed and rejected tasks.
+        """
+        print(f"Admission ({self.policy}): {self.admitted} admitted ({self.spilled} spilled), "
+              f"{self.shed} shed, {self.rejected} rejected")
+
+
+def remove(queue, task):
+    """
+    Remove a task from a deque, a heap or an AgingQueue. O(n).
+
+    Parameters:
+        queue: The queue holding the task
+        task (Task): The task to remove
+    """
+    queue.remove(task)
+    if isinstance(queue, list):
+        heapq.heapify(queue)  # Restore the heap after removing from the middle
+
+
+if __name__ == "__main__":
+    from multi_queue_round_robin import multi_queue_round_robin_scheduler
+    from tasks import Task
+    from tasks import create_queues
+    from timer_wheel import schedule_arrivals
+
+    # Example: a burst of high-priority tasks arrives at time 5; Queue 1 holds at most 2 tasks, Queue 0 at most 2
+    tasks = [
+        Task("Task1", priority=2, burst_time=10),
+        Task("Task2", priority=5, burst_time=12),
+        Task("Task3", priority=6, burst_time=6, arrival_time=5),
+        Task("Task4", priority=5, burst_time=6, arrival_time=5),
+        Task("Task5", priority=4, burst_time=6, arrival_time=5),
+        Task("Task6", priority=4, burst_time=6, arrival_time=5),
+    ]
+    priority_ranges = [(1, 3), (4, 6)]
+    admission = AdmissionControl(priority_ranges, capacities=[2, 2], policy="spill")
+
+    queues = create_queues([task for task in tasks if task.arrival_time == 0], priority_ranges, admission=admission)
+    arrivals = schedule_arrivals([task for task in tasks if task.arrival_time > 0], priority_ranges,
+                                 admission=admission)
+    multi_queue_round_robin_scheduler(queues, [6, 8], 4, arrivals=arrivals)
+    admission.report()
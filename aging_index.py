@@ -0,0 +1,221 @@
+"""
+    Aging without scanning the queues, and re-bucketing of aged tasks across the priority ranges.
+
+    The SVR2 schedulers age the queued tasks after every queue visit (a "round"): the waiting time
+    of each task grows by one, and when it reaches `aging_threshold` the priority of the task grows
+    by `aging_increment`. The reference `aging` (svr2_mlfq.py) scans every queue, in O(n) per round,
+    and restores the order of the heaps whose priorities it raised in place.
+
+    - A task waiting in the queues ages every `aging_threshold` rounds, at the rounds congruent to
+    its "phase". Each AgingQueue keeps one heap per phase. All the tasks of a heap age together,
+    so their order does not change and the heap stays valid; after a round only the heaps
+    of the phase of that round are touched, and no sift is needed.
+
+    - The waiting time of a task is derived from its phase when it leaves a queue, or before
+    a checkpoint (`sync`), and its phase from its waiting time when it enters a queue.
+
+    - A queue pops the first task among the tops of its phase heaps, so it serves its tasks
+    in the same order as a single heap.
+
+    - With `priority_ranges`, the aged tasks whose priority now falls in the range of a higher
+    queue are at the top of their heap: they are popped and pushed into that queue, in O(log n) each.
+    Starved tasks therefore break through the queue hierarchy up to the highest-priority queue.
+    Aging never demotes a task.
+"""
+import heapq
+
+from tasks import find_queue
+
+
+class AgingQueue:
+
+    def __init__(self, tasks, level, index):
+        """
+        Build a queue from tasks (e.g., a heap from `create_priority_queues`), split by aging phase.
+
+        Use `push` and `pop` instead of the heapq functions.
+
+        Args:
+            tasks (list): The tasks
+            level (int): The index of the queue
+            index (AgingIndex): The index that tracks the rounds
+        """
+        self.level = level
+        self.index = index
+        self.phases = {}  # phase -> heap of the tasks that age at the rounds of that phase
+        for task in tasks:
+            self.phases.setdefault(index.phase_of(task), []).append(task)
+        for heap in self.phases.values():
+            if not _is_heap(heap):  # The heaps saved by a checkpoint keep their layout (heapify reorders ties)
+                heapq.heapify(heap)
+        self.count = len(tasks)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        # Phase heaps in the order they age next, so a saved queue is rebuilt with the same heaps
+        for phase in sorted(self.phases, key=self.index.rounds_until):
+            yield from self.phases[phase]
+
+    def push(self, task):
+        """
+        Add a task. O(log n).
+
+        Parameters:
+            task (Task): The task to add
+        """
+        heapq.heappush(self.phases.setdefault(self.index.phase_of(task), []), task)
+        self.count += 1
+
+    def pop(self):
+        """
+        Remove and return the first task. O(log n + number of phases).
+
+        Ties between the tops of the phase heaps go to the phase that ages first.
+
+        Returns:
+            Task: The first task.
+        """
+        best = None
+        for phase, heap in self.phases.items():
+            if best is None or heap[0] < best_heap[0] or (
+                    not best_heap[0] < heap[0] and self.index.rounds_until(phase) < self.index.rounds_until(best)):
+                best, best_heap = phase, heap
+        task = heapq.heappop(best_heap)
+        if not best_heap:
+            del self.phases[best]
+        self.count -= 1
+        task.waiting_time = self.index.waiting_time(best)
+        return task
+
+    def remove(self, task):
+        """
+        Remove a task from the queue (e.g., shed by the admission control). O(n).
+
+        Parameters:
+            task (Task): The task to remove
+        """
+        for phase, heap in self.phases.items():
+            if task in heap:
+                heap.remove(task)
+                if heap:
+                    heapq.heapify(heap)
+                else:
+                    del self.phases[phase]
+                self.count -= 1
+                return
+        raise ValueError(f"Task {task.name} is not in Queue {self.level}")
+
+    def age(self, phase):
+        """
+        Age the tasks of a phase and remove the ones whose priority now belongs to a higher queue.
+
+        Parameters:
+            phase (int): The phase that ages
+
+        Returns:
+            list: The tasks removed from the queue, highest priority first.
+        """
+        heap = self.phases.get(phase)
+        if heap is None:
+            return []
+        for task in heap:
+            task.priority += self.index.aging_increment  # Every task of the heap ages: the heap stays valid
+
+        moved = []
+        while heap and self.index.target_queue(heap[0], self.level) > self.level:  # Highest priorities first
+            moved.append(heapq.heappop(heap))
+        if not heap:
+            del self.phases[phase]
+        self.count -= len(moved)
+        return moved
+
+
+class AgingIndex:
+
+    def __init__(self, queues, aging_threshold, aging_increment, priority_ranges=None):
+        """
+        Turn the queues into AgingQueues (in place).
+
+        Args:
+            queues (list): The scheduler heaps (from `create_priority_queues`); replaced by AgingQueues
+            aging_threshold (int): The number of rounds in a queue after which the priority is incremented
+            aging_increment (int): The amount by which the priority increases
+            priority_ranges (list, optional): The (low, high) priority range of each queue. Defaults to None
+                (aged tasks stay in their queue).
+        """
+        self.aging_threshold = aging_threshold
+        self.aging_increment = aging_increment
+        self.period = max(1, aging_threshold)
+        self.priority_ranges = priority_ranges
+        self.top_priority = max(high for _, high in priority_ranges) if priority_ranges else None
+        self.queues = queues
+        self.round = 0
+        for level, queue in enumerate(queues):
+            queues[level] = AgingQueue(queue, level, self)
+
+    def phase_of(self, task):
+        """
+        Return the phase of a task entering a queue, from its waiting time.
+        """
+        return (self.round + max(1, self.aging_threshold - task.waiting_time)) % self.period
+
+    def rounds_until(self, phase):
+        """
+        Return the number of rounds until a phase ages (1 for the next round).
+        """
+        return (phase - self.round - 1) % self.period + 1
+
+    def waiting_time(self, phase):
+        """
+        Return the waiting time of the tasks of a phase.
+        """
+        return max(0, self.aging_threshold - self.rounds_until(phase))
+
+    def sync(self):
+        """
+        Write the waiting time of every queued task to `task.waiting_time`, e.g., before a checkpoint.
+        """
+        for queue in self.queues:
+            for phase, heap in queue.phases.items():
+                waiting_time = self.waiting_time(phase)
+                for task in heap:
+                    task.waiting_time = waiting_time
+
+    def age(self):
+        """
+        Apply one round of aging, after a queue visit. Only the tasks that age in this round are touched.
+
+        Returns:
+            int: The number of tasks moved to a higher queue.
+        """
+        self.round += 1
+        phase = self.round % self.period
+        moved = 0
+        # Highest queue first: a task moved up has aged already, and must not age again this round
+        for level in range(len(self.queues) - 1, -1, -1):
+            for task in self.queues[level].age(phase):
+                target = self.target_queue(task, level)
+                task.waiting_time = 0
+                self.queues[target].push(task)
+                print(f"Task {task.name} aged to priority {task.priority}: moved from Queue {level} to Queue {target}")
+                moved += 1
+        return moved
+
+    def target_queue(self, task, level):
+        """
+        Return the queue of an aged task: the queue whose range contains its priority
+        (the highest queue past every range), or its current level if that is higher.
+        """
+        if self.priority_ranges is None:
+            return level
+        target = find_queue(task, self.priority_ranges)
+        if target is None:
+            target = len(self.priority_ranges) - 1 if task.priority > self.top_priority else level
+        return max(target, level)
+
+
+def _is_heap(heap):
+    # True if no task comes before its parent
+    return not any(heap[i] < heap[(i - 1) >> 1] for i in range(1, len(heap)))
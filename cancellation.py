@@ -0,0 +1,157 @@
+"""
+    Task cancellation and deadline expiry for the multi-queue schedulers.
+
+    Removing a task from a deque or from a heap requires an O(n) scan
+    (e.g., `queues[current_queue].remove(selected_task)` in the lottery scheduler).
+    Instead, a cancelled task is marked as a tombstone (`task.cancelled = True`) and left
+    where it is. The schedulers drop tombstones lazily, the next time they pop them from
+    a queue, so a cancellation costs O(1) plus the size of its cascade.
+
+    - The CancellationIndex maps task names to tasks and keeps a reverse dependency index
+    (task name -> names of the tasks that depend on it). When a task is cancelled,
+    its dependants (and their dependants) are marked as failed by following this index,
+    without walking the queues.
+
+    - A task group (see task_groups.py) is a node of the reverse index too, as in the TaskIndex:
+    each shard leads to its group, and the group to the tasks that depend on the group name.
+    A group fails when any of its shards fails, so its dependants fail as well.
+
+    - Expiry times (deadlines) are kept in a heap ordered by time.
+    The schedulers call `expire(clock)` after each slice, which cancels every task whose
+    expiry time has passed, in O(log n) per expired task.
+"""
+import heapq
+
+
+class CancellationIndex:
+
+    def __init__(self, queues):
+        """
+        Build the name and reverse dependency indexes for the tasks in the queues.
+
+        Args:
+            queues (list): A list of queues (deques or heaps) of Task objects.
+        """
+        self.task_map = {}    # task name -> task
+        self.dependants = {}  # task (or group) name -> list of names of the tasks (or groups) that depend on it
+        self.groups = set()   # names of the task groups
+        self.expiries = []    # heap of (expiry time, task name)
+        for queue in queues:
+            for task in queue:
+                self.add(task)
+
+    def add(self, task):
+        """
+        Register a task, e.g., when it is submitted after the index was created.
+
+        Parameters:
+            task (Task): The task to register
+        """
+        self.task_map[task.name] = task
+        for dep in task.dependencies:
+            self.dependants.setdefault(dep, []).append(task.name)
+        if task.group is not None:
+            self.groups.add(task.group.name)
+            self.dependants.setdefault(task.name, []).append(task.group.name)  # The group fails with its shard
+
+    def cancel(self, task_name):
+        """
+        Cancel a task and cascade the failure to every task that depends on it.
+
+        Tasks that are already completed or cancelled are left untouched.
+
+        Parameters:
+            task_name (str): The name of the task to cancel
+
+        Returns:
+            list: The names of the tasks that were cancelled or failed by this call.
+        """
+        task = self.task_map[task_name]  # raises KeyError for unknown tasks
+        if task.completed or task.cancelled:
+            return []
+        task.cancelled = True
+        removed = [task_name]
+
+        # Cascade: every (transitive) dependant can never run, so it fails
+        pending = list(self.dependants.get(task_name, []))
+        failed_groups = set()
+        while pending:
+            name = pending.pop()
+            if name in self.groups:  # Not a task: go on to the dependants of the group
+                if name not in failed_groups:
+                    failed_groups.add(name)
+                    pending.extend(self.dependants.get(name, []))
+                continue
+            dependant = self.task_map[name]
+            if dependant.completed or dependant.cancelled:
+                continue
+            dependant.cancelled = True
+            dependant.failed = True
+            removed.append(dependant.name)
+            pending.extend(self.dependants.get(dependant.name, []))
+        return removed
+
+    def expire_at(self, task_name, expiry_time):
+        """
+        Schedule the cancellation of a task at the given (virtual) time.
+
+        Parameters:
+            task_name (str): The name of the task
+            expiry_time (int): The time at which the task expires if it has not completed
+        """
+        heapq.heappush(self.expiries, (expiry_time, task_name))
+
+    def expire(self, clock):
+        """
+        Cancel every task whose expiry time is less than or equal to `clock`.
+
+        Parameters:
+            clock (int): The current (virtual) time
+
+        Returns:
+            list: The names of the tasks that were cancelled or failed by this call.
+        """
+        removed = []
+        while self.expiries and self.expiries[0][0] <= clock:
+            _, task_name = heapq.heappop(self.expiries)
+            removed.extend(self.cancel(task_name))
+        return removed
+
+
+def report_dropped(task, queue_index):
+    """
+    Print why a tombstoned task is being dropped from its queue.
+
+    Parameters:
+        task (Task): The cancelled (or failed) task
+        queue_index (int): The queue from which the task is dropped
+    """
+    if task.failed:
+        print(f"Task {task.name} (Queue {queue_index}) failed due to a cancelled dependency")
+    else:
+        print(f"Task {task.name} (Queue {queue_index}) was cancelled")
+
+
+def drop_cancelled(queue, queue_index):
+    """
+    Remove the tombstones from a deque in a single pass.
+
+    Used by schedulers that scan the whole queue anyway (e.g., the lottery scheduler),
+    instead of popping tasks one at a time.
+
+    Parameters:
+        queue (deque): The queue to clean
+        queue_index (int): The index of the queue (for reporting)
+
+    Returns:
+        deque: The queue without cancelled tasks, preserving their order.
+    """
+    if not any(task.cancelled for task in queue):
+        return queue
+    kept = type(queue)()
+    for task in queue:
+        if task.cancelled:
+            report_dropped(task, queue_index)
+        else:
+            kept.append(task)
+    return kept
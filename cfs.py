@@ -0,0 +1,113 @@
+"""
+    Completely Fair Scheduler (CFS) style scheduling based on virtual runtime.
+
+    Instead of rotating between priority bands with fixed quanta, every task accumulates
+    a virtual runtime (vruntime): the time it ran, scaled down by its weight.
+    The scheduler always runs the task with the smallest vruntime, so each task receives
+    a share of the CPU proportional to its weight, and no task starves.
+
+    - The priority of a task is mapped to a weight. As in Linux, each priority level is
+    worth about 25% more CPU than the level below (priority 0 has weight 1024).
+
+    - The run queue is a heap ordered by vruntime, so picking the next task and
+    reinserting it are O(log n).
+
+    - Instead of static quanta, the time slice of a task is its weighted share of the
+    targeted latency (the period in which every runnable task should run once), but never
+    less than the minimum granularity. When there are too many tasks, the period is stretched
+    to `min_granularity * number of runnable tasks`.
+"""
+import heapq
+
+from tasks import Task
+from tasks import create_queues
+from cancellation import report_dropped
+
+NICE_0_WEIGHT = 1024  # Weight of a task with priority 0
+
+
+def priority_to_weight(priority):
+    """
+    Map a task priority to its CFS weight (higher priority, higher weight).
+
+    Parameters:
+        priority (int): The priority of the task
+
+    Returns:
+        int: The weight of the task
+    """
+    return max(1, round(NICE_0_WEIGHT * 1.25 ** priority))
+
+
+def cfs_scheduler(queues, target_latency=24, min_granularity=3, cancellations=None):
+    """
+    Simulates a CFS-like scheduler.
+
+    All the tasks of the queues are placed in a single run queue ordered by vruntime.
+    The task with the smallest vruntime runs for its time slice (or until it completes),
+    its vruntime increases by `execution_time * NICE_0_WEIGHT / weight`, and it is reinserted.
+
+    Parameters:
+        queues (list): A list of queues of Task objects (e.g., from `create_queues`); the queues are merged.
+        target_latency (int): The period in which every runnable task should run once.
+        min_granularity (int): The minimum time slice of a task.
+        cancellations (CancellationIndex, optional): Index used to cancel or expire tasks while they are queued.
+
+    Returns:
+        None
+    """
+    print("Execution Order:")
+    run_queue = []
+    total_weight = 0
+    for sequence, task in enumerate(task for queue in queues for task in queue):
+        task.weight = priority_to_weight(task.priority)
+        task.vruntime = 0
+        total_weight += task.weight
+        run_queue.append((task.vruntime, sequence, task))  # sequence breaks ties in submission order
+    heapq.heapify(run_queue)
+    sequence = len(run_queue)
+
+    clock = 0  # Elapsed (virtual) time
+    while run_queue:
+        _, _, task = heapq.heappop(run_queue)
+        if task.cancelled:
+            report_dropped(task, 0)  # Lazy deletion of the tombstone
+            total_weight -= task.weight
+            continue
+
+        # The slice is the weighted share of the period, which grows with the number of runnable tasks
+        period = max(target_latency, min_granularity * (len(run_queue) + 1))
+        time_slice = max(min_granularity, period * task.weight // total_weight)
+
+        execution_time = min(task.burst_time, time_slice)
+        print(f"Task {task.name} (weight {task.weight}) executed for {execution_time} units")
+        task.burst_time -= execution_time
+        clock += execution_time
+        task.vruntime += execution_time * NICE_0_WEIGHT / task.weight
+
+        if task.burst_time > 0:
+            heapq.heappush(run_queue, (task.vruntime, sequence, task))
+            sequence += 1
+        else:
+            task.completed = True
+            task.completion_time = clock
+            total_weight -= task.weight
+            print(f"Task {task.name} completed at time {clock}")
+        if cancellations is not None:
+            cancellations.expire(clock)
+
+
+if __name__ == "__main__":
+    # Example: the same tasks as the other schedulers
+    tasks = [
+        Task("Task1", priority=2, burst_time=10),
+        Task("Task2", priority=5, burst_time=15),
+        Task("Task3", priority=8, burst_time=7),
+        Task("Task4", priority=4, burst_time=12),
+        Task("Task5", priority=6, burst_time=6)
+    ]
+
+    queues = create_queues(tasks, None)
+
+    # Every runnable task should run once every 24 units, for at least 3 units
+    cfs_scheduler(queues, target_latency=24, min_granularity=3)
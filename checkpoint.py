@@ -0,0 +1,294 @@
+"""
+    Checkpoint and resume of the scheduler state.
+
+    The state of a run (the queues, the queue being served, the elapsed time and the tasks)
+    is kept in a SchedulerState object instead of local variables, so it can be saved
+    while the scheduler runs and resumed exactly afterwards.
+
+    - The on-disk format is a NumPy `.npz` file with one array per task attribute (columns)
+    plus a small JSON header. Dependencies, I/O bursts and queue membership are stored as
+    CSR arrays (an offsets array and a flat values array). Nothing is pickled.
+
+    - Task groups are saved as a table of group names (in submission order) and a "group" column
+    with the index of the group of each task (-1 for none). Dependencies on a group name are
+    stored as indexes past the last task, into the group table.
+
+    - Queues are saved in their internal order (deque order, or heap array order),
+    so a restored heap has exactly the same layout and the run continues identically.
+
+    - A Checkpoint keeps the arrays in memory; every call to `restore` builds an independent
+    SchedulerState, which is how one checkpoint is forked into many what-if continuations.
+
+    Checkpoints are taken between queue visits, where the state of the scheduler is complete.
+    Tasks held in timer wheels (arrivals, blocked sets) are not saved: while the `arrivals` or the `blocked`
+    of the state hold tasks, `to_arrays` raises instead of dropping them. Cancellation indexes are not saved.
+
+    NumPy is only imported when a state is converted to or from arrays, so the schedulers
+    that keep their state in a SchedulerState do not pay for it when no checkpoint is taken.
+"""
+import importlib
+import json
+import os
+from collections import deque
+from operator import attrgetter
+
+FORMAT_VERSION = 1
+
+# Task attributes saved as one column each; optional columns are saved when the task class has them
+TASK_COLUMNS = ("priority", "burst_time", "total_burst_time", "waiting_time", "arrival_time", "burst_index",
+                "completed", "cancelled", "failed")
+OPTIONAL_COLUMNS = ("tickets",)
+# Columns that may hold None, saved as floats with NaN for None
+NULLABLE_COLUMNS = ("deadline", "completion_time", "admitted_queue")
+
+
+class SchedulerState:
+
+    def __init__(self, queues, current_queue=None, clock=0, visits=0, tasks=None, arrivals=None, blocked=None):
+        """
+        Initialize the state of a run.
+
+        Args:
+            queues (list): The scheduler queues (deques or heaps) of Task objects
+            current_queue (int, optional): The queue to serve next. Defaults to the last queue (more priority).
+            clock (int, optional): The elapsed (virtual) time. Defaults to 0.
+            visits (int, optional): The number of queue visits so far. Defaults to 0.
+            tasks (list, optional): Every task of the run, including the completed ones.
+                Defaults to the tasks in the queues.
+            arrivals (TimerWheel, optional): The tasks that have not arrived yet. Defaults to None.
+            blocked (BlockedSet, optional): The tasks waiting on I/O. Defaults to None.
+        """
+        self.queues = queues
+        self.current_queue = len(queues) - 1 if current_queue is None else current_queue
+        self.clock = clock
+        self.visits = visits
+        self.tasks = tasks if tasks is not None else [task for queue in queues for task in queue]
+        self.arrivals = arrivals
+        self.blocked = blocked
+
+    @property
+    def completed_tasks(self):
+        """The set of names of the completed tasks."""
+        return {task.name for task in self.tasks if task.completed}
+
+    def to_arrays(self):
+        """
+        Convert the state to columnar arrays.
+
+        Returns:
+            dict: The arrays, with the JSON header under the key "header".
+
+        Raises:
+            ValueError: If tasks wait in `arrivals` or `blocked`, which are not saved.
+        """
+        import numpy as np
+
+        if self.arrivals or self.blocked:
+            raise ValueError(f"Cannot checkpoint {len(self.arrivals or ())} tasks not arrived yet and "
+                             f"{len(self.blocked or ())} tasks blocked on I/O: they are not saved")
+
+        # Tasks released into the queues after the state was created (e.g., arrivals) are tracked from now on
+        known = {id(task) for task in self.tasks}
+        self.tasks.extend(task for queue in self.queues for task in queue if id(task) not in known)
+        if not self.tasks:
+            raise ValueError("Cannot checkpoint a run without tasks")
+
+        index = {id(task): i for i, task in enumerate(self.tasks)}
+        names = [task.name for task in self.tasks]
+        name_index = {name: i for i, name in enumerate(names)}
+        task_class = type(self.tasks[0])
+
+        arrays = {"name": np.array(names, dtype=str)}
+        # One attrgetter call per task reads every column (TASK_COLUMNS has several keys, so it returns tuples)
+        keys = [key for key in TASK_COLUMNS + OPTIONAL_COLUMNS if hasattr(self.tasks[0], key)]
+        for key, column in zip(keys, zip(*map(attrgetter(*keys), self.tasks))):
+            arrays[key] = np.array(column)
+        for key in NULLABLE_COLUMNS:
+            arrays[key] = np.array([np.nan if value is None else value
+                                    for value in map(attrgetter(key), self.tasks)], dtype=float)
+
+        groups = sorted({id(task.group): task.group for task in self.tasks if task.group is not None}.values(),
+                        key=attrgetter("order"))
+        group_index = {id(group): i for i, group in enumerate(groups)}
+        arrays["group"] = np.array([-1 if task.group is None else group_index[id(task.group)] for task in self.tasks],
+                                   dtype=np.int64)
+        arrays["group_name"] = np.array([group.name for group in groups], dtype=str)
+        for i, group in enumerate(groups):
+            name_index.setdefault(group.name, len(names) + i)
+
+        missing = {dep for task in self.tasks for dep in task.dependencies} - name_index.keys()
+        if missing:
+            raise ValueError(f"Cannot checkpoint dependencies on unknown tasks: {sorted(missing)}")
+        arrays["dep_ptr"], arrays["dep_idx"] = _csr([[name_index[dep] for dep in task.dependencies]
+                                                     for task in self.tasks])
+        arrays["io_ptr"], arrays["io_time"] = _csr([[io for io, _ in task.io_bursts] for task in self.tasks])
+        _, arrays["io_cpu_time"] = _csr([[cpu for _, cpu in task.io_bursts] for task in self.tasks])
+        arrays["queue_ptr"], arrays["queue_idx"] = _csr([[index[id(task)] for task in queue]
+                                                         for queue in self.queues])
+
+        header = {
+            "version": FORMAT_VERSION,
+            "task_class": f"{task_class.__module__}:{task_class.__qualname__}",
+            "queue_type": "deque" if isinstance(self.queues[0], deque) else "heap",
+            "current_queue": self.current_queue,
+            "clock": self.clock,
+            "visits": self.visits,
+        }
+        arrays["header"] = np.array(json.dumps(header))
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Build a new state (with new Task objects) from columnar arrays.
+
+        Parameters:
+            arrays (dict): The arrays created by `to_arrays`
+
+        Returns:
+            SchedulerState: The restored state.
+        """
+        header = json.loads(str(arrays["header"]))
+        if header["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {header['version']}")
+        module_name, class_name = header["task_class"].split(":")
+        task_class = getattr(importlib.import_module(module_name), class_name)
+
+        # Python lists: indexing them per task is much cheaper than indexing NumPy arrays
+        names = arrays["name"].tolist()
+        # Checkpoints written before task groups were saved have no group table
+        group_names = arrays["group_name"].tolist() if "group_name" in arrays else []
+        group_column = arrays["group"].tolist() if "group" in arrays else [-1] * len(names)
+        dependency_names = names + group_names
+        dep_ptr, dep_idx = arrays["dep_ptr"].tolist(), arrays["dep_idx"].tolist()
+        io_ptr, io_time, io_cpu_time = (arrays["io_ptr"].tolist(), arrays["io_time"].tolist(),
+                                        arrays["io_cpu_time"].tolist())
+        columns = {key: arrays[key].tolist() for key in TASK_COLUMNS + OPTIONAL_COLUMNS if key in arrays}
+        for key in NULLABLE_COLUMNS:
+            if key in arrays:
+                columns[key] = [None if value != value else _as_number(value)  # NaN != NaN
+                                for value in arrays[key].tolist()]
+            else:
+                columns[key] = [None] * len(names)  # Column added after the checkpoint was written
+
+        tasks = []
+        keys = list(columns)
+        for i, (name, row) in enumerate(zip(names, zip(*columns.values()))):
+            task = task_class.__new__(task_class)  # Attributes are restored below, not recomputed
+            task.__dict__.update(zip(keys, row))
+            task.name = name
+            task.group = None
+            task.dependencies = [dependency_names[j] for j in dep_idx[dep_ptr[i]:dep_ptr[i + 1]]]
+            task.io_bursts = list(zip(io_time[io_ptr[i]:io_ptr[i + 1]], io_cpu_time[io_ptr[i]:io_ptr[i + 1]]))
+            tasks.append(task)
+
+        if group_names:
+            from task_groups import TaskGroup
+
+            shards = [[] for _ in group_names]
+            for task, group in zip(tasks, group_column):
+                if group >= 0:
+                    shards[group].append(task)
+            for name, group_tasks in zip(group_names, shards):
+                TaskGroup.from_tasks(name, group_tasks)
+
+        queue_ptr, queue_idx = arrays["queue_ptr"].tolist(), arrays["queue_idx"].tolist()
+        container = deque if header["queue_type"] == "deque" else list
+        queues = [container(tasks[j] for j in queue_idx[queue_ptr[q]:queue_ptr[q + 1]])
+                  for q in range(len(queue_ptr) - 1)]
+        return cls(queues, current_queue=header["current_queue"], clock=header["clock"],
+                   visits=header["visits"], tasks=tasks)
+
+    def fork(self):
+        """
+        Return an independent copy of the state, e.g., to explore a what-if continuation.
+        """
+        return SchedulerState.from_arrays(self.to_arrays())
+
+    def save(self, path):
+        """
+        Save the state to `path` (an .npz file). The file is replaced atomically.
+
+        Parameters:
+            path (str): The destination file
+        """
+        import numpy as np
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **self.to_arrays())
+        os.replace(tmp_path, path)
+
+
+class Checkpoint:
+
+    def __init__(self, path):
+        """
+        Load a checkpoint file in memory.
+
+        Args:
+            path (str): The .npz file written by `SchedulerState.save`
+        """
+        import numpy as np
+
+        with np.load(path, allow_pickle=False) as data:
+            self.arrays = {key: data[key] for key in data.files}
+        self.header = json.loads(str(self.arrays["header"]))
+
+    def restore(self):
+        """
+        Build a new SchedulerState from the checkpoint. Each call returns an independent state.
+        """
+        return SchedulerState.from_arrays(self.arrays)
+
+
+class Checkpointer:
+
+    def __init__(self, path, every=1000):
+        """
+        Save the scheduler state periodically.
+
+        Args:
+            path (str): The checkpoint file
+            every (int, optional): Number of queue visits between checkpoints. Defaults to 1000.
+        """
+        self.path = path
+        self.every = every
+
+    def __call__(self, state):
+        """
+        Called by the scheduler between queue visits; saves the state every `every` visits.
+
+        Parameters:
+            state (SchedulerState): The state of the run
+        """
+        if state.visits % self.every == 0:
+            state.save(self.path)
+
+
+def load_checkpoint(path):
+    """
+    Load the scheduler state saved in `path`.
+
+    Parameters:
+        path (str): The checkpoint file
+
+    Returns:
+        SchedulerState: The restored state.
+    """
+    return Checkpoint(path).restore()
+
+
+def _as_number(value):
+    # Floats that hold integers (e.g., deadlines) are restored as int
+    return int(value) if value.is_integer() else value
+
+
+def _csr(rows):
+    # Offsets and flat values of a list of lists
+    import numpy as np
+
+    ptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    ptr[1:] = np.cumsum([len(row) for row in rows])
+    values = np.array([value for row in rows for value in row], dtype=np.int64)
+    return ptr, values
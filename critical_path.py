@@ -0,0 +1,174 @@
+"""
+    Critical-path list scheduling of dependency DAGs onto k workers.
+
+    The schedulers with dependencies run one task at a time and only use the dependencies
+    to gate tasks. This scheduler exploits the parallelism of the DAG instead:
+
+    - In one O(V+E) pass over the DAG in reverse topological order (Kahn's algorithm),
+    it computes the bottom level of each task: its burst time plus the longest path
+    (in burst time) from it to the end of the DAG. The largest bottom level is the
+    critical-path length, a lower bound of the makespan.
+
+    - The ready tasks are kept in a heap ordered by bottom level, so the tasks on the critical
+    path are started first (list scheduling, as in HEFT with identical workers).
+    Whenever a worker is free, it takes the ready task with the largest bottom level and runs it
+    to completion. Completing a task decrements the number of unmet dependencies of its dependants,
+    so a task becomes ready in O(1) when its last dependency completes.
+
+    - Task groups (see task_groups.py) are gang-scheduled: a dependency on a group is a dependency
+    on each of its shards, and ready shards are ordered by the largest bottom level of their group,
+    so sibling shards are started together on the free workers.
+
+    The run reports the makespan and the idle time of each worker.
+"""
+import heapq
+
+from tasks import Task
+from tasks import create_queues
+from tasks import group_order
+
+
+def bottom_levels(tasks):
+    """
+    Compute the bottom level of each task in O(V+E).
+
+    Parameters:
+        tasks (list): The Task objects of the DAG
+
+    Returns:
+        dict: task name -> bottom level (burst time plus the longest path to the end of the DAG).
+
+    Raises:
+        ValueError: if a dependency names an unknown task, or if the dependencies have a cycle.
+    """
+    task_map = {task.name: task for task in tasks}
+    members = _group_members(tasks)
+    dependants = {task.name: [] for task in tasks}
+    for task in tasks:
+        for dep in _dependencies(task, members):
+            if dep not in task_map:
+                raise ValueError(f"Task {task.name} depends on unknown task {dep}")
+            dependants[dep].append(task.name)
+
+    # Kahn's algorithm from the sinks: a task is processed when all its dependants are
+    pending = {task.name: len(dependants[task.name]) for task in tasks}
+    stack = [name for name, count in pending.items() if count == 0]
+    levels = {}
+    while stack:
+        name = stack.pop()
+        task = task_map[name]
+        levels[name] = task.burst_time + max((levels[d] for d in dependants[name]), default=0)
+        for dep in _dependencies(task, members):
+            pending[dep] -= 1
+            if pending[dep] == 0:
+                stack.append(dep)
+    if len(levels) != len(tasks):
+        raise ValueError("The dependencies have a cycle")
+    return levels
+
+
+def _group_members(tasks):
+    # group name -> names of its shards
+    members = {}
+    for task in tasks:
+        if task.group is not None:
+            members.setdefault(task.group.name, []).append(task.name)
+    return members
+
+
+def _dependencies(task, members):
+    # The dependencies of a task, with each group replaced by its shards
+    return [name for dep in task.dependencies for name in members.get(dep, (dep,))]
+
+
+def critical_path_scheduler(queues, workers=2):
+    """
+    Schedule a DAG of tasks onto `workers` identical workers in critical-path order.
+
+    Parameters:
+        queues (list): A list of queues of Task objects (e.g., from `create_queues`); the queues are merged.
+        workers (int): The number of workers.
+
+    Returns:
+        tuple: The makespan and the list of idle times of the workers.
+    """
+    if workers < 1:
+        raise ValueError(f"The number of workers must be positive: {workers}")
+    tasks = [task for queue in queues for task in queue]
+    levels = bottom_levels(tasks)
+    task_map = {task.name: task for task in tasks}
+    members = _group_members(tasks)
+    dependants = {task.name: [] for task in tasks}
+    unmet = {}
+    for task in tasks:
+        dependencies = _dependencies(task, members)
+        unmet[task.name] = len(dependencies)
+        for dep in dependencies:
+            dependants[dep].append(task.name)
+    # The shards of a group are ranked by the largest bottom level of the group, so they start together
+    rank = {name: -levels[name] for name in levels}
+    for group_name, shards in members.items():
+        group_level = max(levels[name] for name in shards)
+        for name in shards:
+            rank[name] = -group_level
+
+    def ready_key(task):
+        return rank[task.name], group_order(task), -levels[task.name]
+
+    print("Execution Order:")
+    # Ready tasks by largest bottom level first; the sequence number keeps the order of submission for ties
+    ready = [(*ready_key(task), i, task) for i, task in enumerate(tasks) if unmet[task.name] == 0]
+    heapq.heapify(ready)
+    sequence = len(tasks)
+    free_workers = list(range(workers))  # heap of worker ids
+    running = []  # heap of (finish time, worker, sequence, task)
+    busy = [0] * workers
+    clock = 0
+
+    while ready or running:
+        # Start the ready tasks with the largest bottom levels on the free workers
+        while ready and free_workers:
+            *_, task = heapq.heappop(ready)
+            worker = heapq.heappop(free_workers)
+            finish = clock + task.burst_time
+            print(f"Task {task.name} (Worker {worker}) executed from {clock} to {finish} (bottom level {levels[task.name]})")
+            busy[worker] += task.burst_time
+            heapq.heappush(running, (finish, worker, sequence, task))
+            sequence += 1
+
+        # Advance to the next completion (every task finishing at that time, so they are all ready together)
+        clock = running[0][0]
+        while running and running[0][0] == clock:
+            _, worker, _, task = heapq.heappop(running)
+            task.burst_time = 0
+            task.completed = True
+            task.completion_time = clock
+            heapq.heappush(free_workers, worker)
+            for name in dependants[task.name]:
+                unmet[name] -= 1
+                if unmet[name] == 0:
+                    heapq.heappush(ready, (*ready_key(task_map[name]), sequence, task_map[name]))
+                    sequence += 1
+
+    idle = [clock - time for time in busy]
+    print(f"Makespan: {clock} units (critical path: {max(levels.values(), default=0)} units)")
+    for worker, time in enumerate(idle):
+        print(f"Worker {worker} idle for {time} units")
+    return clock, idle
+
+
+if __name__ == "__main__":
+    # Example: a small build DAG
+    tasks = [
+        Task("Task1", priority=2, burst_time=10),
+        Task("Task2", priority=8, burst_time=15, dependencies=["Task1"]),
+        Task("Task3", priority=4, burst_time=5, dependencies=["Task1"]),
+        Task("Task4", priority=6, burst_time=20, dependencies=["Task2", "Task3"]),
+        Task("Task5", priority=5, burst_time=8),
+        Task("Task6", priority=3, burst_time=12, dependencies=["Task5"]),
+        Task("Task7", priority=3, burst_time=6)
+    ]
+
+    queues = create_queues(tasks, None)
+
+    critical_path_scheduler(queues, workers=2)
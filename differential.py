@@ -0,0 +1,266 @@
+"""
+    Differential testing of candidate scheduler engines against the reference schedulers.
+
+    A faster engine (vectorized, coalesced slices, other data structures...) is only trusted
+    if it reproduces what the reference scheduler produces. The harness:
+
+    - Generates random workloads from a seed (`random_workload`): priorities, burst times,
+    tickets and, optionally, dependencies on earlier tasks (so the dependencies never have a cycle).
+
+    - Runs the reference scheduler (a name of `simulate.SCHEDULERS`) and the candidate engine
+    on the same workload, with the same configuration and the same random seed, and compares
+    the execution traces line by line (mode="trace") or the completion time of each task (mode="completion").
+
+    - Minimizes the first counterexample: tasks are removed (in chunks, then one by one) and burst
+    times are halved as long as the engines still disagree, so the report shows a small workload
+    and the first event where the engines diverge.
+
+    - Times both engines (with the trace discarded) over the same workloads and reports the speedup
+    next to the correctness result.
+
+    The candidate is either another name of `simulate.SCHEDULERS`, or a "module:function" with the
+    same signature as the reference scheduler (it receives the same queues and arguments).
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+
+import simulate
+
+
+def random_workload(seed, task_count=20, max_priority=10, max_burst=20, dependency_probability=0.0,
+                    max_tickets=20):
+    """
+    Generate a random workload.
+
+    Parameters:
+        seed (int): The seed of the generator
+        task_count (int, optional): The number of tasks. Defaults to 20.
+        max_priority (int, optional): Priorities are drawn in [1, max_priority]. Defaults to 10.
+        max_burst (int, optional): Burst times are drawn in [1, max_burst]. Defaults to 20.
+        dependency_probability (float, optional): Probability that a task depends on each earlier task.
+            Defaults to 0.0 (no dependencies).
+        max_tickets (int, optional): Tickets are drawn in [1, max_tickets]. Defaults to 20.
+
+    Returns:
+        list: The task records (as read by `simulate.build_tasks`).
+    """
+    rng = random.Random(seed)
+    records = []
+    for i in range(task_count):
+        record = {
+            "name": f"Task{i + 1}",
+            "priority": rng.randint(1, max_priority),
+            "burst_time": rng.randint(1, max_burst),
+            "tickets": rng.randint(1, max_tickets),
+        }
+        dependencies = [other["name"] for other in records if rng.random() < dependency_probability]
+        if dependencies:
+            record["dependencies"] = dependencies
+        records.append(record)
+    return records
+
+
+def run_engine(args, engine, records, seed, capture=True):
+    """
+    Run an engine on a workload.
+
+    Parameters:
+        args (argparse.Namespace): The configuration (see `simulate.parse_args`); args.scheduler is the reference
+        engine (str): A name of `simulate.SCHEDULERS`, or "module:function" run with the reference arguments
+        records (list): The task records
+        seed (int): The seed of the random draws
+        capture (bool, optional): Keep the trace; otherwise it is discarded (for timing). Defaults to True.
+
+    Returns:
+        tuple: The trace (list of lines), the completion time of each task (dict) and the runtime in seconds.
+    """
+    args = argparse.Namespace(**(vars(args) | {"seed": seed}))  # Seeds the generator of the lottery
+    if engine in simulate.SCHEDULERS:
+        args = argparse.Namespace(**(vars(args) | {"scheduler": engine}))
+        scheduler, queues, kwargs, tasks, _ = simulate.prepare(args, records)
+    else:
+        _, queues, kwargs, tasks, _ = simulate.prepare(args, records)
+        scheduler = simulate.load_class(engine)
+
+    random.seed(seed)  # For engines that draw from the global random module
+    output = io.StringIO() if capture else simulate.NullWriter()
+    with contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        scheduler(queues, **kwargs)
+        runtime = time.perf_counter() - start
+    trace = output.getvalue().splitlines() if capture else []
+    return trace, {task.name: task.completion_time for task in tasks}, runtime
+
+
+def compare(args, candidate, records, seed, mode="trace"):
+    """
+    Run the reference and the candidate on a workload and find the first difference.
+
+    Parameters:
+        args (argparse.Namespace): The configuration; args.scheduler is the reference
+        candidate (str): The candidate engine
+        records (list): The task records
+        seed (int): The seed of the random draws
+        mode (str, optional): "trace" or "completion". Defaults to "trace".
+
+    Returns:
+        str or None: A description of the first difference, or None if the engines agree.
+    """
+    try:
+        reference_trace, reference_times, _ = run_engine(args, args.scheduler, records, seed)
+    except Exception as error:
+        return f"reference failed: {error!r}"
+    try:
+        candidate_trace, candidate_times, _ = run_engine(args, candidate, records, seed)
+    except Exception as error:
+        return f"candidate failed: {error!r}"
+
+    if mode == "completion":
+        for name, completion_time in reference_times.items():
+            if candidate_times.get(name) != completion_time:
+                return f"task {name}: completed at {completion_time} (reference), {candidate_times.get(name)} (candidate)"
+        return None
+
+    for i, (expected, actual) in enumerate(zip(reference_trace, candidate_trace)):
+        if expected != actual:
+            return f"line {i + 1}: {expected!r} (reference), {actual!r} (candidate)"
+    if len(reference_trace) != len(candidate_trace):
+        return f"trace length: {len(reference_trace)} lines (reference), {len(candidate_trace)} (candidate)"
+    return None
+
+
+def minimize(args, candidate, records, seed, mode="trace"):
+    """
+    Shrink a workload on which the engines disagree, keeping the disagreement.
+
+    Parameters:
+        args (argparse.Namespace): The configuration; args.scheduler is the reference
+        candidate (str): The candidate engine
+        records (list): A failing workload
+        seed (int): The seed of the random draws
+        mode (str, optional): "trace" or "completion". Defaults to "trace".
+
+    Returns:
+        list: A smaller failing workload (1-minimal for task removal).
+    """
+    def fails(candidate_records):
+        return bool(candidate_records) and compare(args, candidate, candidate_records, seed, mode) is not None
+
+    # Remove chunks of tasks, halving the chunk size when no chunk can be removed
+    chunk = max(1, len(records) // 2)
+    while True:
+        i = 0
+        while i < len(records):
+            smaller = _without(records, {record["name"] for record in records[i:i + chunk]})
+            if fails(smaller):
+                records = smaller
+            else:
+                i += chunk
+        if chunk == 1:
+            break
+        chunk = max(1, chunk // 2)
+
+    # Halve the burst times, until no burst time can be halved (shrinking a task can unlock another)
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        for i in range(len(records)):
+            if records[i]["burst_time"] > 1:
+                smaller = list(records)
+                smaller[i] = records[i] | {"burst_time": records[i]["burst_time"] // 2}
+                if fails(smaller):
+                    records = smaller
+                    shrunk = True
+    return records
+
+
+def _without(records, names):
+    # Remove tasks and the dependencies on them
+    kept = []
+    for record in records:
+        if record["name"] in names:
+            continue
+        if "dependencies" in record:
+            record = record | {"dependencies": [dep for dep in record["dependencies"] if dep not in names]}
+        kept.append(record)
+    return kept
+
+
+def differential_test(reference, candidate, trials=100, seed=0, mode="trace", config=(), **workload):
+    """
+    Compare a candidate engine with a reference scheduler on random workloads.
+
+    Parameters:
+        reference (str): A name of `simulate.SCHEDULERS`
+        candidate (str): A name of `simulate.SCHEDULERS`, or "module:function"
+        trials (int, optional): The number of random workloads. Defaults to 100.
+        seed (int, optional): The seed of the first workload; trial i uses seed + i. Defaults to 0.
+        mode (str, optional): "trace" or "completion". Defaults to "trace".
+        config (tuple, optional): Command-line flags of the configuration (e.g., ("--quanta", "6,8,10")).
+        workload: Arguments of `random_workload` (task_count, dependency_probability, ...).
+
+    Returns:
+        dict: The number of trials and failures, the minimized counterexample (or None),
+        the total runtimes of both engines and the speedup of the candidate.
+    """
+    args = simulate.parse_args([reference, *config])
+    failures = 0
+    counterexample = None
+    reference_time = candidate_time = 0.0
+    for trial in range(trials):
+        trial_seed = seed + trial
+        records = random_workload(trial_seed, **workload)
+        difference = compare(args, candidate, records, trial_seed, mode)
+        if difference is not None:
+            failures += 1
+            if counterexample is None:
+                records = minimize(args, candidate, records, trial_seed, mode)
+                counterexample = {"seed": trial_seed, "records": records,
+                                  "difference": compare(args, candidate, records, trial_seed, mode)}
+            continue
+        reference_time += run_engine(args, reference, records, trial_seed, capture=False)[2]
+        candidate_time += run_engine(args, candidate, records, trial_seed, capture=False)[2]
+
+    report = {
+        "trials": trials,
+        "failures": failures,
+        "counterexample": counterexample,
+        "reference_time": reference_time,
+        "candidate_time": candidate_time,
+        "speedup": reference_time / candidate_time if candidate_time else None,
+    }
+    print_report(reference, candidate, report)
+    return report
+
+
+def print_report(reference, candidate, report):
+    """
+    Print the result of `differential_test`.
+
+    Parameters:
+        reference (str): The reference engine
+        candidate (str): The candidate engine
+        report (dict): The report
+    """
+    print(f"{candidate} vs {reference}: {report['trials'] - report['failures']}/{report['trials']} workloads agree")
+    if report["speedup"] is not None:
+        print(f"Runtime on the agreeing workloads: {report['reference_time'] * 1000:.2f} ms (reference), "
+              f"{report['candidate_time'] * 1000:.2f} ms (candidate), speedup {report['speedup']:.2f}x")
+    counterexample = report["counterexample"]
+    if counterexample is not None:
+        print(f"Minimized counterexample (seed {counterexample['seed']}, {len(counterexample['records'])} tasks):")
+        for record in counterexample["records"]:
+            print(f"    {record}")
+        print(f"First difference: {counterexample['difference']}")
+
+
+if __name__ == "__main__":
+    # Without dependencies, the priority scheduler with dependencies must reproduce the plain one
+    differential_test("priority", "priority_deps", trials=50, task_count=30)
+    print()
+
+    # SJF is not FIFO: the harness finds and minimizes a workload where they differ
+    differential_test("fifo", "sjf", trials=20, mode="completion", config=("--ranges", "none", "--quanta", "20"))
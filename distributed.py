@@ -0,0 +1,328 @@
+"""
+    Simulation sweeps spread over several machines: a coordinator and TCP workers.
+
+        python -m distributed coordinator sweep.json workload.json --host 0.0.0.0 --port 6000   (prints a random authkey)
+        python -m distributed worker coordinator-host:6000 --authkey KEY     (on each node, as many as needed)
+        python -m distributed local sweep.json workload.json --processes 4     (coordinator and 4 workers on this machine)
+
+    - A sweep is a list of configurations; each configuration is the command line of a run
+    (see simulate.py), e.g. ["mlfq", "--quanta", "6,8,10", "--task-quantum", "2"].
+    Any scheduler of `simulate.SCHEDULERS` can be used, and a sweep can mix several.
+
+    - The coordinator splits the sweep into shards of `shard_size` configurations. Workers connect
+    over TCP (`multiprocessing.connection`, authenticated with a shared key), receive the workload
+    once, then pull shards one at a time, so faster nodes take more shards.
+
+    - Workers stream the metrics of each configuration back as soon as it has run. The coordinator
+    reports every result as it arrives (`on_result`) and returns all of them in the order of the sweep.
+
+    - If a worker dies, disconnects, or does not report a result within `timeout` seconds,
+    the configurations of its shard that have no result yet are given to another worker,
+    up to `max_attempts` times. Workers can join at any time, including after others died.
+    A configuration that fails with an error is reported as failed and not retried.
+
+    - With `--percentiles` in the configurations, each result carries the latency histograms of its
+    queues; `merge_histograms` merges them exactly per scheduler, across every worker.
+
+    Messages are pickled, so anyone who knows the authkey can run code on the coordinator and the workers.
+    There is no default key: without `--authkey`, the coordinator generates a random one and prints it
+    for the workers, and it listens on localhost unless `--host` is given. Run coordinators and workers
+    on a trusted network.
+"""
+import argparse
+import json
+import queue
+import secrets
+import sys
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+from multiprocessing.connection import Listener
+from multiprocessing.connection import answer_challenge
+from multiprocessing.connection import deliver_challenge
+
+import simulate
+
+
+class Coordinator:
+
+    def __init__(self, configs, records=None, address=("localhost", 0), authkey=None, shard_size=4,
+                 max_attempts=3, timeout=None, on_result=None):
+        """
+        Initialize the coordinator and start listening.
+
+        Args:
+            configs (list): The command line of each run, e.g. ["mlfq", "--quanta", "6,8,10"]
+            records (list, optional): The task records of the workload. Defaults to the example tasks.
+            address (tuple, optional): The (host, port) to listen on. Defaults to a free port on localhost.
+            authkey (str, optional): The key shared with the workers. Defaults to None (a random key, in `authkey`).
+            shard_size (int, optional): The number of configurations per shard. Defaults to 4.
+            max_attempts (int, optional): The number of workers a shard is given to before it fails. Defaults to 3.
+            timeout (float, optional): Seconds without a result before a worker is considered dead.
+                Defaults to None (wait until the connection breaks).
+            on_result (callable, optional): Called with the index and the result of each configuration, as they arrive.
+                An exception raised by on_result stops the sweep and is raised by `run`.
+        """
+        for config in configs:
+            try:
+                simulate.parse_args(config)
+            except SystemExit:
+                raise ValueError(f"Invalid configuration {config}") from None
+        self.configs = [list(config) for config in configs]
+        self.records = records if records is not None else simulate.EXAMPLE_WORKLOAD
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.on_result = on_result
+        self.results = [None] * len(self.configs)
+        self.remaining = len(self.configs)
+        self.error = None  # Exception raised by on_result
+        self.condition = threading.Condition()
+        self.finished = threading.Event()
+        self.pending = queue.Queue()  # (shard id, attempt, indexes of the configurations without result)
+        for shard_id, start in enumerate(range(0, len(self.configs), shard_size)):
+            self.pending.put((shard_id, 1, list(range(start, min(start + shard_size, len(self.configs))))))
+        self.authkey = authkey if authkey is not None else secrets.token_hex(16)
+        self.listener = Listener(address)  # Authenticated per connection, in `_serve`
+        self.address = self.listener.address
+
+    def run(self):
+        """
+        Serve the workers until every configuration has a result.
+
+        Returns:
+            list: One dict per configuration, in the order of the sweep: the configuration and either
+            its summary metrics, runtime (seconds) and group metrics, or the error that made it fail.
+        """
+        threading.Thread(target=self._accept, daemon=True).start()
+        with self.condition:
+            self.condition.wait_for(lambda: self.remaining == 0 or self.error is not None)
+        self.finished.set()
+        self.listener.close()
+        if self.error is not None:
+            raise self.error
+        return self.results
+
+    def _accept(self):
+        # The handshake runs in the thread of the connection: a slow or hostile client cannot block the others
+        while not self.finished.is_set():
+            try:
+                connection = self.listener.accept()
+            except OSError:  # Listener closed
+                continue
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection):
+        # Give shards to one worker until the sweep is done or the worker is lost
+        with connection:
+            try:
+                deliver_challenge(connection, self.authkey.encode())  # As Listener.accept does with an authkey
+                answer_challenge(connection, self.authkey.encode())
+                connection.send(("workload", self.records))
+            except (OSError, EOFError, AuthenticationError):  # Wrong key, or the client left
+                return
+            while not self.finished.is_set():
+                try:
+                    shard_id, attempt, indexes = self.pending.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                remaining = list(indexes)
+                try:
+                    connection.send(("shard", shard_id, [(i, self.configs[i]) for i in indexes]))
+                except OSError as error:
+                    self._retry(shard_id, attempt, remaining, error)
+                    return
+                while remaining:
+                    try:
+                        if self.timeout is not None and not connection.poll(self.timeout):
+                            raise TimeoutError(f"no result for {self.timeout} s")
+                        kind, index, payload = connection.recv()
+                    except (EOFError, OSError) as error:  # The worker died or hangs
+                        self._retry(shard_id, attempt, remaining, error)
+                        return
+                    self._record(index, {"error": payload} if kind == "error" else payload)
+                    remaining.remove(index)
+            try:
+                connection.send(("stop",))
+            except OSError:
+                pass
+
+    def _record(self, index, result):
+        result = {"config": self.configs[index]} | result
+        with self.condition:
+            self.results[index] = result
+            self.remaining -= 1
+            if self.on_result is not None:
+                try:
+                    self.on_result(index, result)
+                except Exception as error:
+                    self.error = error
+            self.condition.notify_all()
+
+    def _retry(self, shard_id, attempt, indexes, error):
+        # Give the configurations of a lost shard that have no result yet to another worker
+        if attempt < self.max_attempts:
+            print(f"Shard {shard_id} lost ({error!r}), {len(indexes)} configurations retried "
+                  f"(attempt {attempt + 1}/{self.max_attempts})", file=sys.stderr)
+            self.pending.put((shard_id, attempt + 1, indexes))
+            return
+        print(f"Shard {shard_id} lost ({error!r}) after {attempt} attempts, giving up", file=sys.stderr)
+        for index in indexes:
+            self._record(index, {"error": f"shard lost after {attempt} attempts: {error!r}"})
+
+
+def run_worker(address, authkey):
+    """
+    Connect to a coordinator and run the shards it gives until the sweep is done.
+
+    Parameters:
+        address (tuple): The (host, port) of the coordinator
+        authkey (str): The key shared with the coordinator
+
+    Returns:
+        int: The number of configurations run.
+    """
+    count = 0
+    with Client(tuple(address), authkey=authkey.encode()) as connection:
+        _, records = connection.recv()
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:  # The coordinator is done
+                break
+            if message[0] == "stop":
+                break
+            _, _, jobs = message
+            for index, config in jobs:
+                connection.send(_run_config(index, config, records))
+                count += 1
+    return count
+
+
+def _run_config(index, config, records):
+    # Run one configuration quietly; the message sent back to the coordinator
+    try:
+        args = simulate.parse_args(config)
+        args.quiet = True
+        summary, runtime, groups = simulate.run(args, records)
+    except Exception as error:
+        return "error", index, repr(error)
+    return "result", index, {"summary": summary, "runtime": runtime, "groups": groups}
+
+
+def run_local(configs, records=None, processes=2, **options):
+    """
+    Run a sweep with a coordinator and worker processes on this machine.
+
+    Parameters:
+        configs (list): The command line of each run
+        records (list, optional): The task records. Defaults to the example tasks.
+        processes (int, optional): The number of worker processes. Defaults to 2.
+        options: Other arguments of Coordinator (authkey, shard_size, max_attempts, timeout, on_result).
+            Without authkey, the coordinator and the workers share a random key.
+
+    Returns:
+        list: The results of `Coordinator.run`.
+    """
+    from multiprocessing import Process
+
+    coordinator = Coordinator(configs, records, **options)
+    workers = [Process(target=run_worker, args=(coordinator.address, coordinator.authkey),
+                       daemon=True) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    try:
+        return coordinator.run()
+    finally:
+        for worker in workers:
+            worker.join(timeout=5)
+
+
+def merge_histograms(results):
+    """
+    Merge the latency histograms of the results of a sweep, per scheduler (the first word of the configuration).
+
+    Parameters:
+        results (list): The results of `Coordinator.run` (configurations run with --percentiles)
+
+    Returns:
+        dict: scheduler -> {"turnaround": [LatencyHistogram per queue], "waiting": [...]}.
+    """
+    from latency_histogram import LatencyHistogram
+
+    merged = {}
+    for result in results:
+        histograms = result.get("summary", {}).get("histograms")
+        if histograms is None:
+            continue
+        policy = merged.setdefault(result["config"][0], {})
+        for kind, queue_histograms in histograms.items():
+            totals = policy.setdefault(kind, [])
+            for i, data in enumerate(queue_histograms):
+                histogram = LatencyHistogram.from_dict(data)
+                if i < len(totals):
+                    totals[i].merge(histogram)
+                else:
+                    totals.append(histogram)
+    return merged
+
+
+def parse_address(text):
+    """
+    Parse a "host:port" address.
+
+    Parameters:
+        text (str): The address
+
+    Returns:
+        tuple: (host, port)
+    """
+    host, _, port = text.rpartition(":")
+    return host or "localhost", int(port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m distributed", description="Run simulation sweeps on workers.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("coordinator", "local"):
+        command = commands.add_parser(name)
+        command.add_argument("sweep", help="JSON file with the list of configurations (command lines of simulate)")
+        command.add_argument("workload", nargs="?", help="JSON or CSV workload file (default: the example tasks)")
+        command.add_argument("--shard-size", type=int, default=4, help="Configurations per shard")
+        command.add_argument("--max-attempts", type=int, default=3, help="Workers a shard is given to before it fails")
+        command.add_argument("--timeout", type=float, default=None, help="Seconds without a result before a worker is dead")
+    commands.choices["coordinator"].add_argument("--host", default="localhost",
+                                                      help='Interface to listen on (e.g. "0.0.0.0" for every interface)')
+    commands.choices["coordinator"].add_argument("--port", type=int, default=6000, help="Port to listen on")
+    commands.choices["local"].add_argument("--processes", type=int, default=2, help="Number of worker processes")
+    worker = commands.add_parser("worker")
+    worker.add_argument("address", help="host:port of the coordinator")
+    worker.add_argument("--authkey", required=True, help="Key printed by the coordinator (or given to it)")
+    commands.choices["coordinator"].add_argument("--authkey", default=None,
+                                                 help="Key shared with the workers (default: a random key, printed)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "worker":
+            count = run_worker(parse_address(args.address), args.authkey)
+            print(f"{count} configurations run", file=sys.stderr)
+            return
+
+        with open(args.sweep) as f:
+            configs = json.load(f)
+        records = simulate.read_workload(args.workload) if args.workload else None
+        options = {"shard_size": args.shard_size, "max_attempts": args.max_attempts, "timeout": args.timeout,
+                   "on_result": lambda _, result: print(json.dumps(result), flush=True)}
+        if args.command == "local":
+            run_local(configs, records, args.processes, **options)  # With a random key
+        else:
+            coordinator = Coordinator(configs, records, address=(args.host, args.port), authkey=args.authkey, **options)
+            print(f"Listening on {args.host}:{coordinator.address[1]}", file=sys.stderr)
+            if args.authkey is None:
+                print(f"Authkey: {coordinator.authkey}", file=sys.stderr)
+            coordinator.run()
+    except (OSError, ValueError, KeyError) as error:
+        sys.exit(f"error: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+    Earliest Deadline First (EDF) and Least Laxity First (LLF) scheduling.
+
+    Tasks carry a deadline (`Task.deadline`, an absolute virtual time). The queues are priority
+    queues created by `create_priority_queues`, so picking the next task is O(log n):
+
+    - TaskEDF orders tasks by deadline: the task with the earliest deadline runs first.
+
+    - TaskLLF orders tasks by laxity, i.e., `deadline - clock - remaining burst time`.
+    All waiting tasks age at the same rate, so ordering by `deadline - remaining burst time`
+    is equivalent and the heap never has to be rebuilt.
+
+    Tasks without a deadline come after every task with a deadline.
+
+    When a task is picked after its deadline has already passed, the scheduler can keep running it
+    (miss_policy="keep"), drop it ("drop"), or demote it to the next lower-priority queue ("demote"),
+    so that it does not delay tasks that can still meet their deadlines.
+    The scheduler tracks the number of deadline misses and the lateness of the tasks.
+"""
+import heapq
+import math
+import sys
+
+from tasks import Task
+from tasks import create_priority_queues
+from cancellation import report_dropped
+
+
+class TaskEDF(Task):
+
+    def __lt__(self, other):
+        """
+        Compare two tasks based on their deadline.
+
+        Parameters:
+            other (TaskEDF): Another TaskEDF instance
+
+        Returns:
+            True if this task has an earlier deadline than the other task
+        """
+        return _key(self.deadline) < _key(other.deadline)
+
+
+class TaskLLF(Task):
+
+    def __lt__(self, other):
+        """
+        Compare two tasks based on their laxity (slack time before the deadline).
+
+        Parameters:
+            other (TaskLLF): Another TaskLLF instance
+
+        Returns:
+            True if this task has less laxity than the other task
+        """
+        return _key(self.deadline) - self.burst_time < _key(other.deadline) - other.burst_time
+
+
+def _key(deadline):
+    return math.inf if deadline is None else deadline
+
+
+class DeadlineStats:
+
+    def __init__(self):
+        """
+        Counters of met and missed deadlines.
+        """
+        self.met = 0
+        self.missed = 0  # Completed after the deadline, or dropped
+        self.dropped = 0
+        self.total_lateness = 0
+        self.max_lateness = 0
+
+    def record_completion(self, task, clock):
+        """
+        Account for a task that completed at time `clock`.
+
+        Parameters:
+            task (Task): The completed task
+            clock (int): The completion time
+        """
+        if task.deadline is None:
+            return
+        lateness = clock - task.deadline
+        if lateness > 0:
+            self.missed += 1
+            self.total_lateness += lateness
+            self.max_lateness = max(self.max_lateness, lateness)
+        else:
+            self.met += 1
+
+    def record_drop(self, task):
+        """
+        Account for a task that was dropped after missing its deadline.
+
+        Parameters:
+            task (Task): The dropped task
+        """
+        self.missed += 1
+        self.dropped += 1
+
+    def report(self):
+        """
+        Print the deadline hit rate and the lateness of the late tasks.
+        """
+        total = self.met + self.missed
+        hit_rate = self.met / total if total else 1.0
+        print(f"Deadlines met: {self.met}, missed: {self.missed} (dropped: {self.dropped}), hit rate {hit_rate:.1%}")
+        late = self.missed - self.dropped
+        average = self.total_lateness / late if late else 0
+        print(f"Lateness: total {self.total_lateness}, average {average:.1f}, max {self.max_lateness} units")
+
+
+def edf_scheduler(queues, queue_quanta, task_quantum, miss_policy="keep", cancellations=None, policy=None):
+    """
+    Multi-queue deadline scheduler (EDF with TaskEDF, LLF with TaskLLF).
+
+    Queues are processed cyclically, as in the other multi-queue schedulers. Within a queue,
+    the task that comes first in the heap (earliest deadline or least laxity) runs for
+    at most task_quantum, and is reinserted if it has not completed.
+
+    Parameters:
+        queues (list): A list of priority queues (heaps) of TaskEDF or TaskLLF objects.
+        queue_quanta (list): A list of time quanta for each queue.
+        task_quantum (int): Maximum time allocated to each task per turn.
+        miss_policy (str): What to do with a task whose deadline already passed when it is picked:
+            "keep" runs it anyway, "drop" removes it, "demote" moves it to the next lower-priority queue
+            (in the lowest queue, it is kept).
+        cancellations (CancellationIndex, optional): Index used to cancel or expire tasks while they are queued.
+        policy (DeficitRoundRobin, optional): Serves the queues by weight instead of the fixed rotation (see fair_share.py).
+            If given, `queue_quanta` is ignored.
+
+    Returns:
+        DeadlineStats: The deadline misses and lateness of the run.
+    """
+    if miss_policy not in ("keep", "drop", "demote"):
+        raise ValueError(f"Unknown miss policy: {miss_policy}")
+
+    print("Execution Order:")
+    stats = DeadlineStats()
+    queue_count = len(queues)
+    current_queue = queue_count - 1  # Start with the last queue (more priority)
+    clock = 0  # Elapsed (virtual) time
+
+    if policy is not None:
+        queue_quanta = policy.budgets  # Set by the policy before each visit
+
+    while any(queues):  # Continue until all priority queues are empty
+        if policy is not None:
+            current_queue = policy.select(queues, clock)  # Next active queue, by weight
+        if queues[current_queue]:
+            remaining_time = queue_quanta[current_queue]  # Quantum for the current queue
+
+            while remaining_time > 0 and queues[current_queue]:
+                task = heapq.heappop(queues[current_queue])  # Earliest deadline (or least laxity) first
+                if task.cancelled:
+                    report_dropped(task, current_queue)  # Lazy deletion of the tombstone
+                    continue
+
+                if task.deadline is not None and clock >= task.deadline and miss_policy != "keep":
+                    if miss_policy == "drop":
+                        print(f"Task {task.name} (Queue {current_queue}) missed its deadline and was dropped")
+                        task.cancelled = True
+                        stats.record_drop(task)
+                        continue
+                    if current_queue - 1 >= 0:
+                        print(f"Task {task.name} (Queue {current_queue}) missed its deadline and was demoted")
+                        heapq.heappush(queues[current_queue - 1], task)
+                        continue
+
+                execution_time = min(task.burst_time, task_quantum, remaining_time)
+                print(f"Task {task.name} (Queue {current_queue}) executed for {execution_time} units")
+                task.burst_time -= execution_time
+                remaining_time -= execution_time
+                clock += execution_time
+
+                if task.burst_time > 0:
+                    heapq.heappush(queues[current_queue], task)  # Reinsert task into the priority queue if not completed
+                else:
+                    task.completed = True
+                    task.completion_time = clock
+                    stats.record_completion(task, clock)
+                    print(f"Task {task.name} completed at time {clock} (deadline {task.deadline})")
+                if cancellations is not None:
+                    cancellations.expire(clock)
+        if policy is not None:
+            policy.charge(queues, clock)  # Carry the unused time over
+        # Move to the next queue
+        current_queue = (current_queue - 1)
+        if current_queue < 0:
+            current_queue = queue_count - 1
+
+    stats.report()
+    return stats
+
+
+if __name__ == "__main__":
+    from copy import deepcopy
+
+    # Example: an overloaded single queue (50 units of work, the last deadline is at 40)
+    tasks = [
+        TaskEDF("Task1", priority=2, burst_time=10, deadline=40),
+        TaskEDF("Task2", priority=5, burst_time=15, deadline=20),
+        TaskEDF("Task3", priority=8, burst_time=7, deadline=12),
+        TaskEDF("Task4", priority=4, burst_time=12, deadline=30),
+        TaskEDF("Task5", priority=6, burst_time=6, deadline=35)
+    ]
+
+    queues = create_priority_queues(tasks, None)
+    queue_quanta = [sys.maxsize]  # There is only one queue
+
+    # EDF, running late tasks anyway
+    edf_scheduler(deepcopy(queues), queue_quanta, task_quantum=4, miss_policy="keep")
+    print('\n\n')
+
+    # EDF, dropping the tasks that already missed their deadline
+    edf_scheduler(deepcopy(queues), queue_quanta, task_quantum=4, miss_policy="drop")
+    print('\n\n')
+
+    # LLF
+    tasks = [TaskLLF(task.name, task.priority, task.burst_time, deadline=task.deadline) for task in tasks]
+    edf_scheduler(create_priority_queues(tasks, None), queue_quanta, task_quantum=4, miss_policy="drop")
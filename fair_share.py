@@ -0,0 +1,119 @@
+"""
+    Weighted sharing of the CPU between the queues (deficit round robin).
+
+    By default, the multi-queue schedulers visit the queues in a fixed rotation, from the highest-priority
+    queue down, and give each visit `queue_quanta[i]`. Empty queues still take a turn, and the share
+    of each queue depends on how the rotation lines up with the bursts. With a DeficitRoundRobin
+    policy (the `policy` argument of the schedulers), the queues are served by weight instead:
+
+    - Each queue has a weight and gets `quantum * weight` units per round, plus its deficit: the part
+    of its budget it could not use in the previous round (e.g., its tasks were waiting on dependencies),
+    at most one quantum. A queue that runs out of tasks loses its deficit, as in deficit round robin.
+
+    - Only the active (non-empty) queues are in the rotation (a deque), so empty queues never take a turn.
+    The schedulers do not tell the policy when an idle queue receives tasks (arrival, demotion, aging...),
+    so each selection checks the idle queues: it costs O(number of idle queues), O(1) while every queue has tasks.
+
+    - Under load, queue i gets `weight[i] / sum(weights)` of the CPU over each round, whatever
+    the burst times. `report` prints the time each queue got.
+
+    The state of the policy is not saved in checkpoints: a resumed run starts a new rotation.
+"""
+from collections import deque
+
+
+class DeficitRoundRobin:
+
+    def __init__(self, weights, quantum=10):
+        """
+        Initialize the policy.
+
+        Args:
+            weights (list): The weight of each queue (positive integers), lowest-priority queue first
+            quantum (int, optional): The time a queue of weight 1 gets per round. Defaults to 10.
+        """
+        if quantum <= 0 or any(weight <= 0 for weight in weights):
+            raise ValueError(f"Weights and quantum must be positive: {weights}, {quantum}")
+        self.weights = list(weights)
+        self.quanta = [quantum * weight for weight in weights]
+        self.deficits = [0] * len(weights)
+        self.budgets = list(self.quanta)  # Time of the current visit of each queue, read by the schedulers
+        self.served = [0] * len(weights)  # Total time given to each queue
+        self.active = deque()  # Rotation of the non-empty queues; the first one is being visited
+        self.idle = list(range(len(weights) - 1, -1, -1))  # Queues out of the rotation (at first, all of them, top down)
+        self.current = len(weights) - 1
+        self.start = 0
+
+    def select(self, queues, clock):
+        """
+        Start a queue visit: return the queue to visit and set its budget in `budgets`.
+        O(number of idle queues): the idle queues that received tasks join the rotation first.
+
+        Parameters:
+            queues (list): The queues of the scheduler
+            clock (int): The current time
+
+        Returns:
+            int: The queue to visit (an empty queue if no queue has tasks).
+        """
+        if len(queues) != len(self.weights):
+            raise ValueError(f"{len(self.weights)} weights given for {len(queues)} queues")
+        if self.idle:
+            joined = [level for level in self.idle if queues[level]]
+            if joined:
+                self.active.extend(joined)
+                self.idle = [level for level in self.idle if not queues[level]]
+        if self.active:
+            self.current = self.active[0]
+        self.budgets[self.current] = self.deficits[self.current] + self.quanta[self.current]
+        self.start = clock
+        return self.current
+
+    def charge(self, queues, clock):
+        """
+        End the queue visit started by `select`: carry the unused budget over, and move the queue
+        to the end of the rotation, or out of it if it is empty.
+
+        Parameters:
+            queues (list): The queues of the scheduler
+            clock (int): The current time
+        """
+        if not self.active or self.active[0] != self.current:
+            return
+        level = self.active.popleft()
+        used = clock - self.start
+        self.served[level] += used
+        if queues[level]:
+            self.deficits[level] = min(max(0, self.budgets[level] - used), self.quanta[level])
+            self.active.append(level)
+        else:
+            self.deficits[level] = 0
+            self.idle.append(level)
+
+    def report(self):
+        """
+        Print the time given to each queue and its share of the CPU.
+        """
+        total = sum(self.served)
+        for level in range(len(self.weights) - 1, -1, -1):
+            share = self.served[level] / total if total else 0.0
+            print(f"Queue {level}: weight {self.weights[level]}, {self.served[level]} units ({share:.1%})")
+
+
+if __name__ == "__main__":
+    from multi_queue_round_robin import multi_queue_round_robin_scheduler
+    from tasks import Task
+    from tasks import create_queues
+
+    # Example: while both queues have tasks, Queue 1 runs for 12 units for every 4 units of Queue 0
+    tasks = [
+        Task("Task1", priority=2, burst_time=20),
+        Task("Task2", priority=3, burst_time=20),
+        Task("Task3", priority=8, burst_time=30),
+        Task("Task4", priority=9, burst_time=30),
+    ]
+    priority_ranges = [(1, 5), (6, 10)]
+    queues = create_queues(tasks, priority_ranges)
+    policy = DeficitRoundRobin(weights=[1, 3], quantum=4)
+    multi_queue_round_robin_scheduler(queues, [4, 12], task_quantum=4, policy=policy)
+    policy.report()
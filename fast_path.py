@@ -0,0 +1,108 @@
+"""
+    Analytic fast path of the multi-queue SJF scheduler.
+
+    The SJF scheduler sorts its queue at every visit and advances one Python-level slice at a time,
+    so a large batch costs O(visits * n log n). When no task exceeds the task quantum of its queue,
+    the run is deterministic and the queues do not interact, so it is computed in bulk with NumPy instead:
+
+    - The tasks of a queue run in the order of the first sort (stable, by burst time). A task cut short
+    by the end of the queue quantum keeps the rest of its burst, which is not longer than the bursts
+    after it, so it stays first and resumes in the next visit. Each queue therefore works through
+    the cumulative burst times of its tasks: visit k covers the units [k * quantum, (k + 1) * quantum),
+    and a task is split into one time slice per visit it spans, with cumulative sums and no search.
+
+    - The queues are visited in the fixed rotation, from the highest-priority queue down, so
+    the start time of every visit is the cumulative sum of the visit durations in that order,
+    and the completion time of a task is the start of its last visit plus its end in that visit.
+
+    - The trace, the remaining burst times, the completion flags and the completion times are
+    the same as with the stepped loop.
+
+    The scheduler steps when a task exceeds its task quantum (tasks would interleave), with cancellations
+    or a queue policy, and for small runs (fewer than MIN_TASKS tasks), where importing NumPy costs more
+    than the loop. The FIFO scheduler does not use the fast path: its loop is already O(1) per slice,
+    and writing the trace and the completion times of the tasks costs as much.
+"""
+from operator import attrgetter
+
+MIN_TASKS = 2048
+
+
+def run_without_preemption(queues, queue_quanta, task_quanta, key=None):
+    """
+    Run the queues to completion analytically, if no task exceeds the task quantum of its queue.
+
+    Parameters:
+        queues (list): The deques of the scheduler
+        queue_quanta (list): The time quantum of each queue
+        task_quanta (list): The task quantum of each queue
+        key (callable, optional): Sort key of the tasks of a queue (stable sort), e.g. the burst time for SJF.
+            Defaults to None (the tasks run in the order of their queue).
+
+    Returns:
+        bool: True if the queues were run (they are left empty), False if the scheduler must step.
+    """
+    if sum(map(len, queues)) < MIN_TASKS or any(quantum <= 0 for quantum in queue_quanta):
+        return False
+    orders, burst_lists = [], []  # Tasks of each queue in the order they run, and their burst times
+    for level, queue in enumerate(queues):
+        tasks = list(queue) if key is None else sorted(queue, key=key)
+        bursts = list(map(attrgetter("burst_time"), tasks))
+        if max(bursts, default=0) > task_quanta[level] or any(map(attrgetter("cancelled"), tasks)):
+            return False  # Tasks would interleave (or be dropped): step
+        orders.append(tasks)
+        burst_lists.append(bursts)
+
+    import numpy as np
+
+    queue_count = len(queues)
+    slices = []  # Per queue: (task of each slice, visit, length and end in its visit of each slice, visit durations)
+    for level, tasks in enumerate(orders):
+        bursts = np.array(burst_lists[level], dtype=np.int64)
+        ends = np.cumsum(bursts)
+        starts = ends - bursts
+        quantum = queue_quanta[level]
+
+        first_visit = starts // quantum
+        last_visit = np.maximum(ends - 1, starts) // quantum  # A task without burst runs in the visit it starts
+        counts = last_visit - first_visit + 1  # Slices of each task
+        task = np.repeat(np.arange(len(tasks)), counts)
+        visit = first_visit[task] + np.arange(len(task)) - np.repeat(np.cumsum(counts) - counts, counts)
+        slice_ends = np.minimum(ends[task], (visit + 1) * quantum)
+        lengths = slice_ends - np.maximum(starts[task], visit * quantum)
+        visit_count = int(last_visit[-1]) + 1 if len(tasks) else 0
+        durations = np.minimum(quantum, ends[-1] - np.arange(visit_count) * quantum) if len(tasks) else ends
+        slices.append((task, visit, lengths, slice_ends - visit * quantum, durations))
+
+    # Visit start times, in the rotation order: round by round, highest-priority queue first
+    rounds = max(len(durations) for *_, durations in slices)
+    table = np.zeros((rounds, queue_count), dtype=np.int64)  # Column c is Queue queue_count - 1 - c
+    for level, (*_, durations) in enumerate(slices):
+        table[:len(durations), queue_count - 1 - level] = durations
+    visit_starts = (np.cumsum(table) - table.ravel()).reshape(table.shape)
+
+    offsets = np.cumsum([0] + [len(tasks) for tasks in orders])
+    tasks = [task for queue_tasks in orders for task in queue_tasks]
+    task = np.concatenate([queue_task + offsets[level] for level, (queue_task, *_) in enumerate(slices)])
+    levels = np.concatenate([np.full(len(queue_task), level) for level, (queue_task, *_) in enumerate(slices)])
+    visit = np.concatenate([queue_visit for _, queue_visit, *_ in slices])
+    lengths = np.concatenate([queue_lengths for _, _, queue_lengths, *_ in slices])
+    times = np.concatenate([visit_starts[queue_visit, queue_count - 1 - level] + queue_ends
+                            for level, (_, queue_visit, _, queue_ends, _) in enumerate(slices)])
+    order = np.lexsort((np.arange(len(task)), -levels, visit))  # Execution order
+    completing = np.append(task[1:] != task[:-1], True)  # Last slice of each task
+
+    task, levels, lengths, times, completing = (
+        array[order].tolist() for array in (task, levels, lengths, times, completing))
+    middles = [f" (Queue {level}) executed for " for level in range(queue_count)]
+    if task:
+        print("\n".join([f"Task {tasks[i].name}{middles[level]}{length} units{' and completed' if last else ''}"
+                         for i, level, length, last in zip(task, levels, lengths, completing)]))
+    for i, completion_time, last in zip(task, times, completing):
+        if last:
+            tasks[i].burst_time = 0
+            tasks[i].completed = True
+            tasks[i].completion_time = completion_time
+    for queue in queues:
+        queue.clear()
+    return True
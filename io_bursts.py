@@ -0,0 +1,107 @@
+"""
+    CPU/I-O burst alternation with blocked-state tracking.
+
+    A task can alternate CPU bursts and I/O bursts (see `Task.io_bursts`).
+    When the current CPU burst of a task finishes and the task has an I/O burst pending,
+    the task leaves its queue and enters the blocked set, so the scheduler can give the CPU
+    to another task while it waits on I/O.
+
+    - The BlockedSet is a timer wheel keyed by the time at which each I/O burst finishes.
+    Blocking a task costs O(1), and tasks are woken up in amortized O(1).
+
+    - A woken task goes back to the queue it was in when it blocked (it is not demoted,
+    since it gave up the CPU before using its quantum). This is what keeps interactive,
+    I/O-bound tasks in the high-priority queues of the MLFQ and SVR2 schedulers.
+
+    - The BlockedSet also accounts for CPU busy time, I/O busy time (time with at least one
+    blocked task) and their overlap, which `report` prints at the end of a run.
+"""
+from tasks import Task
+from tasks import create_queues
+from tasks import enqueue
+from timer_wheel import TimerWheel
+
+
+class BlockedSet(TimerWheel):
+
+    def __init__(self, start_time=0):
+        """
+        Initialize an empty blocked set.
+
+        Args:
+            start_time (int, optional): The current (virtual) time. Defaults to 0.
+        """
+        super().__init__(priority_ranges=None, start_time=start_time)
+        self.home = {}  # task -> index of the queue the task returns to
+        self.cpu_busy = 0  # Time the CPU spent running tasks
+        self.io_busy = 0  # Time with at least one task blocked on I/O
+        self.overlap = 0  # Time with the CPU busy while at least one task is blocked on I/O
+        self.io_covered_until = start_time  # End of the union of the I/O intervals seen so far
+
+    def block(self, task, queue_index, now):
+        """
+        Block a task on its next I/O burst.
+
+        Parameters:
+            task (Task): The task whose CPU burst just finished
+            queue_index (int): The queue the task returns to when the I/O burst finishes
+            now (int): The current (virtual) time
+
+        Returns:
+            int: The time at which the task is woken up.
+        """
+        until = now + task.start_io()
+        self.home[task] = queue_index
+        self.insert(task, until)
+
+        # I/O intervals start at the current time, so their union is tracked with a single end point
+        self.io_busy += max(0, until - max(now, self.io_covered_until))
+        self.io_covered_until = max(self.io_covered_until, until)
+        return until
+
+    def record_cpu(self, start, execution_time):
+        """
+        Account for a CPU slice [start, start + execution_time).
+
+        Parameters:
+            start (int): The (virtual) time at which the slice started
+            execution_time (int): The length of the slice
+        """
+        self.cpu_busy += execution_time
+        # Every I/O interval known so far started at or before `start`
+        self.overlap += max(0, min(start + execution_time, self.io_covered_until) - start)
+
+    def report(self, clock):
+        """
+        Print the CPU utilization and the CPU/I-O overlap of the run.
+
+        Parameters:
+            clock (int): The (virtual) time at the end of the run
+        """
+        utilization = self.cpu_busy / clock if clock else 0.0
+        print(f"Elapsed time: {clock} units")
+        print(f"CPU busy: {self.cpu_busy} units (utilization {utilization:.1%})")
+        print(f"I/O busy: {self.io_busy} units")
+        print(f"CPU and I/O overlap: {self.overlap} units")
+
+    def _route(self, queues, task):
+        # Woken tasks return to the queue they blocked in
+        enqueue(queues[self.home.pop(task)], task)
+
+
+if __name__ == "__main__":
+    from multilevel_feedback_queue import multilevel_feedback_queue
+
+    # Example: Task1 and Task4 are interactive (short CPU bursts followed by I/O)
+    tasks = [
+        Task("Task1", priority=8, burst_time=2, io_bursts=[(6, 2), (6, 2)]),
+        Task("Task2", priority=8, burst_time=20),
+        Task("Task3", priority=4, burst_time=5),
+        Task("Task4", priority=1, burst_time=3, io_bursts=[(10, 3)]),
+        Task("Task5", priority=5, burst_time=8)
+    ]
+
+    priority_ranges = [(1, 3), (4, 6), (7, 10)]
+    queues = create_queues(tasks, priority_ranges)
+
+    multilevel_feedback_queue(queues, [6, 8, 10], 4, blocked=BlockedSet())
@@ -0,0 +1,118 @@
+"""
+    Summary metrics of a finished run.
+
+    The schedulers record the completion time of each task (`Task.completion_time`),
+    so the metrics are computed from the tasks after the run, without parsing the trace:
+
+    - Turnaround time: completion time minus arrival time.
+
+    - Waiting time: turnaround time minus the time the task spent running or blocked on I/O.
+
+    - Makespan: the completion time of the last task.
+
+    - Percentiles: `latency_histograms` records the turnaround and waiting times of each queue
+    (the queue each task was admitted to, whatever its final priority) in log-bucketed histograms
+    (see latency_histogram.py), so the tail latencies of large runs are read without keeping
+    and sorting every value.
+"""
+from tasks import find_queue
+
+
+def summarize(tasks):
+    """
+    Compute the summary metrics of a run.
+
+    Parameters:
+        tasks (list): Every task of the run
+
+    Returns:
+        dict: The number of tasks, completed and cancelled tasks, the makespan, and the average and
+        maximum turnaround and waiting times of the completed tasks.
+    """
+    turnaround = []
+    waiting = []
+    for task in tasks:
+        if task.completion_time is None:
+            continue
+        elapsed = task.completion_time - task.arrival_time
+        io_time = sum(io for io, _ in task.io_bursts)
+        turnaround.append(elapsed)
+        waiting.append(elapsed - task.total_burst_time - io_time)
+
+    completed = len(turnaround)
+    return {
+        "tasks": len(tasks),
+        "completed": completed,
+        "cancelled": sum(1 for task in tasks if task.cancelled),
+        "makespan": max((task.completion_time for task in tasks if task.completion_time is not None), default=0),
+        "average_turnaround": sum(turnaround) / completed if completed else 0.0,
+        "max_turnaround": max(turnaround, default=0),
+        "average_waiting": sum(waiting) / completed if completed else 0.0,
+        "max_waiting": max(waiting, default=0),
+    }
+
+
+def latency_histograms(tasks, priority_ranges=None, precision=7):
+    """
+    Record the turnaround and waiting times of the completed tasks in one histogram per queue.
+
+    Parameters:
+        tasks (list): Every task of the run
+        priority_ranges (list, optional): The (low, high) priority range of each queue; a task counts
+            in the queue it was admitted to (`task.admitted_queue`), or else in the queue of its priority.
+            Defaults to None (one histogram for every task).
+        precision (int, optional): The precision of the histograms. Defaults to 7.
+
+    Returns:
+        dict: "turnaround" and "waiting": a list of LatencyHistogram objects, one per queue.
+    """
+    from latency_histogram import LatencyHistogram
+
+    queue_count = len(priority_ranges) if priority_ranges else 1
+    histograms = {kind: [LatencyHistogram(precision) for _ in range(queue_count)] for kind in ("turnaround", "waiting")}
+    for task in tasks:
+        if task.completion_time is None:
+            continue
+        i = 0
+        if priority_ranges:
+            i = getattr(task, "admitted_queue", None)  # Missing on tasks built without the constructor
+            if i is None:
+                i = find_queue(task, priority_ranges)
+        if i is None:
+            continue
+        elapsed = task.completion_time - task.arrival_time
+        io_time = sum(io for io, _ in task.io_bursts)
+        histograms["turnaround"][i].record(elapsed)
+        histograms["waiting"][i].record(max(0, elapsed - task.total_burst_time - io_time))
+    return histograms
+
+
+def print_percentiles(histograms, qs=(50, 90, 99, 99.9)):
+    """
+    Print the percentiles of the histograms of each queue (highest-priority queue first).
+
+    Parameters:
+        histograms (dict): The histograms returned by `latency_histograms`
+        qs (tuple, optional): The percentiles. Defaults to (50, 90, 99, 99.9).
+    """
+    for kind, queue_histograms in histograms.items():
+        for i in range(len(queue_histograms) - 1, -1, -1):
+            histogram = queue_histograms[i]
+            values = ", ".join(f"p{q} {value}" for q, value in histogram.percentiles(qs).items())
+            print(f"Queue {i} {kind}: {values} ({histogram.count} tasks)")
+
+
+def print_summary(summary):
+    """
+    Print the metrics computed by `summarize`, one per line.
+
+    Parameters:
+        summary (dict): The metrics
+    """
+    for key, value in summary.items():
+        if key == "histograms":
+            continue  # See print_percentiles
+        if isinstance(value, float):
+            print(f"{key}: {value:.2f}")
+        else:
+            print(f"{key}: {value}")
@@ -13,20 +13,28 @@
     - Each task includes a list of dependencies (other task names).
     A task can only run if all its dependencies are completed.
     The can_run function checks whether a task's dependencies are satisfied
-    by comparing them with the completed_tasks set.
+    by looking them up in a TaskIndex.
 
-    - The scheduler maintains a completed_tasks set to track tasks that have finished
-    execution. Once a task is completed, its name is added to completed_tasks,
-    enabling dependent tasks to become runnable.
+    - The scheduler maintains a TaskIndex, which interns the task names to integer IDs
+    and tracks the tasks that have finished execution in a bool array.
+    Once a task is completed, it is marked in the index, enabling dependent tasks to become runnable.
 
     - Tasks in each queue are processed using lottery scheduling,
     but only tasks with satisfied dependencies are considered for the lottery draw.
+
+    - The winning tickets are drawn from a LotteryRNG: a seeded NumPy generator that draws
+    uniform variates in blocks, so runs are reproducible and a draw costs no RNG call.
+    Without it, the draws use the global `random` module.
 """
+import itertools
 import random
 from collections import deque
 
 from tasks import Task
 from tasks import create_queues
+from cancellation import drop_cancelled
+from task_index import TaskIndex
+from task_index import report_stalled
 
 
 class TaskLottery(Task):
@@ -46,7 +54,50 @@ class TaskLottery(Task):
         self.tickets = tickets  # Number of tickets assigned to the task
 
 
-def draw_lottery(tasks):
+class LotteryRNG:
+
+    def __init__(self, seed=None, block_size=65536, generator=None):
+        """
+        Initialize the source of the lottery draws.
+
+        `random()` returns the next uniform variate in [0, 1). The variates are drawn by NumPy in blocks
+        and read through a C-level iterator, so a draw runs no Python code.
+
+        Args:
+            seed (int, optional): The seed of the draws. Defaults to None (fresh entropy, not reproducible).
+            block_size (int, optional): The maximum number of variates drawn at once. Defaults to 65536.
+                The blocks start small and double, so short runs do not pay for a large block.
+            generator (numpy.random.Generator, optional): The generator to draw from. Defaults to a new
+                generator seeded with `seed`.
+        """
+        if generator is None:
+            import numpy as np
+
+            generator = np.random.default_rng(seed)
+        self.generator = generator
+        self.block_size = block_size
+        self.random = itertools.chain.from_iterable(self._blocks()).__next__
+
+    def _blocks(self):
+        size = min(256, self.block_size)
+        while True:
+            yield self.generator.random(size).tolist()  # Python floats are read fastest
+            size = min(2 * size, self.block_size)
+
+    def winning_ticket(self, total_tickets):
+        """
+        Draw a ticket uniformly from 1 to total_tickets.
+
+        Parameters:
+            total_tickets (int): The number of tickets
+
+        Returns:
+            int: The winning ticket.
+        """
+        return int(self.random() * total_tickets) + 1  # Below total_tickets + 1 for any total under 2**53
+
+
+def draw_lottery(tasks, rng=None):
     """
     Select a task randomly based on ticket distribution.
 
@@ -61,6 +112,7 @@ def draw_lottery(tasks):
 
     Parameters:
         tasks (list): A list of TaskL objects participating in the lottery.
+        rng (LotteryRNG, optional): The source of the winning ticket. Defaults to the global `random` module.
 
     Returns:
         TaskL or None: The task selected by the lottery, or None if there are no tickets.
@@ -69,14 +121,17 @@ def draw_lottery(tasks):
     total_tickets = sum(task.tickets for task in tasks)
     if total_tickets == 0:
         return None  # No tickets left to draw
-    winning_ticket = random.randint(1, total_tickets)
+    if rng is None:
+        winning_ticket = random.randint(1, total_tickets)
+    else:
+        winning_ticket = int(rng.random() * total_tickets) + 1  # Inlined winning_ticket
     cumulative_tickets = 0
     for task in tasks:
         cumulative_tickets += task.tickets
         if cumulative_tickets >= winning_ticket:
             return task
 
-def can_run(task, completed_tasks):
+def can_run(task, index):
     """
     Check if a task is ready to run based on its dependencies and burst time remaining.
 
@@ -85,18 +140,18 @@ def can_run(task, completed_tasks):
 
     Parameters:
         task (TaskL): The task to check
-        completed_tasks (set): A set of task names representing completed tasks
+        index (TaskIndex): The index tracking the completed tasks
 
     Returns:
         bool: True if the task is ready to run, False otherwise
     """
 
-    all_ok = all([x in completed_tasks for x in  task.dependencies])
-    return all_ok and task.burst_time > 0
+    return task.burst_time > 0 and index.can_run(task)
 
 
 
-def multi_queue_lottery_scheduler_with_dependencies(queues, queue_quanta, task_quantum):
+def multi_queue_lottery_scheduler_with_dependencies(queues, queue_quanta, task_quantum, cancellations=None, policy=None,
+                                                     rng=None):
     """
     Multi-queue lottery scheduler considering dependencies between tasks.
 
@@ -111,19 +166,34 @@ def multi_queue_lottery_scheduler_with_dependencies(queues, queue_quanta, task_q
     - queues (list): A list of lists of TaskL objects, where each sublist represents a queue
     - queue_quanta (list): A list of time quanta for each queue
     - task_quantum (int): Time allocated to each task per turn
+    - cancellations (CancellationIndex, optional): Index used to cancel or expire tasks while they are queued
+    - policy (DeficitRoundRobin, optional): Serves the queues by weight instead of the fixed rotation (see fair_share.py)
+      If given, `queue_quanta` is ignored
+    - rng (LotteryRNG, optional): The source of the winning tickets, seeded for reproducible runs.
+      Defaults to the global `random` module
 
     Returns:
         None
     """
-    # Map tasks by name for easy lookup and assign them to their respective queues
-    task_map = {task.name: task for tasks in queues for task in tasks}
-    completed_tasks = set()
+    # Intern the task names to integer IDs and track the completed tasks by ID
+    index = TaskIndex([task for queue in queues for task in queue])
+    index.validate()  # Missing dependencies and cycles fail now, instead of blocking the run forever
 
     print("Execution Order:")
     queue_count = len(queues)
     current_queue = queue_count - 1  # Start with the last queue (more priority)
+    clock = 0  # Elapsed (virtual) time
 
+    if policy is not None:
+        queue_quanta = policy.budgets  # Set by the policy before each visit
+
+    stalled_visits = 0  # Consecutive queue visits that ran no task
     while any(queues):  # Continue until all queues are empty
+        queued, visit_clock = sum(map(len, queues)), clock
+        if policy is not None:
+            current_queue = policy.select(queues, clock)  # Next active queue, by weight
+        # The lottery scans the whole queue anyway, so tombstones are removed in the same pass
+        queues[current_queue] = drop_cancelled(queues[current_queue], current_queue)
         if queues[current_queue]:
             remaining_time = queue_quanta[current_queue]  # Quantum for the current queue
 
@@ -131,14 +201,14 @@ def multi_queue_lottery_scheduler_with_dependencies(queues, queue_quanta, task_q
                 # Create a list of runnable tasks from the current queue
                 runnable_tasks = [
                     task for task in queues[current_queue]
-                    if task.burst_time > 0 and can_run(task, completed_tasks)
+                    if not task.cancelled and can_run(task, index)
                 ]
 
                 if not runnable_tasks:
                     break
 
                 # Draw a lottery to select the next task
-                selected_task = draw_lottery(runnable_tasks)
+                selected_task = draw_lottery(runnable_tasks, rng)
                 if not selected_task:
                     break
 
@@ -147,16 +217,30 @@ def multi_queue_lottery_scheduler_with_dependencies(queues, queue_quanta, task_q
                 print(f"Task {selected_task.name} (Queue {current_queue}) executed for {execution_time} units")
                 selected_task.burst_time -= execution_time
                 remaining_time -= execution_time
+                clock += execution_time
 
                 if selected_task.burst_time == 0:
-                    selected_task.completed = True
-                    completed_tasks.add(selected_task.name)
+                    index.mark_completed(selected_task)
+                    selected_task.completion_time = clock
                     print(f"Task {selected_task.name} has completed")
                     queues[current_queue].remove(selected_task)
                 else:
                     # Move the task to the back of the queue for fairness
                     queues[current_queue].remove(selected_task)
                     queues[current_queue].append(selected_task)
+                if cancellations is not None:
+                    cancellations.expire(clock)
+        if policy is not None:
+            policy.charge(queues, clock)  # Carry the unused time over
+        if clock == visit_clock and sum(map(len, queues)) == queued:
+            stalled_visits += 1
+            if stalled_visits >= queue_count:  # A round of visits ran nothing: can a queued task still run?
+                if not index.any_runnable(queues, lambda task: task.tickets > 0):
+                    report_stalled(queues)
+                    break
+                stalled_visits = 0
+        else:
+            stalled_visits = 0
         # Move to the next queue
         current_queue = (current_queue - 1)
         if current_queue < 0:
@@ -193,4 +277,5 @@ if __name__ == "__main__":
     # Create queues
     queues = create_queues(tasks, priority_ranges)
 
-    multi_queue_lottery_scheduler_with_dependencies(queues, queue_quanta, task_quantum)
+    # Seeded draws: every run gives the same execution order
+    multi_queue_lottery_scheduler_with_dependencies(queues, queue_quanta, task_quantum, rng=LotteryRNG(seed=42))
@@ -11,9 +11,10 @@ from collections import deque
 
 from tasks import Task
 from tasks import create_queues
+from cancellation import report_dropped
 
 
-def multi_queue_round_robin_scheduler(queues, queue_quanta, task_quantum):
+def multi_queue_round_robin_scheduler(queues, queue_quanta, task_quantum, cancellations=None, arrivals=None, policy=None):
     """
     Multi-queue round robin scheduler.
 
@@ -21,6 +22,10 @@ def multi_queue_round_robin_scheduler(queues, queue_quanta, task_quantum):
     - queues (list): A list of lists of Task objects, where each sublist represents a queue
     - queue_quanta (list): A list of time quanta for each queue
     - task_quantum (int): Time allocated to each task per turn
+    - cancellations (CancellationIndex, optional): Index used to cancel or expire tasks while they are queued
+    - arrivals (TimerWheel, optional): Tasks that have not arrived yet, released into the queues when due
+    - policy (DeficitRoundRobin, optional): Serves the queues by weight instead of the fixed rotation (see fair_share.py)
+      If given, `queue_quanta` is ignored
 
     Returns:
         None
@@ -28,20 +33,45 @@ def multi_queue_round_robin_scheduler(queues, queue_quanta, task_quantum):
     print("Execution Order:")
     queue_count = len(queues)
     current_queue = queue_count - 1  # Start with the last queue (more priority)
+    clock = 0  # Elapsed (virtual) time
 
-    while any(queues):  # Continue until all queues are empty
+    if arrivals is not None:
+        arrivals.release(clock, queues)  # Tasks that arrive at the start
+
+    if policy is not None:
+        queue_quanta = policy.budgets  # Set by the policy before each visit
+
+    while any(queues) or arrivals:  # Continue until all queues are empty and every task has arrived
+        if not any(queues):
+            clock = arrivals.release_next(queues)  # Idle until the next arrival
+            print(f"Idle until time {clock}")
+        if policy is not None:
+            current_queue = policy.select(queues, clock)  # Next active queue, by weight
         if queues[current_queue]:
             remaining_time = queue_quanta[current_queue]  # Quantum for the current queue
             while remaining_time > 0 and queues[current_queue]:
                 task = queues[current_queue].popleft()
+                if task.cancelled:
+                    report_dropped(task, current_queue)  # Lazy deletion of the tombstone
+                    continue
 
                 execution_time = min(task.burst_time, task_quantum, remaining_time)
                 print(f"Task {task.name} (Queue {current_queue}) executed for {execution_time} units")
                 task.burst_time -= execution_time
                 remaining_time -= execution_time
+                clock += execution_time
 
                 if task.burst_time > 0:
                     queues[current_queue].append(task)
+                else:
+                    task.completed = True
+                    task.completion_time = clock
+                if cancellations is not None:
+                    cancellations.expire(clock)
+                if arrivals is not None:
+                    arrivals.release(clock, queues)
+        if policy is not None:
+            policy.charge(queues, clock)  # Carry the unused time over
         # Move to the next queue
         current_queue = (current_queue - 1)
         if current_queue < 0:
@@ -2,9 +2,11 @@ from collections import deque
 
 from tasks import Task
 from tasks import create_queues
+from cancellation import report_dropped
+from fast_path import run_without_preemption
 
 
-def multi_queue_sjf_scheduler(queues, queue_quanta, task_quantum):
+def multi_queue_sjf_scheduler(queues, queue_quanta, task_quantum, cancellations=None, policy=None):
     """
     Shortest Job First (SJF) Multi-Queue Scheduler.
 
@@ -18,7 +20,10 @@ def multi_queue_sjf_scheduler(queues, queue_quanta, task_quantum):
     Parameters:
         queues (list): A list of deques, each containing Task objects. Each deque represents a queue.
         queue_quanta (list): A list of time quanta for each queue.
-        task_quantum (int): Maximum time allocated to each task per turn.
+        task_quantum (int or list): Maximum time allocated to each task per turn, or a list with the time of each queue.
+        cancellations (CancellationIndex, optional): Index used to cancel or expire tasks while they are queued.
+        policy (DeficitRoundRobin, optional): Serves the queues by weight instead of the fixed rotation (see fair_share.py).
+            If given, `queue_quanta` is ignored.
 
     Returns:
         None
@@ -27,8 +32,21 @@ def multi_queue_sjf_scheduler(queues, queue_quanta, task_quantum):
     print("Execution Order:")
     queue_count = len(queues)
     current_queue = queue_count - 1  # Start with the last queue (more priority)
+    clock = 0  # Elapsed (virtual) time
+
+    task_quanta = task_quantum if isinstance(task_quantum, (list, tuple)) else [task_quantum] * queue_count
+    if len(task_quanta) != queue_count:
+        raise ValueError(f"{len(task_quanta)} task quanta given for {queue_count} queues")
+    if cancellations is None and policy is None and run_without_preemption(queues, queue_quanta, task_quanta,
+                                                                            key=lambda t: t.burst_time):
+        return  # No task is preempted, so the first sort holds for the whole run: run analytically (see fast_path.py)
+
+    if policy is not None:
+        queue_quanta = policy.budgets  # Set by the policy before each visit
 
     while any(queues):  # Continue until all queues are empty
+        if policy is not None:
+            current_queue = policy.select(queues, clock)  # Next active queue, by weight
         if queues[current_queue]:
             # Sort the queue by burst time for SJF scheduling (shortest job first)
             # Note: This is a simple implementation. In a real-world scenario, you might want to consider other factors.
@@ -39,9 +57,12 @@ def multi_queue_sjf_scheduler(queues, queue_quanta, task_quantum):
             remaining_time = queue_quanta[current_queue]  # Quantum for the current queue
             while remaining_time > 0 and queues[current_queue]:
                 task = queues[current_queue].popleft()
+                if task.cancelled:
+                    report_dropped(task, current_queue)  # Lazy deletion of the tombstone
+                    continue
 
-                if task.burst_time > task_quantum:
-                    execution_time = min(task_quantum, remaining_time)
+                if task.burst_time > task_quanta[current_queue]:
+                    execution_time = min(task_quanta[current_queue], remaining_time)
                     print(f"Task {task.name} (Queue {current_queue}) executed for {execution_time} units")
                     task.burst_time -= execution_time
                     remaining_time -= execution_time
@@ -49,8 +70,21 @@ def multi_queue_sjf_scheduler(queues, queue_quanta, task_quantum):
                         queues[current_queue].append(task)
                 else:
                     execution_time = min(task.burst_time, remaining_time)
-                    print(f"Task {task.name} (Queue {current_queue}) executed for {execution_time} units and completed")
+                    task.burst_time -= execution_time
                     remaining_time -= execution_time
+                    if task.burst_time > 0:  # The queue quantum ran out mid-burst: resume the task first
+                        print(f"Task {task.name} (Queue {current_queue}) executed for {execution_time} units")
+                        queues[current_queue].appendleft(task)
+                    else:
+                        print(f"Task {task.name} (Queue {current_queue}) executed for {execution_time} units and completed")
+                        task.completed = True
+                clock += execution_time
+                if task.completed:
+                    task.completion_time = clock
+                if cancellations is not None:
+                    cancellations.expire(clock)
+        if policy is not None:
+            policy.charge(queues, clock)  # Carry the unused time over
         # Move to the next queue
         current_queue = (current_queue - 1)
         if current_queue < 0:
@@ -15,14 +15,60 @@ total amount of time the scheduler allocates to tasks in that queue during one p
 Tasks are initially placed in the highest-priority queue.
 If a task isn't completed within its allocated time, it is moved to a lower-priority queue.
 Tasks in lower-priority queues receive larger time quanta, reflecting their reduced priority.
+
+Demotion alone lets long tasks starve in the lowest queue. With a boost period, every task is
+periodically moved back to the highest-priority queue (priority boost). The boost works per queue,
+not per task: the non-empty queue closest to the top becomes the top queue (the queue objects
+are swapped, not copied), and the other queues are appended to it in bulk. Heaps are merged
+with a single heapify.
 """
+import heapq
 from collections import deque
 
 from tasks import Task
 from tasks import create_queues
+from cancellation import report_dropped
+from timer_wheel import wait_for_next
+from checkpoint import SchedulerState
 
 
-def multilevel_feedback_queue(queues, queue_quanta, task_quantum):
+def priority_boost(queues):
+    """
+    Move every task to the highest-priority queue (the last one).
+
+    The tasks keep their order, from the highest-priority queue to the lowest. The cost is
+    O(number of queues) plus a bulk copy of the tasks below the first non-empty queue;
+    heaps (from `create_priority_queues`) are restored with one heapify.
+
+    Parameters:
+        queues (list): The scheduler queues (deques or heaps), modified in place
+
+    Returns:
+        int: The number of tasks moved to the highest-priority queue.
+    """
+    top = len(queues) - 1
+    source = top
+    while source > 0 and not queues[source]:
+        source -= 1
+    moved = 0
+    if source != top:
+        # The first non-empty queue becomes the top queue, without copying it
+        queues[top], queues[source] = queues[source], queues[top]
+        moved += len(queues[top])
+    merged = queues[top]
+    for i in range(source - 1, -1, -1):
+        if queues[i]:
+            moved += len(queues[i])
+            merged.extend(queues[i])
+            queues[i].clear()
+    if not isinstance(merged, deque):
+        heapq.heapify(merged)
+    return moved
+
+
+def multilevel_feedback_queue(queues, queue_quanta, task_quantum, cancellations=None, arrivals=None, blocked=None,
+                              state=None, checkpointer=None, adaptive=None, sampler=None, boost_period=None,
+                              policy=None):
     """
     Simulates a Multilevel Feedback Queue (MLFQ) scheduling algorithm.
 
@@ -35,25 +81,79 @@ def multilevel_feedback_queue(queues, queue_quanta, task_quantum):
         queues (list of deques): A list of queues, where each queue is a deque of Task objects.
         queue_quanta (list of int): A list of time quanta for each queue.
         task_quantum (int): A maximum time allocated to any task in a single turn.
+        cancellations (CancellationIndex, optional): Index used to cancel or expire tasks while they are queued.
+        arrivals (TimerWheel, optional): Tasks that have not arrived yet, released into the queues when due.
+        blocked (BlockedSet, optional): Holds the tasks waiting on I/O (see `Task.io_bursts`).
+            A task that blocks before using its quantum returns to the same queue, it is not demoted.
+        state (SchedulerState, optional): The state to resume from (e.g., restored from a checkpoint).
+            If given, `queues` is ignored and the run continues from the state.
+        checkpointer (Checkpointer, optional): Called with the state between queue visits to save it periodically.
+        adaptive (AdaptiveQuanta, optional): Retunes the queue quanta and the per-queue task quanta online
+            from the observed CPU bursts. If given, `queue_quanta` and `task_quantum` are taken from it.
+        sampler (QueueSampler, optional): Records queue lengths, outstanding work and blocked tasks over time.
+        boost_period (int, optional): Every `boost_period` units of time, all the tasks are moved back to the
+            highest-priority queue, so no task starves. Defaults to None (no boost).
+        policy (DeficitRoundRobin, optional): Serves the queues by weight instead of the fixed rotation (see fair_share.py).
+            If given, `queue_quanta` is ignored.
 
     Returns:
         None
     """
     print("Execution Order:")
+    if state is None:
+        state = SchedulerState(queues)
+    state.arrivals, state.blocked = arrivals, blocked  # A checkpoint fails while they hold tasks
+    queues = state.queues
     queue_count = len(queues)
-    current_queue = queue_count - 1  # Start with the last queue (more priority)
-
-    while any(queues):  # Continue until all queues are empty
+    current_queue = state.current_queue  # Start with the last queue (more priority), unless resuming
+    clock = state.clock  # Elapsed (virtual) time
+    if adaptive is not None:
+        queue_quanta = adaptive.queue_quanta  # Updated in place by the tuner
+
+    if arrivals is not None:
+        arrivals.release(clock, queues)  # Tasks that arrive at the start
+    if sampler is not None:
+        sampler.start(queues, arrivals, blocked)
+    if boost_period is not None:
+        next_boost = (clock // boost_period + 1) * boost_period  # Boosts happen at multiples of the period
+
+    if policy is not None:
+        queue_quanta = policy.budgets  # Set by the policy before each visit
+
+    while any(queues) or arrivals or blocked:  # Continue until all queues are empty and every task has arrived
+        if boost_period is not None and clock >= next_boost:
+            moved = priority_boost(queues)
+            print(f"Priority boost at time {clock}: {moved} tasks moved to Queue {queue_count - 1}")
+            next_boost = (clock // boost_period + 1) * boost_period
+        if checkpointer is not None:
+            state.current_queue, state.clock = current_queue, clock
+            checkpointer(state)
+        state.visits += 1
+        if not any(queues):
+            clock = wait_for_next(clock, queues, arrivals, blocked)  # Idle until the next arrival or I/O completion
+            print(f"Idle until time {clock}")
+        if policy is not None:
+            current_queue = policy.select(queues, clock)  # Next active queue, by weight
         if queues[current_queue]:
             remaining_time = queue_quanta[current_queue]  # Quantum for the current queue
+            if adaptive is not None:
+                task_quantum = adaptive.task_quanta[current_queue]  # Retuned online
 
             while remaining_time > 0 and queues[current_queue]:
                 task = queues[current_queue].popleft()
+                if task.cancelled:
+                    report_dropped(task, current_queue)  # Lazy deletion of the tombstone
+                    continue
 
                 execution_time = min(task.burst_time, task_quantum, remaining_time)
                 print(f"Task {task.name} (Queue {current_queue}) executed for {execution_time} units")
                 task.burst_time -= execution_time
                 remaining_time -= execution_time
+                clock += execution_time
+                if blocked is not None:
+                    blocked.record_cpu(clock - execution_time, execution_time)
+                if adaptive is not None:
+                    adaptive.observe(current_queue, execution_time, task_quantum, burst_done=task.burst_time == 0)
 
                 # If the task is not completed, demote it to the next queue
                 if task.burst_time > 0:
@@ -63,12 +163,34 @@ def multilevel_feedback_queue(queues, queue_quanta, task_quantum):
                     else:
                         # If it's the lowest-priority queue, put it back in the same queue
                         queues[current_queue].append(task)
-
+                elif blocked is not None and task.has_pending_io():
+                    # The CPU burst finished: wait on I/O and come back to the same queue
+                    until = blocked.block(task, current_queue, clock)
+                    print(f"Task {task.name} (Queue {current_queue}) blocked on I/O until time {until}")
+                else:
+                    task.completed = True
+                    task.completion_time = clock
+                if cancellations is not None:
+                    cancellations.expire(clock)
+                if arrivals is not None:
+                    arrivals.release(clock, queues)
+                if blocked is not None:
+                    blocked.release(clock, queues)
+                if sampler is not None:
+                    sampler.record(clock, queues, execution_time, len(blocked) if blocked is not None else 0)
+
+        if policy is not None:
+            policy.charge(queues, clock)  # Carry the unused time over
         # Move to the next queue
         current_queue = (current_queue - 1)
         if current_queue < 0:
             current_queue = queue_count - 1
 
+    if blocked is not None:
+        blocked.report(clock)
+    if adaptive is not None:
+        adaptive.report()
+
 
 if __name__ == "__main__":
     # Example
@@ -2,30 +2,41 @@ import heapq
 
 from tasks import Task
 from tasks import create_priority_queues
+from cancellation import report_dropped
 
 
 
 """
 a heapq priority queue is used to manage tasks based on their priority. The priority queue ensures that tasks with higher priority are processed first. After executing a task for the time quantum, if the task isn't finished, it is reinserted into the priority queue for further processing
 """
-def priority_based(queues, queue_quanta, task_quantum, reinsert=True):
+def priority_based(queues, queue_quanta, task_quantum, reinsert=True, cancellations=None, policy=None):
     print("Execution Order {}:".format("with task reinsertion" if reinsert else "without task reinsertion"))
 
     queue_count = len(queues)
     current_queue = queue_count - 1  # Start with the last queue (more priority)
+    clock = 0  # Elapsed (virtual) time
+
+    if policy is not None:
+        queue_quanta = policy.budgets  # Set by the policy before each visit
 
     while any(queues):  # Continue until all queues are empty
+        if policy is not None:
+            current_queue = policy.select(queues, clock)  # Next active queue, by weight
+        task_to_reinsert = []  # Reset on every visit, also to an empty queue
         if queues[current_queue]:
             remaining_time = queue_quanta[current_queue]  # Quantum for the current queue
 
-            task_to_reinsert = []
             while remaining_time > 0 and queues[current_queue]:
                 task = heapq.heappop(queues[current_queue])
+                if task.cancelled:
+                    report_dropped(task, current_queue)  # Lazy deletion of the tombstone
+                    continue
 
                 execution_time = min(task.burst_time, task_quantum, remaining_time)
                 print(f"Task {task.name} (Queue {current_queue}) executed for {execution_time} units")
                 task.burst_time -= execution_time
                 remaining_time -= execution_time
+                clock += execution_time
 
                 if task.burst_time > 0:
                     if reinsert:
@@ -33,12 +44,18 @@ def priority_based(queues, queue_quanta, task_quantum, reinsert=True):
                     else:
                         task_to_reinsert.append(task)
                 else:
+                    task.completed = True
+                    task.completion_time = clock
                     print(f"Task {task.name} completed")
+                if cancellations is not None:
+                    cancellations.expire(clock)
 
         if len(task_to_reinsert) > 0:
             for task in task_to_reinsert:
                 heapq.heappush(queues[current_queue], task)
 
+        if policy is not None:
+            policy.charge(queues, clock)  # Carry the unused time over
         # Move to the next queue
         current_queue = (current_queue - 1)
         if current_queue < 0:
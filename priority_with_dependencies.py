@@ -2,7 +2,9 @@ import heapq
 
 from tasks import Task
 from tasks import create_priority_queues
-from utils import can_run
+from task_index import TaskIndex
+from task_index import report_stalled
+from cancellation import report_dropped
 
 
 
@@ -12,26 +14,39 @@ The priority queue ensures that tasks with higher priority are processed first,
 After executing a task for the time quantum, if the task isn't finished,
 it is reinserted into the priority queue for further processing
 """
-def priority_based(queues, queue_quanta, task_quantum, reinsert=True):
-    completed_tasks = set()  # Keep track of completed tasks
+def priority_based(queues, queue_quanta, task_quantum, reinsert=True, cancellations=None, policy=None):
+    index = TaskIndex([task for queue in queues for task in queue])  # Keep track of completed tasks by ID
+    index.validate()  # Missing dependencies and cycles fail now, instead of blocking the run forever
     print("Execution Order {}:".format("with task reinsertion" if reinsert else "without task reinsertion"))
 
     queue_count = len(queues)
     current_queue = queue_count - 1  # Start with the last queue (more priority)
+    clock = 0  # Elapsed (virtual) time
 
+    if policy is not None:
+        queue_quanta = policy.budgets  # Set by the policy before each visit
+
+    stalled_visits = 0  # Consecutive queue visits that ran no task
     while any(queues):  # Continue until all queues are empty
+        queued, visit_clock = sum(map(len, queues)), clock
+        if policy is not None:
+            current_queue = policy.select(queues, clock)  # Next active queue, by weight
+        task_to_reinsert = []  # Reset on every visit, also to an empty queue
         if queues[current_queue]:
             remaining_time = queue_quanta[current_queue]  # Quantum for the current queue
 
-            task_to_reinsert = []
             while remaining_time > 0 and queues[current_queue]:
                 task = heapq.heappop(queues[current_queue])
+                if task.cancelled:
+                    report_dropped(task, current_queue)  # Lazy deletion of the tombstone
+                    continue
 
-                if can_run(task, completed_tasks):  # Check if the task's dependencies are met
+                if index.can_run(task):  # Check if the task's dependencies are met
                     execution_time = min(task.burst_time, task_quantum, remaining_time)
                     print(f"Task {task.name} (Queue {current_queue}) executed for {execution_time} units")
                     task.burst_time -= execution_time
                     remaining_time -= execution_time
+                    clock += execution_time
 
                     if task.burst_time > 0:
                         if reinsert:
@@ -39,9 +54,11 @@ def priority_based(queues, queue_quanta, task_quantum, reinsert=True):
                         else:
                             task_to_reinsert.append(task)
                     else:
-                        task.completed = True
-                        completed_tasks.add(task.name)
+                        index.mark_completed(task)
+                        task.completion_time = clock
                         print(f"Task {task.name} completed")
+                    if cancellations is not None:
+                        cancellations.expire(clock)
                 else:
                     print(f"Task {task.name} (Queue {current_queue}) cannot run due to unmet dependencies")
                     # In this case, the only option is to re-add the task for future evaluation
@@ -52,6 +69,17 @@ def priority_based(queues, queue_quanta, task_quantum, reinsert=True):
             for task in task_to_reinsert:
                 heapq.heappush(queues[current_queue], task)
 
+        if policy is not None:
+            policy.charge(queues, clock)  # Carry the unused time over
+        if clock == visit_clock and sum(map(len, queues)) == queued:
+            stalled_visits += 1
+            if stalled_visits >= queue_count:  # A round of visits ran nothing: can a queued task still run?
+                if not index.any_runnable(queues):
+                    report_stalled(queues)
+                    break
+                stalled_visits = 0
+        else:
+            stalled_visits = 0
         # Move to the next queue
         current_queue = (current_queue - 1)
         if current_queue < 0:
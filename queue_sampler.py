@@ -0,0 +1,116 @@
+"""
+    Queue-length and backlog time series recorded into a ring buffer.
+
+    The QueueSampler records, at fixed intervals of virtual time, the length of each queue,
+    the outstanding work (remaining CPU time of the unfinished tasks) and the number of
+    blocked tasks (waiting on I/O or on dependencies).
+
+    - Samples are written into preallocated NumPy arrays used as a ring buffer: recording a sample
+    is O(number of queues) and memory stays bounded, however long the run. When the buffer is full,
+    the oldest samples are overwritten.
+
+    - The outstanding work is computed once when the run starts, and then decreased by the
+    execution time of each slice, so it is never recomputed from the queues.
+
+    - `to_arrays` returns the samples in chronological order, and `save_csv` writes them
+    for plotting.
+"""
+import numpy as np
+
+
+class QueueSampler:
+
+    def __init__(self, queue_count, interval=10, capacity=4096):
+        """
+        Preallocate the ring buffer.
+
+        Args:
+            queue_count (int): The number of scheduler queues
+            interval (int, optional): Virtual time between two samples. Defaults to 10.
+            capacity (int, optional): The maximum number of samples kept. Defaults to 4096.
+        """
+        self.interval = interval
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.int64)
+        self.lengths = np.zeros((capacity, queue_count), dtype=np.int64)
+        self.work = np.zeros(capacity, dtype=np.int64)
+        self.blocked = np.zeros(capacity, dtype=np.int64)
+        self.count = 0  # Number of samples recorded so far (including the overwritten ones)
+        self.next_time = 0
+        self.outstanding = 0
+
+    def start(self, queues, *wheels):
+        """
+        Compute the outstanding work of the tasks in the queues and in the wheels (arrivals, blocked sets).
+
+        Parameters:
+            queues (list): The scheduler queues
+            wheels (TimerWheel): Timer wheels holding tasks that are not in the queues; None is ignored
+        """
+        tasks = [task for queue in queues for task in queue]
+        tasks.extend(task for wheel in wheels if wheel is not None for task in wheel)
+        self.outstanding = sum(_remaining_work(task) for task in tasks if not task.completed)
+
+    def record(self, clock, queues, executed=0, blocked=0):
+        """
+        Account for a slice and record the samples of the intervals that ended by `clock`.
+
+        Parameters:
+            clock (int): The current (virtual) time
+            queues (list): The scheduler queues
+            executed (int, optional): CPU time used since the previous call. Defaults to 0.
+            blocked (int, optional): The number of blocked tasks. Defaults to 0.
+        """
+        self.outstanding -= executed
+        if clock < self.next_time:
+            return
+        lengths = [len(queue) for queue in queues]
+        # A long slice can cross many intervals; only the last `capacity` ones can be kept
+        skipped = (clock - self.next_time) // self.interval + 1 - self.capacity
+        if skipped > 0:
+            self.next_time += skipped * self.interval
+            self.count += skipped
+        while self.next_time <= clock:
+            i = self.count % self.capacity
+            self.times[i] = self.next_time
+            self.lengths[i] = lengths
+            self.work[i] = self.outstanding
+            self.blocked[i] = blocked
+            self.count += 1
+            self.next_time += self.interval
+
+    def to_arrays(self):
+        """
+        Return the samples kept in the buffer, oldest first.
+
+        Returns:
+            dict: "time", "lengths" (one column per queue), "work" and "blocked" arrays.
+        """
+        if self.count <= self.capacity:
+            order = np.arange(self.count)
+        else:
+            order = np.roll(np.arange(self.capacity), -(self.count % self.capacity))
+        return {
+            "time": self.times[order],
+            "lengths": self.lengths[order],
+            "work": self.work[order],
+            "blocked": self.blocked[order],
+        }
+
+    def save_csv(self, path):
+        """
+        Write the samples to a CSV file (time, one column per queue, work, blocked).
+
+        Parameters:
+            path (str): The destination file
+        """
+        arrays = self.to_arrays()
+        queue_count = arrays["lengths"].shape[1]
+        header = ",".join(["time"] + [f"queue{i}" for i in range(queue_count)] + ["work", "blocked"])
+        table = np.column_stack([arrays["time"], arrays["lengths"], arrays["work"], arrays["blocked"]])
+        np.savetxt(path, table, fmt="%d", delimiter=",", header=header, comments="")
+
+
+def _remaining_work(task):
+    # Remaining CPU time: the current CPU burst plus the CPU bursts after the pending I/O bursts
+    return task.burst_time + sum(cpu_time for _, cpu_time in task.io_bursts[task.burst_index:])
@@ -0,0 +1,209 @@
+"""
+    Content-addressed cache of simulation results.
+
+    Identical (workload, scheduler, configuration, seed) combinations are rerun constantly by
+    dashboards and sweeps. The ResultCache stores the result of each run under a stable key:
+
+    - The key is a SHA-256 hash of the workload arrays (the columns of the checkpoint format,
+    see checkpoint.py: names, priorities, burst times, dependencies as CSR...) and of the scheduler
+    configuration written as canonical JSON. The same workload built in another process,
+    or read from another file, gets the same key.
+
+    - The key is salted with the code that produced the result: the source of every module
+    of the simulator (every .py file next to this one: the schedulers and everything they import,
+    lazily or not), the NumPy version and CACHE_VERSION, so an edit anywhere in the code does not
+    serve the results of its previous version. CACHE_VERSION only changes with the format of the entries.
+
+    - The result holds the summary metrics and, optionally, the execution trace, compressed.
+
+    - Two tiers: an in-memory LRU of at most `memory_entries` results, and an optional directory
+    on disk, bounded to `disk_bytes`. When the directory exceeds its size, the least recently
+    used files are deleted. Files are written atomically and never pickled (gzipped JSON).
+"""
+import contextlib
+import gzip
+import hashlib
+import json
+import os
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+
+CACHE_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def code_version(directory=os.path.dirname(os.path.abspath(__file__))):
+    """
+    Hash CACHE_VERSION, the NumPy version and the source of every module in a directory.
+    Computed once per process, for the code it has loaded.
+
+    Parameters:
+        directory (str, optional): The directory of the modules. Defaults to the directory of the simulator.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest.
+    """
+    from importlib.metadata import version
+
+    digest = hashlib.sha256(f"version:{CACHE_VERSION}:numpy:{version('numpy')}:".encode())
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".py"):
+            with open(os.path.join(directory, name), "rb") as f:
+                digest.update(f"{name}:".encode())
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def workload_key(queues, config, tasks=None):
+    """
+    Compute the cache key of a run.
+
+    Parameters:
+        queues (list): The queues of the run, before it starts
+        config (dict): The scheduler and its configuration (JSON-serializable), including the seed
+        tasks (list, optional): Every task of the run, if some are not in the queues (e.g., future arrivals).
+
+    Returns:
+        str: The hexadecimal SHA-256 key.
+    """
+    from checkpoint import SchedulerState
+
+    arrays = SchedulerState(queues, tasks=list(tasks) if tasks is not None else None).to_arrays()
+    digest = hashlib.sha256(code_version().encode())
+    for key in sorted(arrays):
+        array = arrays[key]
+        digest.update(f"{key}:{array.dtype.str}:{array.shape}:".encode())
+        digest.update(array.tobytes())
+    digest.update(json.dumps(config, sort_keys=True, separators=(",", ":")).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+
+    def __init__(self, directory=None, memory_entries=256, disk_bytes=100_000_000):
+        """
+        Initialize the cache.
+
+        Args:
+            directory (str, optional): The directory of the disk tier. Defaults to None (memory only).
+            memory_entries (int, optional): The number of results kept in memory. Defaults to 256.
+            disk_bytes (int, optional): The maximum size of the disk tier, in bytes. Defaults to 100 MB.
+        """
+        self.memory = OrderedDict()  # key -> result, least recently used first
+        self.memory_entries = memory_entries
+        self.directory = directory
+        self.disk_bytes = disk_bytes
+        self.disk = OrderedDict()  # key -> file size, least recently used first
+        self.disk_size = 0
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            entries = [entry for entry in os.scandir(directory) if entry.name.endswith(".json.gz")]
+            for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+                self.disk[entry.name[:-len(".json.gz")]] = entry.stat().st_size
+                self.disk_size += entry.stat().st_size
+
+    def get(self, key):
+        """
+        Look up a result, in memory first, then on disk.
+
+        Parameters:
+            key (str): The key of the run
+
+        Returns:
+            dict or None: The result ("metrics", "groups" and "trace", a list of lines or None), or None on a miss.
+        """
+        result = self.memory.get(key)
+        if result is None and self.directory is not None:
+            result = self._load(key)
+            if result is not None:
+                result["trace"] = _compress(result["trace"])
+                self._remember(key, result)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.memory.move_to_end(key)
+        return result | {"trace": _decompress(result["trace"])}
+
+    def put(self, key, metrics, groups=None, trace=None):
+        """
+        Store the result of a run in both tiers.
+
+        Parameters:
+            key (str): The key of the run
+            metrics (dict): The summary metrics (see metrics.py)
+            groups (list, optional): The metrics of the task groups (see task_groups.py)
+            trace (list, optional): The lines of the execution trace
+        """
+        self._remember(key, {"metrics": metrics, "groups": groups, "trace": _compress(trace)})
+        if self.directory is None:
+            return
+
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt") as f:
+            json.dump({"metrics": metrics, "groups": groups, "trace": trace}, f)
+        os.replace(tmp_path, path)
+        self._touch(key)
+        while self.disk_size > self.disk_bytes and len(self.disk) > 1:
+            oldest = next(iter(self.disk))
+            with contextlib.suppress(FileNotFoundError):  # Already deleted by another process
+                os.remove(self._path(oldest))
+            self._forget(oldest)
+
+    def _load(self, key):
+        # Read a result from the disk tier (it may have been written by another process)
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt") as f:
+                result = json.load(f)
+            os.utime(path)  # The modification time orders the files by last use across processes
+        except FileNotFoundError:
+            self._forget(key)  # Evicted by another process
+            return None
+        self._touch(key)
+        return result
+
+    def _touch(self, key):
+        # Record the file of a result as the most recently used one
+        self._forget(key)
+        self.disk[key] = os.path.getsize(self._path(key))
+        self.disk_size += self.disk[key]
+
+    def _remember(self, key, result):
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _forget(self, key):
+        size = self.disk.pop(key, None)
+        if size is not None:
+            self.disk_size -= size
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json.gz")
+
+    def report(self):
+        """
+        Print the hit rate and the size of the tiers.
+        """
+        total = self.hits + self.misses
+        hit_rate = self.hits / total if total else 0.0
+        print(f"Cache: {self.hits} hits, {self.misses} misses (hit rate {hit_rate:.1%}), "
+              f"{len(self.memory)} results in memory, {len(self.disk)} on disk ({self.disk_size} bytes)")
+
+
+def _compress(trace):
+    # Traces are kept compressed in memory
+    return None if trace is None else zlib.compress("\n".join(trace).encode())
+
+
+def _decompress(data):
+    if data is None:
+        return None
+    text = zlib.decompress(data).decode()
+    return text.split("\n") if text else []
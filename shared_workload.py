@@ -0,0 +1,182 @@
+"""
+    Workloads shared between processes through `multiprocessing.shared_memory`.
+
+    Fanning simulations out to worker processes normally pickles the whole task list (names,
+    dependency lists...) into every worker. A SharedWorkload stores the workload once instead:
+
+    - The columns of the tasks are the ones of the checkpoint format (see checkpoint.py): priority,
+    burst time, tickets, deadlines... plus the dependencies, the I/O bursts and the queue membership
+    as CSR arrays. They are packed into a single shared memory block.
+
+    - Only a small descriptor (the name of the block, the offset, dtype and shape of each column)
+    is sent to the workers. `attach` maps the block and returns NumPy views on it, without copying.
+
+    - Each worker builds its own tasks and queues from the shared columns with `restore`,
+    so the mutable scheduling state stays private to the worker. The sharing saves pickling and
+    sending the workload to every worker, not memory: each worker still builds a Task object
+    for every task of the workload, so its memory grows with the size of the workload.
+
+    `run_sweep` runs one scheduler with several configurations on a pool of worker processes
+    attached to the same workload and returns the summary metrics of each run.
+"""
+import contextlib
+import importlib
+import json
+from multiprocessing import Pool
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from checkpoint import SchedulerState
+
+ALIGNMENT = 64  # Byte alignment of each column in the block
+
+
+class SharedWorkload:
+
+    def __init__(self, shm, descriptor, owner):
+        """
+        Wrap a shared memory block. Use `create` or `attach` instead of calling this directly.
+
+        Args:
+            shm (SharedMemory): The shared memory block
+            descriptor (dict): The name of the block, the header and the layout of the columns
+            owner (bool): True for the process that created the block (and unlinks it)
+        """
+        self.shm = shm
+        self.descriptor = descriptor
+        self.owner = owner
+        self.arrays = {
+            key: np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for key, (offset, dtype, shape) in descriptor["layout"].items()
+        }
+
+    @classmethod
+    def create(cls, queues):
+        """
+        Copy the tasks of the queues into a new shared memory block.
+
+        Parameters:
+            queues (list): The queues (from `create_queues` or `create_priority_queues`) of the workload
+
+        Returns:
+            SharedWorkload: The workload, owned by the calling process.
+        """
+        arrays = SchedulerState(queues).to_arrays()
+        header = str(arrays.pop("header"))
+
+        layout = {}
+        size = 0
+        for key, array in arrays.items():
+            size = -(-size // ALIGNMENT) * ALIGNMENT
+            layout[key] = (size, array.dtype.str, list(array.shape))
+            size += array.nbytes
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        workload = cls(shm, {"name": shm.name, "header": header, "layout": layout}, owner=True)
+        for key, array in arrays.items():
+            workload.arrays[key][...] = array
+        return workload
+
+    @classmethod
+    def attach(cls, descriptor):
+        """
+        Map a workload created by another process, without copying it.
+
+        The attaching process should be a child of the creator (e.g., a Pool worker), so it shares
+        the resource tracker of the creator, which unlinks the block if the creator dies without closing it.
+
+        Parameters:
+            descriptor (dict): The `descriptor` of the workload
+
+        Returns:
+            SharedWorkload: The workload (read it only; the creator owns it).
+        """
+        shm = shared_memory.SharedMemory(name=descriptor["name"])
+        return cls(shm, descriptor, owner=False)
+
+    def __len__(self):
+        return len(self.arrays["name"])
+
+    def restore(self):
+        """
+        Build private tasks and queues from the shared columns (a Task object for every task of the workload).
+
+        Returns:
+            SchedulerState: A new state with the tasks in their queues, ready to be scheduled.
+        """
+        return SchedulerState.from_arrays(self.arrays | {"header": np.array(self.descriptor["header"])})
+
+    def close(self):
+        """
+        Release the views and unmap the block; the owner also frees it.
+        """
+        self.arrays = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_worker_workload = None  # The workload attached by each worker process
+
+
+def _attach_worker(descriptor):
+    global _worker_workload
+    _worker_workload = SharedWorkload.attach(descriptor)
+
+
+def _run_config(job):
+    from metrics import summarize
+    from simulate import NullWriter
+
+    scheduler_spec, kwargs = job
+    module_name, function_name = scheduler_spec.split(":")
+    scheduler = getattr(importlib.import_module(module_name), function_name)
+    state = _worker_workload.restore()
+    with contextlib.redirect_stdout(NullWriter()):
+        scheduler(state.queues, **kwargs)
+    return summarize(state.tasks)
+
+
+def run_sweep(workload, scheduler, configs, processes=None):
+    """
+    Run a scheduler with several configurations on worker processes sharing the workload.
+
+    Parameters:
+        workload (SharedWorkload): The shared workload
+        scheduler (str): The scheduler function, as "module:function"
+        configs (list): The keyword arguments of the scheduler for each run (e.g., queue_quanta, task_quantum)
+        processes (int, optional): The number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+        list: The summary metrics (see metrics.py) of each run, in the order of `configs`.
+    """
+    with Pool(processes, initializer=_attach_worker, initargs=(workload.descriptor,)) as pool:
+        return pool.map(_run_config, [(scheduler, config) for config in configs])
+
+
+if __name__ == "__main__":
+    import random
+
+    from tasks import Task
+    from tasks import create_queues
+
+    # Example: sweep the quanta of the MLFQ over 20,000 tasks on 4 workers
+    rng = random.Random(0)
+    tasks = [Task(f"Task{i}", priority=rng.randint(1, 10), burst_time=rng.randint(1, 50)) for i in range(20_000)]
+    queues = create_queues(tasks, [(1, 3), (4, 6), (7, 10)])
+
+    with SharedWorkload.create(queues) as workload:
+        print(f"{len(workload)} tasks in {workload.shm.size / 1e6:.1f} MB of shared memory")
+        print(f"Descriptor sent to the workers: {len(json.dumps(workload.descriptor))} bytes")
+        configs = [{"queue_quanta": [quantum, 2 * quantum, 4 * quantum], "task_quantum": quantum}
+                   for quantum in (2, 4, 8, 16)]
+        for config, summary in zip(configs, run_sweep(workload, "multilevel_feedback_queue:multilevel_feedback_queue",
+                                                      configs, processes=4)):
+            print(f"task quantum {config['task_quantum']}: average turnaround {summary['average_turnaround']:.1f}, "
+                  f"average waiting {summary['average_waiting']:.1f}")
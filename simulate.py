@@ -0,0 +1,417 @@
+"""
+    Command-line entry point to run any scheduler on a workload file.
+
+        python -m simulate mlfq workload.json --quanta 6,8,10 --task-quantum 4 --quiet
+
+    - The scheduler is selected by name (see SCHEDULERS). Only the module of the selected scheduler
+    (and the modules it uses) is imported, so NumPy and the other schedulers are not loaded
+    unless the run needs them, and starting a run takes a few tens of milliseconds.
+
+    - The workload is a JSON file (a list of task objects, or {"tasks": [...]}) or a CSV file
+    with a header. The fields are the arguments of Task: name, priority, burst_time, and optionally
+    dependencies, arrival_time, io_bursts, deadline and tickets. In CSV files, dependencies are
+    separated by ";" and io_bursts are written as "io:cpu" pairs separated by ";".
+    A record with burst_times (a list, separated by ";" in CSV files) instead of burst_time
+    is a task group (see task_groups.py), with one shard per burst time; its metrics are reported per group.
+    Without a workload file, the example tasks of the schedulers are used.
+
+    - With --quiet, the execution trace is discarded, which is how large sweeps are run.
+    The metrics summary (see metrics.py) and the wall-clock runtime of the scheduler are always printed.
+
+    - With --cache, results are stored in a content-addressed cache (see result_cache.py),
+    and a run that was already done (same workload, scheduler, configuration, seed and code) is not repeated.
+    Randomized runs (the lottery) are only cached with --seed: without it, they are not reproducible.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import sys
+import time
+
+# name -> (module, scheduler function, task class, queue type, scheduler parameters taken from the flags,
+#          features supported: arrival times ("arrivals"), I/O bursts ("blocked"), queue weights ("policy"),
+#          one task quantum per queue ("task_quanta") and skipping the tasks whose dependencies failed ("dependencies"))
+SCHEDULERS = {
+    "fifo": ("multi_queue_fifo", "multi_queue_scheduler", "tasks:Task", "deque",
+             ("queue_quanta", "task_quantum"), ("policy", "task_quanta")),
+    "sjf": ("multi_queue_sjf", "multi_queue_sjf_scheduler", "tasks:Task", "deque",
+            ("queue_quanta", "task_quantum"), ("policy", "task_quanta")),
+    "rr": ("multi_queue_round_robin", "multi_queue_round_robin_scheduler", "tasks:Task", "deque",
+           ("queue_quanta", "task_quantum"), ("arrivals", "policy")),
+    "str": ("multi_queue_str_priority", "multi_queue_str_priority_scheduler", "multi_queue_str_priority:TaskSTR",
+            "heap", ("queue_quanta", "task_quantum"), ("arrivals", "policy")),
+    "priority": ("priority_based", "priority_based", "tasks:Task", "heap",
+                 ("queue_quanta", "task_quantum", "reinsert"), ("policy",)),
+    "priority_deps": ("priority_with_dependencies", "priority_based", "tasks:Task", "heap",
+                      ("queue_quanta", "task_quantum", "reinsert"), ("dependencies", "policy")),
+    "lottery": ("multi_queue_lottery", "multi_queue_lottery_scheduler_with_dependencies",
+                "multi_queue_lottery:TaskLottery", "deque", ("queue_quanta", "task_quantum", "rng"),
+                ("dependencies", "policy")),
+    "mlfq": ("multilevel_feedback_queue", "multilevel_feedback_queue", "tasks:Task", "deque",
+             ("queue_quanta", "task_quantum", "boost_period"), ("arrivals", "blocked", "policy")),
+    "svr2": ("svr2_mlfq", "svr2_multilevel_feedback_queue", "svr2_mlfq:TaskSrv2", "heap",
+             ("queue_quanta", "task_quantum", "aging_threshold", "aging_increment", "priority_ranges"),
+             ("arrivals", "blocked", "policy")),
+    "svr2_indexed": ("svr2_mlfq", "svr2_multilevel_feedback_queue_indexed", "svr2_mlfq:TaskSrv2", "heap",
+                     ("queue_quanta", "task_quantum", "aging_threshold", "aging_increment", "priority_ranges"),
+                     ("arrivals", "blocked", "policy")),
+    "svr2_deps": ("svr2_mlfq_with_dependencies", "svr2_mlfq_with_dependencies", "svr2_mlfq_with_dependencies:TaskSrv2",
+                  "heap", ("queue_quanta", "task_quantum", "aging_threshold", "aging_increment", "priority_ranges"),
+                  ("dependencies", "policy")),
+    "svr2_deps_indexed": ("svr2_mlfq_with_dependencies", "svr2_mlfq_with_dependencies_indexed",
+                          "svr2_mlfq_with_dependencies:TaskSrv2", "heap",
+                          ("queue_quanta", "task_quantum", "aging_threshold", "aging_increment", "priority_ranges"),
+                          ("dependencies", "policy")),
+    "cfs": ("cfs", "cfs_scheduler", "tasks:Task", "deque", ("target_latency", "min_granularity"), ()),
+    "edf": ("edf", "edf_scheduler", "edf:TaskEDF", "heap", ("queue_quanta", "task_quantum", "miss_policy"), ("policy",)),
+    "llf": ("edf", "edf_scheduler", "edf:TaskLLF", "heap", ("queue_quanta", "task_quantum", "miss_policy"), ("policy",)),
+    "critical_path": ("critical_path", "critical_path_scheduler", "tasks:Task", "deque", ("workers",), ()),
+}
+
+# Task fields read from the workload files, besides name, priority and burst_time
+OPTIONAL_FIELDS = ("dependencies", "arrival_time", "io_bursts", "deadline", "tickets")
+
+EXAMPLE_WORKLOAD = [
+    {"name": "Task1", "priority": 2, "burst_time": 10, "tickets": 5},
+    {"name": "Task2", "priority": 5, "burst_time": 15, "tickets": 10},
+    {"name": "Task3", "priority": 8, "burst_time": 7, "tickets": 20},
+    {"name": "Task4", "priority": 4, "burst_time": 12, "tickets": 8},
+    {"name": "Task5", "priority": 6, "burst_time": 6, "tickets": 12},
+]
+
+
+class NullWriter:
+    # Cheaper than writing the trace to os.devnull
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def load_class(spec):
+    """
+    Import a class given as "module:Class".
+
+    Parameters:
+        spec (str): The module and the class name
+
+    Returns:
+        type: The class
+    """
+    module_name, class_name = spec.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def read_workload(path):
+    """
+    Read the task records of a JSON or CSV workload file.
+
+    Parameters:
+        path (str): The workload file (.json or .csv)
+
+    Returns:
+        list: One dict per task.
+    """
+    if path.endswith(".csv"):
+        import csv
+
+        with open(path, newline="") as f:
+            return [_parse_csv_record(row) for row in csv.DictReader(f)]
+
+    import json
+
+    with open(path) as f:
+        records = json.load(f)
+    return records["tasks"] if isinstance(records, dict) else records
+
+
+def _parse_csv_record(row):
+    record = {"name": row["name"], "priority": int(row["priority"])}
+    if row.get("burst_time"):
+        record["burst_time"] = int(row["burst_time"])
+    if row.get("burst_times"):
+        record["burst_times"] = [int(value) for value in row["burst_times"].split(";")]
+    if row.get("dependencies"):
+        record["dependencies"] = row["dependencies"].split(";")
+    if row.get("io_bursts"):
+        record["io_bursts"] = [tuple(int(value) for value in pair.split(":")) for pair in row["io_bursts"].split(";")]
+    for key in ("arrival_time", "deadline", "tickets"):
+        if row.get(key):
+            record[key] = int(row[key])
+    return record
+
+
+def build_tasks(records, task_class):
+    """
+    Create the tasks of a workload.
+
+    Parameters:
+        records (list): The task records (dicts)
+        task_class (type): The Task class expected by the scheduler
+
+    Returns:
+        tuple: The Task objects (including the shards of the groups) and the TaskGroup objects.
+    """
+    tasks = []
+    groups = []
+    for record in records:
+        if task_class.__name__ == "TaskLottery":
+            # TaskLottery takes the tickets (1 by default) and the dependencies only
+            kwargs = {"tickets": record.get("tickets", 1)}
+        else:
+            kwargs = {key: record[key] for key in OPTIONAL_FIELDS if key in record and key not in ("tickets", "dependencies")}
+            if "io_bursts" in kwargs:
+                kwargs["io_bursts"] = [tuple(pair) for pair in kwargs["io_bursts"]]
+        if "burst_times" in record:
+            from task_groups import TaskGroup
+
+            group = TaskGroup(record["name"], record["priority"], record["burst_times"],
+                              dependencies=record.get("dependencies"), task_class=task_class, **kwargs)
+            groups.append(group)
+            tasks.extend(group.tasks)
+        else:
+            tasks.append(task_class(record["name"], record["priority"], record["burst_time"],
+                                    dependencies=record.get("dependencies"), **kwargs))
+    return tasks, groups
+
+
+def parse_ranges(text):
+    """
+    Parse priority ranges written as "1-3,4-6,7-10".
+
+    Parameters:
+        text (str): The ranges, or "none" for a single queue
+
+    Returns:
+        list: (low, high) tuples, or None.
+    """
+    if text.lower() == "none":
+        return None
+    return [tuple(int(value) for value in item.split("-")) for item in text.split(",")]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m simulate", description="Run a scheduler on a workload.")
+    parser.add_argument("scheduler", choices=sorted(SCHEDULERS), help="The scheduler to run")
+    parser.add_argument("workload", nargs="?", help="JSON or CSV workload file (default: the example tasks)")
+    parser.add_argument("--ranges", default="1-3,4-6,7-10",
+                        help='Priority ranges of the queues, e.g. "1-3,4-6,7-10", or "none" for one queue')
+    parser.add_argument("--quanta", default=None,
+                        help="Comma-separated time quanta of the queues (default: 6,8,10,... one per queue)")
+    parser.add_argument("--task-quantum", default="4",
+                        help='Maximum time of a task per turn, or one per queue, e.g. "4,4,6" (FIFO, SJF)')
+    parser.add_argument("--aging-threshold", type=int, default=5, help="Visits before a task ages (SVR2)")
+    parser.add_argument("--aging-increment", type=int, default=1, help="Priority added by aging (SVR2)")
+    parser.add_argument("--boost-period", type=int, default=None,
+                        help="Move every task back to the top queue every N units (MLFQ)")
+    parser.add_argument("--no-reinsert", dest="reinsert", action="store_false",
+                        help="Reinsert preempted tasks after the queue visit (priority schedulers)")
+    parser.add_argument("--target-latency", type=int, default=24, help="Scheduling period (CFS)")
+    parser.add_argument("--min-granularity", type=int, default=3, help="Minimum time slice (CFS)")
+    parser.add_argument("--miss-policy", choices=("keep", "drop", "demote"), default="keep",
+                        help="Tasks past their deadline (EDF, LLF)")
+    parser.add_argument("--workers", type=int, default=2, help="Number of workers (critical path)")
+    parser.add_argument("--weights", default=None,
+                        help="Comma-separated weights of the queues: serve them by deficit round robin (see fair_share.py)")
+    parser.add_argument("--share-quantum", type=int, default=10, help="Time per round of a queue of weight 1 (--weights)")
+    parser.add_argument("--capacity", default=None,
+                        help='Comma-separated maximum number of tasks of each queue ("none" for no limit), see admission.py. '
+                             'The dependency schedulers (priority_deps, svr2_deps, lottery) cancel the dependants '
+                             'of a refused or shed task too; critical_path does not support refused dependencies')
+    parser.add_argument("--admission", choices=("reject", "shed", "spill"), default="reject",
+                        help="What happens to a task submitted to a full queue (--capacity)")
+    parser.add_argument("--percentiles", action="store_true",
+                        help="Report the p50/p90/p99/p99.9 turnaround and waiting times of each queue")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the random draws (lottery)")
+    parser.add_argument("--cache", default=None, help="Directory of the result cache (see result_cache.py)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Discard the execution trace")
+    return parser.parse_args(argv)
+
+
+def prepare(args, records=None):
+    """
+    Build the tasks, the queues and the scheduler arguments of a run, without running it.
+
+    Parameters:
+        args (argparse.Namespace): The arguments returned by `parse_args`
+        records (list, optional): The task records. Defaults to the workload file of the arguments.
+
+    Returns:
+        tuple: The scheduler function, the queues, the keyword arguments of the scheduler,
+        the Task objects and the TaskGroup objects.
+    """
+    module_name, function_name, class_spec, queue_type, parameters, features = SCHEDULERS[args.scheduler]
+    task_class = load_class(class_spec)
+    scheduler = getattr(importlib.import_module(module_name), function_name)
+
+    if records is None:
+        records = read_workload(args.workload) if args.workload else EXAMPLE_WORKLOAD
+    tasks, groups = build_tasks(records, task_class)
+    priority_ranges = parse_ranges(args.ranges)
+    if priority_ranges is None:
+        priorities = [task.priority for task in tasks]
+        priority_ranges = [(min(priorities), max(priorities))]  # Just one queue for all tasks
+    tasks_module = importlib.import_module("tasks")
+    create = tasks_module.create_queues if queue_type == "deque" else tasks_module.create_priority_queues
+
+    admission = None
+    if args.capacity:
+        from admission import AdmissionControl
+
+        cancellations = None
+        if "dependencies" in features:
+            from cancellation import CancellationIndex
+
+            cancellations = CancellationIndex([tasks])  # A refused or shed task fails its dependants too
+        capacities = [None if value.lower() == "none" else int(value) for value in args.capacity.split(",")]
+        admission = AdmissionControl(priority_ranges, capacities, args.admission, cancellations)
+
+    kwargs = {}
+    if any(task.arrival_time > 0 for task in tasks):
+        if "arrivals" not in features:
+            raise ValueError(f"The {args.scheduler} scheduler does not support arrival times")
+        from timer_wheel import schedule_arrivals
+
+        queues = create([], priority_ranges)  # Tasks are released by the wheel when they arrive
+        kwargs["arrivals"] = schedule_arrivals(tasks, priority_ranges, admission=admission)
+    else:
+        queues = create(tasks, priority_ranges, admission=admission)
+    if any(task.io_bursts for task in tasks):
+        if "blocked" not in features:
+            raise ValueError(f"The {args.scheduler} scheduler does not support I/O bursts")
+        from io_bursts import BlockedSet
+
+        kwargs["blocked"] = BlockedSet()
+
+    if args.quanta:
+        queue_quanta = [int(value) for value in args.quanta.split(",")]
+    else:
+        queue_quanta = [6 + 2 * i for i in range(len(queues))]
+    if len(queue_quanta) != len(queues):
+        raise ValueError(f"{len(queue_quanta)} quanta given for {len(queues)} queues")
+    task_quanta = [int(value) for value in str(args.task_quantum).split(",")]
+    if len(task_quanta) > 1:
+        if "task_quanta" not in features:
+            raise ValueError(f"The {args.scheduler} scheduler does not support one task quantum per queue")
+        if len(task_quanta) != len(queues):
+            raise ValueError(f"{len(task_quanta)} task quanta given for {len(queues)} queues")
+    if args.weights:
+        if "policy" not in features:
+            raise ValueError(f"The {args.scheduler} scheduler does not support queue weights")
+        from fair_share import DeficitRoundRobin
+
+        weights = [int(value) for value in args.weights.split(",")]
+        if len(weights) != len(queues):
+            raise ValueError(f"{len(weights)} weights given for {len(queues)} queues")
+        kwargs["policy"] = DeficitRoundRobin(weights, args.share_quantum)
+    values = vars(args) | {"queue_quanta": queue_quanta, "priority_ranges": priority_ranges,
+                           "task_quantum": task_quanta if len(task_quanta) > 1 else task_quanta[0]}
+    if "rng" in parameters:
+        from multi_queue_lottery import LotteryRNG
+
+        values["rng"] = LotteryRNG(args.seed)  # Seeded draws, reproducible with --seed
+    kwargs.update((name, values[name]) for name in parameters)
+    return scheduler, queues, kwargs, tasks, groups
+
+
+def run(args, records=None):
+    """
+    Run the scheduler selected by the parsed arguments.
+
+    Parameters:
+        args (argparse.Namespace): The arguments returned by `parse_args`
+        records (list, optional): The task records. Defaults to the workload file of the arguments.
+
+    Returns:
+        tuple: The summary metrics (dict), the runtime of the scheduler in seconds (None if the result
+        comes from the cache) and the metrics of the task groups.
+    """
+    if args.quiet:
+        output = NullWriter()
+    else:
+        output = io.StringIO() if args.cache else sys.stdout  # The trace is cached too
+    with contextlib.redirect_stdout(output):
+        scheduler, queues, kwargs, tasks, groups = prepare(args, records)  # The admission control reports refused tasks
+
+    cache = None
+    if args.cache and "rng" in kwargs and args.seed is None:  # Unseeded random runs cannot be replayed: not cached
+        if not args.quiet:
+            sys.stdout.write(output.getvalue())
+            output = sys.stdout
+    elif args.cache:
+        from result_cache import ResultCache, workload_key
+
+        cache = ResultCache(args.cache)
+        config = {name: value for name, value in kwargs.items() if name not in ("arrivals", "blocked", "policy", "rng")}
+        if "policy" in kwargs:
+            config |= {"weights": kwargs["policy"].weights, "share_quantum": args.share_quantum}
+        if args.capacity:
+            config |= {"capacity": args.capacity, "admission": args.admission}
+        if args.percentiles:
+            config |= {"percentiles": True}
+        key = workload_key(queues, config | {"scheduler": args.scheduler, "seed": args.seed}, tasks=tasks)
+        cached = cache.get(key)
+        if cached is not None and (args.quiet or cached["trace"] is not None):
+            if not args.quiet:
+                print("\n".join(cached["trace"]))
+            return cached["metrics"], None, cached["groups"]
+
+    with contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        scheduler(queues, **kwargs)
+        runtime = time.perf_counter() - start
+        if "policy" in kwargs:
+            kwargs["policy"].report()
+
+    from metrics import summarize
+
+    summary = summarize(tasks)
+    if args.percentiles:
+        from metrics import latency_histograms
+
+        histograms = latency_histograms(tasks, parse_ranges(args.ranges))
+        summary["histograms"] = {kind: [histogram.to_dict() for histogram in queue_histograms]
+                                 for kind, queue_histograms in histograms.items()}
+    group_results = []
+    if groups:
+        from task_groups import group_metrics
+
+        group_results = group_metrics(groups)
+    if cache is not None:
+        trace = None
+        if not args.quiet:
+            trace = output.getvalue().splitlines()
+            print("\n".join(trace))
+        cache.put(key, summary, group_results, trace)
+    return summary, runtime, group_results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        summary, runtime, groups = run(args)
+    except (OSError, ValueError, KeyError) as error:
+        sys.exit(f"error: {error}")
+
+    from metrics import print_summary
+
+    if not args.quiet:
+        print()
+    print_summary(summary)
+    print("runtime: cached" if runtime is None else f"runtime: {runtime * 1000:.3f} ms")
+    if "histograms" in summary:
+        from latency_histogram import LatencyHistogram
+        from metrics import print_percentiles
+
+        print_percentiles({kind: [LatencyHistogram.from_dict(data) for data in queue_histograms]
+                           for kind, queue_histograms in summary["histograms"].items()})
+    if groups:
+        from task_groups import print_group_metrics
+
+        print_group_metrics(groups)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,12 +12,22 @@
     if they are not completed within their allocated time.
 
     - The priority of tasks is adjusted dynamically based on their waiting time,
-    allowing long-waiting tasks to break through the queue hierarchy.
+    allowing long-waiting tasks to break through the queue hierarchy: with the priority ranges
+    of the queues, an aged task moves to the queue whose range contains its new priority
+    (`aging` scans the queues after every visit; the AgingIndex of aging_index.py applies
+    the same aging without the scan, see `svr2_multilevel_feedback_queue_indexed`).
 """
 import heapq
 
+from aging_index import AgingIndex
 from tasks import Task
+from tasks import group_order
+from tasks import find_queue
+from tasks import enqueue
+from tasks import dequeue
 from tasks import create_priority_queues
+from cancellation import report_dropped
+from timer_wheel import wait_for_next
 
 
 class TaskSrv2(Task):
@@ -27,7 +37,9 @@ class TaskSrv2(Task):
         Compare two tasks based on their priority and burst time.
 
         If the priorities do not match, the task with the higher priority comes first.
-        If the priorities match, the task with the shorter remaining burst time comes first.
+        If the priorities match, the shards of a group come together (see task_groups.py),
+        then the task with the shorter remaining burst time comes first, then the task name decides,
+        so the order is total and every heap layout pops the tasks in the same order.
 
         Parameters:
             other: Another TaskSrv2 instance
@@ -36,29 +48,67 @@ class TaskSrv2(Task):
             True if this task should come before the other task
         """
 
-        # Higher priority tasks will come first, and if priorities match, sort by burst time
-        return self.priority > other.priority if self.priority != other.priority else self.burst_time < other.burst_time
+        # Higher priority tasks will come first, and if priorities match, sort by group then by burst time
+        if self.priority != other.priority:
+            return self.priority > other.priority
+        if group_order(self) != group_order(other):
+            return group_order(self) < group_order(other)
+        if self.burst_time != other.burst_time:
+            return self.burst_time < other.burst_time
+        return self.name < other.name
 
 
-def aging(queues, aging_threshold, aging_increment):
+def aging(queues, aging_threshold, aging_increment, priority_ranges=None):
     """
     Increment the waiting time of each task in the queues, and increase its priority
     by aging_increment if the waiting time exceeds aging_threshold.
 
+    This is the reference implementation, which scans every queue (O(n) per round).
+    The AgingIndex (see aging_index.py) must produce the same schedule.
+
     Parameters:
-        queues: The queues containing the tasks to age
+        queues: The queues (heaps) containing the tasks to age
         aging_threshold: The waiting time threshold for aging
         aging_increment: The priority increment for aging tasks
+        priority_ranges: The (low, high) priority range of each queue. If given, the aged tasks move up
+            to the queue whose range contains their new priority. Defaults to None (they stay in their queue).
+
+    Returns:
+        int: The number of tasks moved to a higher queue.
     """
+    aged = []  # The tasks aged in this round, per queue
     for queue in queues:
+        aged.append([])
         for task in queue:
             task.waiting_time += 1  # Increment waiting time for each task
             if task.waiting_time >= aging_threshold:
                 task.priority += aging_increment  # Increase priority
                 task.waiting_time = 0  # Reset waiting time
-
-
-def svr2_multilevel_feedback_queue(queues, queue_quanta, task_quantum, aging_threshold, aging_increment):
+                aged[-1].append(task)
+        if aged[-1]:
+            heapq.heapify(queue)  # The priorities changed in place
+
+    moved = 0
+    if priority_ranges is None:
+        return moved
+    top_priority = max(high for _, high in priority_ranges)
+    # Highest queue first, and highest priorities first in each queue
+    for level in range(len(queues) - 1, -1, -1):
+        for task in sorted(aged[level]):
+            target = find_queue(task, priority_ranges)
+            if target is None:  # Past every range: the highest queue
+                target = len(priority_ranges) - 1 if task.priority > top_priority else level
+            if target > level:
+                queues[level].remove(task)
+                heapq.heapify(queues[level])
+                heapq.heappush(queues[target], task)
+                print(f"Task {task.name} aged to priority {task.priority}: moved from Queue {level} to Queue {target}")
+                moved += 1
+    return moved
+
+
+def svr2_multilevel_feedback_queue(queues, queue_quanta, task_quantum, aging_threshold, aging_increment, cancellations=None, arrivals=None, blocked=None,
+                                   adaptive=None, sampler=None, priority_ranges=None, policy=None, indexed_aging=False):
     """
     Simulates the SVR2 (System V Release 2) Unix scheduling algorithm,
     which uses a Multilevel Feedback Queue (MLFQ) and incorporates aging.
@@ -74,40 +124,115 @@ def svr2_multilevel_feedback_queue(queues, queue_quanta, task_quantum, aging_thr
         task_quantum (int): A maximum time allocated to any task in a single turn.
         aging_threshold (int): The number of cycles after which priority is incremented.
         aging_increment (int): The amount by which priority increases due to aging.
+        cancellations (CancellationIndex, optional): Index used to cancel or expire tasks while they are queued.
+        arrivals (TimerWheel, optional): Tasks that have not arrived yet, released into the queues when due.
+        blocked (BlockedSet, optional): Holds the tasks waiting on I/O (see `Task.io_bursts`).
+            A task that blocks before using its quantum returns to the same queue, it is not demoted.
+        adaptive (AdaptiveQuanta, optional): Retunes the queue quanta and the per-queue task quanta online
+            from the observed CPU bursts. If given, `queue_quanta` and `task_quantum` are taken from it.
+        sampler (QueueSampler, optional): Records queue lengths, outstanding work and blocked tasks over time.
+        priority_ranges (list, optional): The (low, high) priority range of each queue. If given, aged tasks
+            move up to the queue whose range contains their new priority. Defaults to None (they stay in their queue).
+        policy (DeficitRoundRobin, optional): Serves the queues by weight instead of the fixed rotation (see fair_share.py).
+            If given, `queue_quanta` is ignored.
+        indexed_aging (bool, optional): Age the tasks with an AgingIndex instead of scanning the queues (`aging`).
+            Defaults to False.
     """
     print("Execution Order:")
+    aging_index = None
+    if indexed_aging:
+        aging_index = AgingIndex(queues, aging_threshold, aging_increment, priority_ranges)  # The queues become AgingQueues
     queue_count = len(queues)
     current_queue = queue_count - 1  # Start with the last queue (more priority)
-
-    while any(queues):  # Continue until all queues are empty
+    clock = 0  # Elapsed (virtual) time
+    if adaptive is not None:
+        queue_quanta = adaptive.queue_quanta  # Updated in place by the tuner
+
+    if arrivals is not None:
+        arrivals.release(clock, queues)  # Tasks that arrive at the start
+    if sampler is not None:
+        sampler.start(queues, arrivals, blocked)
+
+    if policy is not None:
+        queue_quanta = policy.budgets  # Set by the policy before each visit
+
+    while any(queues) or arrivals or blocked:  # Continue until all queues are empty and every task has arrived
+        if not any(queues):
+            clock = wait_for_next(clock, queues, arrivals, blocked)  # Idle until the next arrival or I/O completion
+            print(f"Idle until time {clock}")
+        if policy is not None:
+            current_queue = policy.select(queues, clock)  # Next active queue, by weight
         if queues[current_queue]:
             remaining_time = queue_quanta[current_queue]  # Quantum for the current queue
+            if adaptive is not None:
+                task_quantum = adaptive.task_quanta[current_queue]  # Retuned online
 
             while remaining_time > 0 and queues[current_queue]:
-                task = heapq.heappop(queues[current_queue])
+                task = dequeue(queues[current_queue])
+                if task.cancelled:
+                    report_dropped(task, current_queue)  # Lazy deletion of the tombstone
+                    continue
 
                 execution_time = min(task.burst_time, task_quantum, remaining_time)
                 print(f"Task {task.name} (Queue {current_queue}) executed for {execution_time} units")
                 task.burst_time -= execution_time
                 remaining_time -= execution_time
+                clock += execution_time
+                if blocked is not None:
+                    blocked.record_cpu(clock - execution_time, execution_time)
+                if adaptive is not None:
+                    adaptive.observe(current_queue, execution_time, task_quantum, burst_done=task.burst_time == 0)
 
                 # If the task is not completed, demote or keep it in the current queue
                 if task.burst_time > 0:
                     if current_queue - 1 >= 0:
                         # Demote to the next lower-priority queue
-                        heapq.heappush(queues[current_queue - 1], task)
+                        enqueue(queues[current_queue - 1], task)
 
                     else:
                         # If it's the lowest-priority queue, keep it there
-                        heapq.heappush(queues[current_queue], task)
-
+                        enqueue(queues[current_queue], task)
+                elif blocked is not None and task.has_pending_io():
+                    # The CPU burst finished: wait on I/O and come back to the same queue
+                    until = blocked.block(task, current_queue, clock)
+                    print(f"Task {task.name} (Queue {current_queue}) blocked on I/O until time {until}")
+                else:
+                    task.completed = True
+                    task.completion_time = clock
+                if cancellations is not None:
+                    cancellations.expire(clock)
+                if arrivals is not None:
+                    arrivals.release(clock, queues)
+                if blocked is not None:
+                    blocked.release(clock, queues)
+                if sampler is not None:
+                    sampler.record(clock, queues, execution_time, len(blocked) if blocked is not None else 0)
+
+        if policy is not None:
+            policy.charge(queues, clock)  # Carry the unused time over
         # Move to the next queue
         current_queue = (current_queue - 1)
         if current_queue < 0:
             current_queue = queue_count - 1
 
         # Apply aging after each round
-        aging(queues, aging_threshold, aging_increment)
+        if aging_index is not None:
+            aging_index.age()
+        else:
+            aging(queues, aging_threshold, aging_increment, priority_ranges)
+
+    if blocked is not None:
+        blocked.report(clock)
+    if adaptive is not None:
+        adaptive.report()
+
+
+def svr2_multilevel_feedback_queue_indexed(queues, *args, **kwargs):
+    """
+    The SVR2 scheduler with the AgingIndex engine (see aging_index.py), to be diff-tested against
+    the reference aging with differential.py. Takes the arguments of `svr2_multilevel_feedback_queue`.
+    """
+    return svr2_multilevel_feedback_queue(queues, *args, indexed_aging=True, **kwargs)
 
 
 if __name__ == "__main__":
@@ -135,4 +260,5 @@ if __name__ == "__main__":
     aging_threshold = 5        # Number of cycles after which priority is incremented
     aging_increment = 1        # Amount by which priority increases due to aging
 
-    svr2_multilevel_feedback_queue(queues, queue_quanta, task_quantum, aging_threshold, aging_increment)
+    svr2_multilevel_feedback_queue(queues, queue_quanta, task_quantum, aging_threshold, aging_increment,
+                                   priority_ranges=priority_ranges)
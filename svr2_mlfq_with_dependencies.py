@@ -6,12 +6,12 @@ meaning all the tasks they depend on must complete before they can run.
 
 - Each task can define a list of dependencies (dependencies),
 which are other tasks that must complete before it can run.
-The can_run function checks if all dependencies for a task are satisfied
+The TaskIndex checks if all dependencies for a task are satisfied
 before allowing it to execute.
 
-- A completed_tasks set keeps track of all tasks that have finished execution.
-Tasks are only considered ready to run if all their dependencies are in
-the completed_tasks set.
+- The TaskIndex interns the task names to integer IDs and keeps track of all tasks
+that have finished execution in a bool array. Tasks are only considered ready to run
+if all their dependencies are marked as completed.
 
 - Tasks are evaluated for dependencies before execution.
 - If a tasks dependencies are not met, it is re-added to its current queue,
@@ -21,15 +21,21 @@ The scheduler skips the task and moves on to the next one.
 - Aging is applied as before, ensuring that tasks stuck waiting
 (even due to unmet dependencies) can gain priority over time.
 """
-import heapq
-
+from aging_index import AgingIndex
 from svr2_mlfq import TaskSrv2, aging
 from tasks import create_priority_queues
-from utils import can_run
+from tasks import enqueue
+from tasks import dequeue
+from task_index import TaskIndex
+from task_index import report_stalled
+from cancellation import report_dropped
+from checkpoint import SchedulerState
 
 
 
-def svr2_mlfq_with_dependencies(queues, queue_quanta, task_quantum, aging_threshold, aging_increment):
+def svr2_mlfq_with_dependencies(queues, queue_quanta, task_quantum, aging_threshold, aging_increment, cancellations=None,
+                                state=None, checkpointer=None, sampler=None, priority_ranges=None, policy=None,
+                                indexed_aging=False):
     """
     Simulates the SVR2 (System V Release 2) Unix scheduling algorithm,
     with the addition of task dependencies.
@@ -38,12 +44,12 @@ def svr2_mlfq_with_dependencies(queues, queue_quanta, task_quantum, aging_thresh
     In an MLFQ, tasks can move between multiple levels of queues based on their behavior,
     such as time spent in a queue or whether they complete their burst time allocation.
 
-    The can_run function checks if all dependencies for a task are satisfied
+    The TaskIndex checks if all dependencies for a task are satisfied
     before allowing it to execute.
 
-    - A completed_tasks set keeps track of all tasks that have finished execution.
-    Tasks are only considered ready to run if all their dependencies are in
-    the completed_tasks set.
+    - The TaskIndex interns the task names to integer IDs and keeps track of all tasks
+    that have finished execution in a bool array. Tasks are only considered ready to run
+    if all their dependencies are marked as completed.
 
     - Tasks are evaluated for dependencies before execution.
     - If a tasks dependencies are not met, it is re-added to its current queue,
@@ -60,45 +66,100 @@ def svr2_mlfq_with_dependencies(queues, queue_quanta, task_quantum, aging_thresh
         task_quantum (int): The maximum time allocated to any task in a single turn.
         aging_threshold (int): The number of cycles after which priority is incremented.
         aging_increment (int): The amount by which priority increases due to aging.
+        cancellations (CancellationIndex, optional): Index used to cancel or expire tasks while they are queued.
+            The dependants of a cancelled task fail, so they are dropped instead of waiting forever.
+        state (SchedulerState, optional): The state to resume from (e.g., restored from a checkpoint).
+            If given, `queues` is ignored and the run continues from the state.
+        checkpointer (Checkpointer, optional): Called with the state between queue visits to save it periodically.
+        sampler (QueueSampler, optional): Records queue lengths, outstanding work and the number of tasks
+            blocked on dependencies over time.
+        priority_ranges (list, optional): The (low, high) priority range of each queue. If given, aged tasks
+            move up to the queue whose range contains their new priority. Defaults to None (they stay in their queue).
+        policy (DeficitRoundRobin, optional): Serves the queues by weight instead of the fixed rotation (see fair_share.py).
+            If given, `queue_quanta` is ignored.
+        indexed_aging (bool, optional): Age the tasks with an AgingIndex instead of scanning the queues
+            (see svr2_mlfq.py). Defaults to False.
     """
-    completed_tasks = set()  # Keep track of completed tasks
 
     print("Execution Order:")
+    if state is None:
+        state = SchedulerState(queues)
+    queues = state.queues
     queue_count = len(queues)
-    current_queue = queue_count - 1  # Start with the last queue (more priority)
-
+    current_queue = state.current_queue  # Start with the last queue (more priority), unless resuming
+    clock = state.clock  # Elapsed (virtual) time
+    index = TaskIndex(state.tasks)  # Keep track of completed tasks by ID
+    index.validate()  # Missing dependencies and cycles fail now, instead of blocking the run forever
+    aging_index = None
+    if indexed_aging:
+        aging_index = AgingIndex(queues, aging_threshold, aging_increment, priority_ranges)  # The queues become AgingQueues
+    if sampler is not None:
+        sampler.start(queues)
+
+    if policy is not None:
+        queue_quanta = policy.budgets  # Set by the policy before each visit
+
+    stalled_visits = 0  # Consecutive queue visits that ran no task
     while any(queues):  # Continue until all queues are empty
+        queued, visit_clock = sum(map(len, queues)), clock
+        if checkpointer is not None:
+            state.current_queue, state.clock = current_queue, clock
+            if aging_index is not None:
+                aging_index.sync()  # Waiting times are saved in the tasks
+            checkpointer(state)
+        state.visits += 1
+        task_to_reinsert = []  # Placeholder for processed tasks to be reinserted
+        if policy is not None:
+            current_queue = policy.select(queues, clock)  # Next active queue, by weight
         if queues[current_queue]:
             remaining_time = queue_quanta[current_queue]  # Quantum for the current queue
 
-            task_to_reinsert = []  # Placeholder for processed tasks to be reinserted
             while remaining_time > 0 and queues[current_queue]:
-                task = heapq.heappop(queues[current_queue])
+                task = dequeue(queues[current_queue])
+                if task.cancelled:
+                    report_dropped(task, current_queue)  # Lazy deletion of the tombstone
+                    continue
 
-                if can_run(task, completed_tasks):  # Check if the task's dependencies are met
+                if index.can_run(task):  # Check if the task's dependencies are met
                     execution_time = min(task.burst_time, task_quantum, remaining_time)
                     print(f"Task {task.name} (Queue {current_queue}) executed for {execution_time} units")
                     task.burst_time -= execution_time
                     remaining_time -= execution_time
+                    clock += execution_time
 
                     if task.burst_time > 0:
                         if current_queue - 1 >= 0:  # Demote to the next lower-priority queue
-                            heapq.heappush(queues[current_queue - 1], task)
+                            enqueue(queues[current_queue - 1], task)
                         else:
                             # If it's the lowest-priority queue, keep it there
                             task_to_reinsert.append(task)
                     else:
-                        task.completed = True
-                        completed_tasks.add(task.name)
+                        index.mark_completed(task)
+                        task.completion_time = clock
                         print(f"Task {task.name} has completed")
+                    if cancellations is not None:
+                        cancellations.expire(clock)
+                    if sampler is not None:
+                        sampler.record(clock, queues, execution_time, index.blocked_count)
                 else:
                     print(f"Task {task.name} (Queue {current_queue}) cannot run due to unmet dependencies")
                     task_to_reinsert.append(task)  # Re-add the task for future evaluation
 
         if len(task_to_reinsert) > 0:
             for task in task_to_reinsert:
-                heapq.heappush(queues[current_queue], task)
-
+                enqueue(queues[current_queue], task)
+
+        if policy is not None:
+            policy.charge(queues, clock)  # Carry the unused time over
+        if clock == visit_clock and sum(map(len, queues)) == queued:
+            stalled_visits += 1
+            if stalled_visits >= queue_count:  # A round of visits ran nothing: can a queued task still run?
+                if not index.any_runnable(queues):
+                    report_stalled(queues)
+                    break
+                stalled_visits = 0
+        else:
+            stalled_visits = 0
         # Move to the next queue
         current_queue = (current_queue - 1)
         if current_queue < 0:
@@ -106,7 +167,18 @@ def svr2_mlfq_with_dependencies(queues, queue_quanta, task_quantum, aging_thresh
         # print(f"Switching to Queue {current_queue - 1}")
 
         # Apply aging after each round
-        aging(queues, aging_threshold, aging_increment)
+        if aging_index is not None:
+            aging_index.age()
+        else:
+            aging(queues, aging_threshold, aging_increment, priority_ranges)
+
+
+def svr2_mlfq_with_dependencies_indexed(queues, *args, **kwargs):
+    """
+    The scheduler with the AgingIndex engine (see aging_index.py), to be diff-tested against
+    the reference aging with differential.py. Takes the arguments of `svr2_mlfq_with_dependencies`.
+    """
+    return svr2_mlfq_with_dependencies(queues, *args, indexed_aging=True, **kwargs)
 
 
 if __name__ == "__main__":
@@ -137,4 +209,5 @@ if __name__ == "__main__":
     aging_threshold = 5        # Number of cycles after which priority is incremented
     aging_increment = 1        # Amount by which priority increases due to aging
 
-    svr2_mlfq_with_dependencies(queues, queue_quanta, task_quantum, aging_threshold, aging_increment)
+    svr2_mlfq_with_dependencies(queues, queue_quanta, task_quantum, aging_threshold, aging_increment,
+                                priority_ranges=priority_ranges)
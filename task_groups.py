@@ -0,0 +1,176 @@
+"""
+    Gang submission of task groups.
+
+    A job made of many shards that must all finish before the job counts as done is submitted
+    as one TaskGroup instead of hundreds of individual tasks:
+
+    - The group holds the shared metadata (priority, dependencies, arrival time, deadline) once.
+    The shards are regular tasks named "<group>[i]" that reference the group (`task.group`)
+    and share the same dependency list object.
+
+    - Other tasks can depend on the group by its name. The TaskIndex keeps the group as a single
+    node that completes when its last shard completes, so a dependant has one dependency
+    on the group instead of one per shard.
+
+    - Co-scheduling: among tasks of equal priority, Task and TaskSrv2 order the shards by group,
+    in the order the groups were submitted, and the critical-path scheduler starts sibling shards together.
+    The shards of a group therefore run together instead of being interleaved with other groups,
+    which shortens the time until the whole group completes.
+
+    - `group_metrics` reports per group the completion time, the turnaround time and the spread
+    between the first and the last shard completion.
+
+    Group membership is saved in checkpoints (see checkpoint.py) and restored with `TaskGroup.from_tasks`.
+"""
+import itertools
+
+from tasks import Task
+
+_submission_order = itertools.count()
+
+
+class TaskGroup:
+
+    def __init__(self, name, priority, burst_times, dependencies=None, task_class=Task, **task_kwargs):
+        """
+        Create a group and its shards.
+
+        Args:
+            name (str): The group name; the shards are named "<name>[0]", "<name>[1]", ...
+            priority (int): The priority of every shard
+            burst_times (list): The burst time of each shard
+            dependencies (list, optional): Names of the tasks (or groups) every shard depends on. Defaults to none.
+            task_class (type, optional): The Task class of the shards. Defaults to Task.
+            task_kwargs: Other arguments given to every shard (e.g., arrival_time, deadline, tickets).
+        """
+        self.name = name
+        self.priority = priority
+        self.dependencies = dependencies or []  # Shared by every shard
+        self.order = next(_submission_order)
+        self.tasks = []
+        for i, burst_time in enumerate(burst_times):
+            task = task_class(f"{name}[{i}]", priority, burst_time, dependencies=self.dependencies, **task_kwargs)
+            task.group = self
+            self.tasks.append(task)
+
+    @classmethod
+    def from_tasks(cls, name, tasks):
+        """
+        Rebuild a group around existing shards (e.g., restored from a checkpoint).
+
+        The group takes the priority and the dependency list of its first shard, and the next
+        submission order, so groups rebuilt in their original order keep their relative order.
+
+        Parameters:
+            name (str): The group name
+            tasks (list): The shards, in order
+
+        Returns:
+            TaskGroup: The group, referenced by every shard.
+        """
+        group = cls.__new__(cls)
+        group.name = name
+        group.priority = tasks[0].priority if tasks else None
+        group.dependencies = tasks[0].dependencies if tasks else []
+        group.order = next(_submission_order)
+        group.tasks = list(tasks)
+        for task in group.tasks:
+            task.group = group
+            task.dependencies = group.dependencies  # Shared again by every shard
+        return group
+
+    def __len__(self):
+        return len(self.tasks)
+
+    @property
+    def completed(self):
+        """True when every shard of the group has completed."""
+        return all(task.completed for task in self.tasks)
+
+    @property
+    def completion_time(self):
+        """The time the last shard completed, or None if the group has not completed."""
+        if not self.completed:
+            return None
+        return max(task.completion_time for task in self.tasks)
+
+
+def group_tasks(groups):
+    """
+    Flatten groups into the list of their shards, in submission order.
+
+    Parameters:
+        groups (list): TaskGroup objects
+
+    Returns:
+        list: The shards of every group.
+    """
+    return [task for group in groups for task in group.tasks]
+
+
+def group_metrics(groups):
+    """
+    Compute the metrics of each group.
+
+    Parameters:
+        groups (list): TaskGroup objects
+
+    Returns:
+        list: One dict per group: name, number of shards, completed shards, completion time,
+        turnaround time (from the earliest shard arrival) and spread between the first and the last shard completion.
+    """
+    metrics = []
+    for group in groups:
+        times = [task.completion_time for task in group.tasks if task.completion_time is not None]
+        completion_time = group.completion_time
+        arrival_time = min(task.arrival_time for task in group.tasks) if group.tasks else 0
+        metrics.append({
+            "name": group.name,
+            "shards": len(group),
+            "completed": len(times),
+            "completion_time": completion_time,
+            "turnaround": None if completion_time is None else completion_time - arrival_time,
+            "spread": max(times) - min(times) if times else None,
+        })
+    return metrics
+
+
+def report_groups(groups):
+    """
+    Print the metrics of each group.
+
+    Parameters:
+        groups (list): TaskGroup objects
+    """
+    print_group_metrics(group_metrics(groups))
+
+
+def print_group_metrics(group_results):
+    """
+    Print the metrics computed by `group_metrics`.
+
+    Parameters:
+        group_results (list): The metrics of each group
+    """
+    for metrics in group_results:
+        if metrics["completion_time"] is None:
+            print(f"Group {metrics['name']}: {metrics['completed']}/{metrics['shards']} shards completed")
+        else:
+            print(f"Group {metrics['name']}: {metrics['shards']} shards completed at time {metrics['completion_time']} "
+                  f"(turnaround {metrics['turnaround']}, spread {metrics['spread']} units)")
+
+
+if __name__ == "__main__":
+    from priority_with_dependencies import priority_based
+    from tasks import create_priority_queues
+
+    # Example: two map jobs of 4 shards each, and a reduce task that waits for the first job
+    groups = [
+        TaskGroup("MapA", priority=5, burst_times=[4, 6, 3, 5]),
+        TaskGroup("MapB", priority=5, burst_times=[2, 2, 8, 4]),
+    ]
+    tasks = group_tasks(groups) + [Task("ReduceA", priority=5, burst_time=6, dependencies=["MapA"])]
+
+    queues = create_priority_queues(tasks, None)
+    priority_based(queues, [10], task_quantum=4, reinsert=True)
+    report_groups(groups)
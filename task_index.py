@@ -0,0 +1,272 @@
+"""
+    Integer task IDs and bitset completion tracking.
+
+    Dependencies are given as lists of task names. Checking them against a set of completed
+    names hashes strings on every check, and the set only grows during a run.
+    The TaskIndex interns the names once, when the run starts:
+
+    - Every task gets a dense integer ID (`task.task_id`). Names that appear only as dependencies
+    (tasks that do not exist) get IDs as well; they are never completed.
+
+    - Dependencies are stored as integer arrays in CSR form (`dep_ptr`, `dep_idx`):
+    the dependencies of task i are `dep_idx[dep_ptr[i]:dep_ptr[i + 1]]`.
+
+    - Completion is tracked in a NumPy bool array indexed by task ID.
+
+    - The index also counts the unmet dependencies of each task, and the number of unfinished
+    tasks blocked on dependencies (`blocked_count`), updated in O(dependants) per completion,
+    so a dependency check reads one count, with no string hashing and no array indexing.
+
+    - Task groups (see task_groups.py) get an ID too. A group is completed when its last shard
+    completes, so depending on a group is a single dependency whatever the number of shards.
+
+    - `validate` checks, before the run, that every dependency can be met: it finds the names that
+    are not tasks and the dependency cycles in O(V + E) (Kahn's algorithm, then Tarjan's on what is left).
+    During the run, when a whole round of queue visits ran nothing, the schedulers check that a queued
+    task can still run (`any_runnable`), and stop otherwise (`report_stalled`), e.g., when a dependency
+    was cancelled, instead of revisiting blocked tasks forever.
+"""
+import itertools
+
+import numpy as np
+
+
+class TaskIndex:
+
+    def __init__(self, tasks):
+        """
+        Intern the names of the tasks and of their dependencies.
+
+        Args:
+            tasks (list): The tasks of the run. Tasks already marked as completed are recorded as such.
+        """
+        self.ids = {}  # name -> task ID
+        self.names = []
+        for task in tasks:
+            task.task_id = self._intern(task.name)
+
+        # Groups: group ID -> number of shards not completed yet
+        self.group_remaining = {}
+        self.group_shards = {}  # group ID -> task IDs of the shards
+        for task in tasks:
+            if task.group is None:
+                continue
+            if task.group.name in self.ids and self.ids[task.group.name] not in self.group_remaining:
+                raise ValueError(f"Group {task.group.name} has the same name as a task")
+            group_id = self._intern(task.group.name)
+            self.group_remaining[group_id] = self.group_remaining.get(group_id, 0) + (not task.completed)
+            self.group_shards.setdefault(group_id, []).append(task.task_id)
+        self.known_count = len(self.names)  # IDs from here on are names that only appear as dependencies
+
+        # Dependencies by task ID, as Python lists; the arrays are built once from them
+        rows = [[] for _ in self.names]
+        get = self.ids.get
+        for task in tasks:
+            deps = [get(dep) for dep in task.dependencies]
+            if None in deps:
+                deps = [self._intern(dep) for dep in task.dependencies]
+            rows[task.task_id] = deps
+        rows.extend([] for _ in range(len(self.names) - len(rows)))
+        lengths = np.array([len(deps) for deps in rows], dtype=np.int64)
+        self.dep_ptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        self.dep_ptr[1:] = np.cumsum(lengths)
+        self.dep_idx = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=int(self.dep_ptr[-1]))
+
+        self.completed = np.zeros(len(self.names), dtype=bool)
+        self.completed[[task.task_id for task in tasks]] = [task.completed for task in tasks]
+        for group_id, remaining in self.group_remaining.items():
+            self.completed[group_id] = remaining == 0
+
+        # Reverse dependencies (CSR too) and number of unmet dependencies of each task. Python lists:
+        # `can_run` reads one count, and `mark_completed` walks the dependants of one task
+        owners = np.repeat(np.arange(len(rows)), lengths)
+        dependant_ptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        dependant_ptr[1:] = np.cumsum(np.bincount(self.dep_idx, minlength=len(rows)))
+        self.dependant_ptr = dependant_ptr.tolist()
+        self.dependant_idx = owners[np.argsort(self.dep_idx, kind="stable")].tolist()
+        self.unmet = np.bincount(owners, weights=~self.completed[self.dep_idx],
+                                 minlength=len(rows)).astype(np.int64).tolist()
+        self.blocked_count = sum(1 for task in tasks if not task.completed and self.unmet[task.task_id] > 0)
+        self.cancelled = {task.task_id for task in tasks if task.cancelled}  # Never run, e.g., refused on admission
+
+    def _intern(self, name):
+        task_id = self.ids.get(name)
+        if task_id is None:
+            task_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return task_id
+
+    def can_run(self, task):
+        """
+        Determines if a task can be executed based on its dependencies.
+
+        O(1): `mark_completed` keeps the number of unmet dependencies of each task up to date.
+
+        Parameters:
+            task (Task): The task to be checked (interned by this index).
+
+        Returns:
+            bool: True if all dependencies of the task are completed, False otherwise.
+        """
+        return self.unmet[task.task_id] == 0
+
+    def mark_completed(self, task):
+        """
+        Record that a task has completed.
+
+        Parameters:
+            task (Task): The completed task (interned by this index).
+        """
+        task.completed = True
+        if self.completed[task.task_id]:
+            return
+        self._complete(task.task_id)
+        if task.group is not None:
+            group_id = self.ids[task.group.name]
+            self.group_remaining[group_id] -= 1
+            if self.group_remaining[group_id] == 0:
+                self._complete(group_id)
+
+    def _complete(self, task_id):
+        self.completed[task_id] = True
+        for dependant in self.dependant_idx[self.dependant_ptr[task_id]:self.dependant_ptr[task_id + 1]]:
+            self.unmet[dependant] -= 1
+            if self.unmet[dependant] == 0:
+                self.blocked_count -= 1
+
+    def any_runnable(self, queues, predicate=None):
+        """
+        Check whether a task waiting in the queues has all its dependencies completed. O(n).
+
+        Parameters:
+            queues (list): The scheduler queues (tasks interned by this index)
+            predicate (callable, optional): An extra condition for a task to run (e.g., it has tickets)
+
+        Returns:
+            bool: True if a queued task, not cancelled, can run.
+        """
+        return any(not task.cancelled and self.unmet[task.task_id] == 0 and (predicate is None or predicate(task))
+                   for queue in queues for task in queue)
+
+    def validate(self):
+        """
+        Check that every task can eventually run: no dependency on a name that is not a task
+        (or a group), and no dependency cycle. O(V + E). Tasks cancelled before the run are not checked.
+
+        Raises:
+            ValueError: Lists the missing names, the cycles, and the tasks that wait on them.
+        """
+        known = self.known_count
+        # Each task waits on its dependencies, each group on its shards
+        dep_ptr, dep_idx = self.dep_ptr.tolist(), self.dep_idx.tolist()
+        waits = [dep_idx[dep_ptr[i]:dep_ptr[i + 1]] for i in range(known)]
+        for group_id, shards in self.group_shards.items():
+            waits[group_id] = list(shards)
+        waiters = [[] for _ in range(known)]
+        pending = [0] * known
+        for i in range(known):
+            for dep in waits[i]:
+                if dep < known:
+                    waiters[dep].append(i)
+                pending[i] += not self.completed[dep]  # Missing names are never completed
+
+        # Kahn: resolve every node whose dependencies are all resolved
+        resolved = [bool(self.completed[i]) or pending[i] == 0 for i in range(known)]
+        ready = [i for i in range(known) if resolved[i]]
+        while ready:
+            node = ready.pop()
+            for waiter in waiters[node]:
+                if resolved[waiter]:
+                    continue
+                pending[waiter] -= 1
+                if pending[waiter] == 0:
+                    resolved[waiter] = True
+                    ready.append(waiter)
+        stuck = [i for i in range(known) if not resolved[i] and i not in self.cancelled]
+        if not stuck:
+            return
+
+        problems = []
+        missing = {}
+        for i in stuck:
+            for dep in waits[i]:
+                if dep >= known:
+                    missing.setdefault(self.names[dep], []).append(self.names[i])
+        for name, tasks in missing.items():
+            problems.append(f"{name} does not exist (needed by {', '.join(tasks)})")
+        in_cycle = set()
+        for component in _strongly_connected(stuck, waits, known):
+            if len(component) > 1 or component[0] in waits[component[0]]:
+                in_cycle.update(component)
+                problems.append("cycle between " + ", ".join(self.names[i] for i in sorted(component)))
+        downstream = [self.names[i] for i in stuck
+                      if i not in in_cycle and not any(dep >= known for dep in waits[i])]
+        if downstream:
+            problems.append(f"{len(downstream)} more tasks wait on them ({', '.join(downstream[:10])}"
+                            f"{', ...' if len(downstream) > 10 else ''})")
+        raise ValueError("Unsatisfiable dependencies: " + "; ".join(problems))
+
+    def completed_names(self):
+        """
+        Returns:
+            set: The names of the completed tasks (for reporting).
+        """
+        return {self.names[i] for i in np.flatnonzero(self.completed)}
+
+
+def _strongly_connected(nodes, waits, known):
+    # Tarjan's algorithm (iterative) on the subgraph of `nodes`: the list of its strongly connected components
+    inside = set(nodes)
+    order = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+    for root in nodes:
+        if root in order:
+            continue
+        work = [(root, iter(waits[root]))]
+        order[root] = low[root] = len(order)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, edges = work[-1]
+            for dep in edges:
+                if dep >= known or dep not in inside:
+                    continue
+                if dep not in order:
+                    order[dep] = low[dep] = len(order)
+                    stack.append(dep)
+                    on_stack.add(dep)
+                    work.append((dep, iter(waits[dep])))
+                    break
+                if dep in on_stack:
+                    low[node] = min(low[node], order[dep])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def report_stalled(queues):
+    """
+    Print the tasks left in the queues when a whole round of queue visits could run none of them.
+
+    Parameters:
+        queues (list): The scheduler queues
+    """
+    stalled = dict.fromkeys(task for queue in queues for task in queue if not task.cancelled)  # A task may be queued twice
+    names = [task.name for task in stalled]
+    print(f"No runnable task left: {len(names)} tasks wait on dependencies that cannot complete "
+          f"({', '.join(names[:10])}{', ...' if len(names) > 10 else ''})")
@@ -1,5 +1,6 @@
 from collections import deque
 import heapq
+import math
 
 
 class Task:
@@ -8,28 +9,70 @@ class Task:
         and dependencies. It also includes a method for comparing tasks based on their priority.
     """
 
-    def __init__(self, name, priority, burst_time, waiting_time=0, dependencies=None):
+    def __init__(self, name, priority, burst_time, waiting_time=0, dependencies=None, arrival_time=0, io_bursts=None,
+                 deadline=None):
         """
         Initialize a Task object.
 
         Args:
             name (str): The name of the task.
             priority (int): The priority of the task.
-            burst_time (int): The total time required by the task to complete.
+            burst_time (int): The total time required by the task to complete (its first CPU burst, if io_bursts is given).
             waiting_time (int, optional): The waiting time of the task. Defaults to 0.
             dependencies (list, optional): A list of task names that this task depends on. Defaults to an empty list.
+            arrival_time (int, optional): The (virtual) time at which the task is submitted. Defaults to 0.
+            io_bursts (list, optional): A list of (io_time, cpu_time) pairs. After each CPU burst, the task blocks
+                on I/O for io_time units and then needs cpu_time units of CPU. Defaults to an empty list (pure CPU).
+            deadline (int, optional): The (virtual) time by which the task should complete. Defaults to None (no deadline).
 
         Attributes:
             completed (bool): Indicator of whether the task is completed.
+            cancelled (bool): Indicator of whether the task was cancelled (or failed). Cancelled tasks
+                are dropped by the schedulers the next time they are popped from a queue.
+            failed (bool): Indicator of whether the task failed because one of its dependencies was cancelled.
+            completion_time (int): The (virtual) time at which the task completed, set by the schedulers.
+            group (TaskGroup): The group the task is a shard of, or None (see task_groups.py).
+            admitted_queue (int): The queue the task entered when it was submitted, or None. Its priority
+                may later belong to another queue (e.g., after SVR2 aging).
         """
 
         self.name = name
         self.priority = priority
         self.burst_time = burst_time  # Remaining burst time
-        self.total_burst_time = burst_time  # Store the original burst time
+        self.io_bursts = io_bursts or []
+        self.burst_index = 0  # Next entry of io_bursts
+        self.total_burst_time = burst_time + sum(cpu_time for _, cpu_time in self.io_bursts)  # Store the original (CPU) burst time
         self.waiting_time = waiting_time
         self.dependencies = dependencies or []  # List of task names this task depends on
+        self.arrival_time = arrival_time
+        self.deadline = deadline
         self.completed = False  # Track if the task is completed
+        self.cancelled = False  # Tombstone: the task is removed lazily from its queue
+        self.failed = False  # Set when a dependency of the task was cancelled
+        self.completion_time = None
+        self.group = None
+        self.admitted_queue = None
+
+    def has_pending_io(self):
+        """
+        Check if the task still has I/O bursts to perform.
+
+        Returns:
+            True if the task blocks on I/O when its current CPU burst finishes
+        """
+        return self.burst_index < len(self.io_bursts)
+
+    def start_io(self):
+        """
+        Start the next I/O burst. The remaining burst time becomes the length of the following CPU burst.
+
+        Returns:
+            The duration of the I/O burst
+        """
+        io_time, cpu_time = self.io_bursts[self.burst_index]
+        self.burst_index += 1
+        self.burst_time = cpu_time
+        return io_time
 
     def __lt__(self, other):
         """
@@ -42,16 +85,77 @@ class Task:
             True if this task has higher priority than the other task
         """
         # Higher priority tasks will come first in the priority queue
-        return self.priority > other.priority
+        if self.priority != other.priority:
+            return self.priority > other.priority
+        return group_order(self) < group_order(other)  # Keep the shards of a group together
+
+
+def group_order(task):
+    """
+    Tie-break key that keeps the shards of a group together, in the order the groups were submitted.
+
+    Parameters:
+        task: a Task object
+
+    Returns the submission order of the group of the task, or infinity if the task is not in a group.
+    """
+    return math.inf if task.group is None else task.group.order
+
+
+def find_queue(task: Task, priority_ranges: list[tuple[int, int]]) -> int | None:
+    """
+    Find the queue whose priority range contains the priority of the task.
+
+    Parameters:
+        task: a Task object
+        priority_ranges: list of tuples of (low, high) priority ranges
+
+    Returns the index of the first matching range, or None if the priority is outside every range.
+    """
+    for i, (low, high) in enumerate(priority_ranges):
+        if low <= task.priority <= high:
+            return i
+    return None
+
+
+def enqueue(queue, task: Task):
+    """
+    Add a task to a queue created by `create_queues` (deque) or `create_priority_queues` (heap).
+
+    Parameters:
+        queue: a deque or a heap (list) of Task objects
+        task: the Task object to add
+    """
+    if isinstance(queue, deque):
+        queue.append(task)
+    elif hasattr(queue, "push"):  # AgingQueue (see aging_index.py)
+        queue.push(task)
+    else:
+        heapq.heappush(queue, task)
+
+
+def dequeue(queue) -> Task:
+    """
+    Remove and return the first task of a queue created by `create_queues` (deque) or `create_priority_queues` (heap).
+
+    Parameters:
+        queue: a deque or a heap (list) of Task objects
+    """
+    if isinstance(queue, deque):
+        return queue.popleft()
+    if isinstance(queue, list):
+        return heapq.heappop(queue)
+    return queue.pop()  # AgingQueue (see aging_index.py)
 
 
-def create_queues(tasks: list[Task], priority_ranges: list[tuple[int, int]]) -> list[list[Task]]:
+def create_queues(tasks: list[Task], priority_ranges: list[tuple[int, int]], admission=None) -> list[list[Task]]:
     """
     Create a list of queues based on the given tasks and priority ranges.
 
     Parameters:
         tasks: list of Task objects
         priority_ranges: list of tuples of (low, high) priority ranges
+        admission: optional AdmissionControl (see admission.py) that bounds the queues
 
     Returns a list of deques (queues) where each queue contains tasks with priorities
     within the corresponding range in priority_ranges. The tasks are added in the order
@@ -63,21 +167,25 @@ def create_queues(tasks: list[Task], priority_ranges: list[tuple[int, int]]) ->
         priority_ranges = [[min(priorities), max(priorities)]]
     queues = [deque() for _ in range(len(priority_ranges))]
     for task in tasks:
-        for i, (low, high) in enumerate(priority_ranges):
-            if low <= task.priority <= high:
-                queues[i].append(task)
-                break
+        if admission is not None:
+            admission.submit(queues, task)
+            continue
+        i = find_queue(task, priority_ranges)
+        if i is not None:
+            task.admitted_queue = i
+            queues[i].append(task)
     return queues
 
 
 
-def create_priority_queues(tasks: list[Task], priority_ranges: list[tuple[int, int]]) -> list[list[Task]]:
+def create_priority_queues(tasks: list[Task], priority_ranges: list[tuple[int, int]], admission=None) -> list[list[Task]]:
     """
     Create a list of priority queues based on the given tasks and priority ranges.
 
     Parameters:
         tasks: list of Task objects. The Task must implement the __lt__ method for comparison.
         priority_ranges: list of tuples of (low, high) priority ranges
+        admission: optional AdmissionControl (see admission.py) that bounds the queues
 
     Returns a list of **priority queues** where each queue contains tasks with priorities
     within the corresponding range in priority_ranges. The tasks are added in the order
@@ -89,8 +197,11 @@ def create_priority_queues(tasks: list[Task], priority_ranges: list[tuple[int, i
         priority_ranges = [[min(priorities), max(priorities)]]
     queues = [[] for _ in range(len(priority_ranges))]
     for task in tasks:
-        for i, (low, high) in enumerate(priority_ranges):
-            if low <= task.priority <= high:
-                heapq.heappush(queues[i], task)
-                break
+        if admission is not None:
+            admission.submit(queues, task)
+            continue
+        i = find_queue(task, priority_ranges)
+        if i is not None:
+            task.admitted_queue = i
+            heapq.heappush(queues[i], task)
     return queues
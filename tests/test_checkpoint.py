@@ -0,0 +1,60 @@
+import pytest
+
+from checkpoint import Checkpointer
+from checkpoint import SchedulerState
+from metrics import latency_histograms
+from shared_workload import SharedWorkload
+from svr2_mlfq import TaskSrv2
+from tasks import Task
+from tasks import create_priority_queues
+from tasks import create_queues
+
+PRIORITY_RANGES = [(1, 3), (4, 6), (7, 10)]
+
+
+def make_queues():
+    tasks = [TaskSrv2(f"Task{i}", priority=1 + i % 10, burst_time=3 + i % 7) for i in range(20)]
+    return create_priority_queues(tasks, PRIORITY_RANGES)
+
+
+def run_and_count(state):
+    from svr2_mlfq import svr2_multilevel_feedback_queue
+
+    svr2_multilevel_feedback_queue(state.queues, [6, 8, 10], 4, 5, 1, priority_ranges=PRIORITY_RANGES)
+    histograms = latency_histograms(state.tasks, PRIORITY_RANGES)
+    return [histogram.count for histogram in histograms["turnaround"]]
+
+
+def test_admitted_queue_survives_a_checkpoint():
+    state = SchedulerState(make_queues())
+    restored = SchedulerState.from_arrays(state.to_arrays())
+    assert [task.admitted_queue for task in restored.tasks] == [task.admitted_queue for task in state.tasks]
+    assert run_and_count(restored) == run_and_count(state)
+
+
+def test_checkpoint_without_admitted_queue_column():
+    arrays = SchedulerState(make_queues()).to_arrays()
+    del arrays["admitted_queue"]  # Written before the column existed
+    state = SchedulerState.from_arrays(arrays)
+    assert all(task.admitted_queue is None for task in state.tasks)
+    assert sum(run_and_count(state)) == len(state.tasks)
+
+
+def test_percentiles_of_a_shared_workload():
+    with SharedWorkload.create(make_queues()) as workload:
+        state = workload.restore()
+        assert sum(run_and_count(state)) == len(state.tasks)
+
+
+@pytest.mark.parametrize("task", [Task("Late", 5, 4, arrival_time=50), Task("Reader", 5, 2, io_bursts=[(30, 2)])])
+def test_checkpoint_refuses_tasks_outside_the_queues(task, tmp_path):
+    from io_bursts import BlockedSet
+    from multilevel_feedback_queue import multilevel_feedback_queue
+    from timer_wheel import schedule_arrivals
+
+    tasks = [Task("Task1", 5, 10), task]
+    queues = create_queues([], PRIORITY_RANGES)
+    arrivals = schedule_arrivals(tasks, PRIORITY_RANGES)
+    with pytest.raises(ValueError, match="not saved"):
+        multilevel_feedback_queue(queues, [6, 8, 10], 4, arrivals=arrivals, blocked=BlockedSet(),
+                                  checkpointer=Checkpointer(str(tmp_path / "run.npz"), every=1))
@@ -0,0 +1,28 @@
+import socket
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+import pytest
+
+from distributed import Coordinator
+from distributed import run_worker
+
+CONFIGS = [["fifo"], ["rr"], ["mlfq", "--quanta", "6,8,10"]]
+
+
+def test_bad_key_does_not_stop_the_sweep():
+    coordinator = Coordinator(CONFIGS, shard_size=1)
+    results = []
+    runner = threading.Thread(target=lambda: results.extend(coordinator.run()), daemon=True)
+    runner.start()
+
+    with pytest.raises(AuthenticationError):
+        Client(coordinator.address, authkey=b"wrong key")
+    socket.create_connection(coordinator.address).close()  # Leaves in the middle of the handshake
+    with socket.create_connection(coordinator.address):  # Never answers the challenge
+        assert run_worker(coordinator.address, coordinator.authkey) == len(CONFIGS)
+    runner.join(timeout=10)
+    assert not runner.is_alive()
+    assert [result["config"] for result in results] == CONFIGS
+    assert all("summary" in result for result in results)
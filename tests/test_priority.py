@@ -0,0 +1,24 @@
+import re
+
+import pytest
+
+from priority_based import priority_based
+from priority_with_dependencies import priority_based as priority_with_dependencies
+from tasks import Task
+from tasks import create_priority_queues
+
+PRIORITY_RANGES = [(1, 3), (4, 6), (7, 10)]
+
+
+@pytest.mark.parametrize("scheduler", [priority_based, priority_with_dependencies])
+@pytest.mark.parametrize("reinsert", [True, False])
+def test_each_task_completes_once(scheduler, reinsert, capsys):
+    tasks = [Task("Task1", 2, 10), Task("Task2", 5, 15), Task("Task3", 8, 7), Task("Task4", 4, 12),
+             Task("Task5", 6, 6)]
+    scheduler(create_priority_queues(tasks, PRIORITY_RANGES), [6, 8, 10], 4, reinsert)
+    trace = capsys.readouterr().out
+    completed = re.findall(r"Task (\w+) completed", trace)
+    assert sorted(completed) == sorted(task.name for task in tasks)
+    assert " executed for 0 units" not in trace
+    assert all(task.completed for task in tasks)
+    assert max(task.completion_time for task in tasks) == sum(task.total_burst_time for task in tasks)
@@ -0,0 +1,10 @@
+from result_cache import code_version
+
+
+def test_any_module_changes_the_code_version(tmp_path):
+    (tmp_path / "scheduler.py").write_text("QUANTUM = 4\n")
+    (tmp_path / "fast_path.py").write_text("MIN_TASKS = 2048\n")
+    before = code_version(str(tmp_path))
+    (tmp_path / "fast_path.py").write_text("MIN_TASKS = 1024\n")
+    code_version.cache_clear()
+    assert code_version(str(tmp_path)) != before
@@ -0,0 +1,38 @@
+import pytest
+
+from task_groups import TaskGroup
+from task_index import TaskIndex
+from tasks import Task
+
+
+def test_can_run_follows_completions():
+    a = Task("A", 1, 1)
+    b = Task("B", 1, 1, dependencies=["A"])
+    c = Task("C", 1, 1, dependencies=["A", "B"])
+    index = TaskIndex([c, b, a])
+    assert [index.can_run(task) for task in (a, b, c)] == [True, False, False]
+    assert index.blocked_count == 2
+    index.mark_completed(a)
+    assert [index.can_run(task) for task in (b, c)] == [True, False]
+    index.mark_completed(b)
+    assert index.can_run(c)
+    assert index.blocked_count == 0
+
+
+def test_group_dependency_waits_for_every_shard():
+    shards = [Task(f"G[{i}]", 1, 1) for i in range(3)]
+    TaskGroup.from_tasks("G", shards)
+    after = Task("After", 1, 1, dependencies=["G"])
+    index = TaskIndex(shards + [after])
+    for shard in shards:
+        assert not index.can_run(after)
+        index.mark_completed(shard)
+    assert index.can_run(after)
+
+
+def test_missing_dependency_never_runs():
+    task = Task("A", 1, 1, dependencies=["Nope"])
+    index = TaskIndex([task])
+    assert not index.can_run(task)
+    with pytest.raises(ValueError, match="Nope does not exist"):
+        index.validate()
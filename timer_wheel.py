@@ -0,0 +1,280 @@
+"""
+    Hierarchical timer wheel for future arrivals and sleeping tasks.
+
+    Tasks that have not arrived yet (or that sleep until a given time) are kept out of the
+    scheduler queues until they are due. A single binary heap costs O(log n) per event;
+    the timer wheel inserts in O(1) and releases due tasks in amortized O(1).
+
+    - The wheel has `levels` levels of 2**bits slots each. Level 0 has one slot per time unit,
+    level 1 one slot per 2**bits time units, and so on. A task is placed at the lowest level
+    whose window (the time units that share the higher bits with the current time) contains its due time.
+
+    - When the current time crosses the boundary of a level, the slot of the next level is "cascaded":
+    its tasks are re-inserted, moving down towards level 0.
+    Tasks beyond the range of the top level wait in an overflow list.
+
+    - Empty stretches of time are skipped a whole level-0 rotation at a time,
+    so advancing the clock over long idle periods is cheap.
+
+    - Due tasks are released into the structures built by `create_queues` (deques) or
+    `create_priority_queues` (heaps), according to their priority and `priority_ranges`,
+    or submitted to an AdmissionControl (see admission.py) when the queues are bounded.
+"""
+from tasks import Task
+from tasks import create_queues
+from tasks import enqueue
+from tasks import find_queue
+
+
+class TimerWheel:
+
+    def __init__(self, priority_ranges, start_time=0, bits=6, levels=4, admission=None):
+        """
+        Initialize an empty timer wheel.
+
+        Args:
+            priority_ranges (list): list of tuples of (low, high) priority ranges, used to route released tasks
+            start_time (int, optional): The current (virtual) time. Defaults to 0.
+            bits (int, optional): log2 of the number of slots per level. Defaults to 6 (64 slots).
+            levels (int, optional): The number of levels. Defaults to 4, i.e., 2**24 time units ahead.
+            admission (AdmissionControl, optional): Admits the released tasks into bounded queues.
+                Defaults to None (every task enters its queue).
+        """
+        self.priority_ranges = priority_ranges
+        self.admission = admission
+        self.current = start_time
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.levels = levels
+        self.slots = [[[] for _ in range(1 << bits)] for _ in range(levels)]
+        self.level_counts = [0] * levels
+        self.overflow = []  # (due_time, task) beyond the range of the top level
+        self.ready = []  # tasks already due, waiting to be released
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        # Every task held by the wheel, in no particular order
+        yield from self.ready
+        for level in self.slots:
+            for slot in level:
+                for _, task in slot:
+                    yield task
+        for _, task in self.overflow:
+            yield task
+
+    def insert(self, task, due_time):
+        """
+        Add a task that becomes ready at `due_time`. O(1).
+
+        Parameters:
+            task (Task): The task to hold
+            due_time (int): The (virtual) time at which the task is released
+        """
+        self.count += 1
+        self._place(task, due_time)
+
+    def sleep(self, task, until):
+        """
+        Put a task to sleep until the given time (an alias of insert).
+
+        Parameters:
+            task (Task): The sleeping task
+            until (int): The (virtual) time at which the task wakes up
+        """
+        self.insert(task, until)
+
+    def _place(self, task, due_time):
+        if due_time <= self.current:
+            self.ready.append(task)
+            return
+        for level in range(self.levels):
+            shift = self.bits * (level + 1)
+            if (due_time >> shift) == (self.current >> shift):
+                index = (due_time >> (self.bits * level)) & self.mask
+                self.slots[level][index].append((due_time, task))
+                self.level_counts[level] += 1
+                return
+        self.overflow.append((due_time, task))
+
+    def _cascade(self):
+        # Re-insert the slots of the levels whose boundary was just crossed, top level first
+        if self.current & ((1 << (self.bits * self.levels)) - 1) == 0:
+            pending, self.overflow = self.overflow, []
+            for due_time, task in pending:
+                self._place(task, due_time)
+        for level in range(self.levels - 1, 0, -1):
+            if self.current & ((1 << (self.bits * level)) - 1) == 0:
+                index = (self.current >> (self.bits * level)) & self.mask
+                pending, self.slots[level][index] = self.slots[level][index], []
+                self.level_counts[level] -= len(pending)
+                for due_time, task in pending:
+                    self._place(task, due_time)
+
+    def _step(self, limit):
+        # Move the current time forward by one tick, or by a whole level-0 rotation if level 0 is empty
+        if self.count == len(self.ready):
+            self.current = limit  # Nothing else is pending
+            return
+        if self.level_counts[0] == 0:
+            self.current = min(limit, (self.current | self.mask) + 1)
+        else:
+            self.current += 1
+        if self.current & self.mask == 0:
+            self._cascade()
+        slot = self.slots[0][self.current & self.mask]
+        if slot:
+            self.level_counts[0] -= len(slot)
+            self.ready.extend(task for _, task in slot)
+            slot.clear()
+
+    def advance(self, now):
+        """
+        Advance the wheel to time `now` and return the tasks that are due.
+
+        Parameters:
+            now (int): The current (virtual) time
+
+        Returns:
+            list: The tasks due at or before `now`, in due order (ties in insertion order).
+        """
+        while self.current < now:
+            self._step(now)
+        due, self.ready = self.ready, []
+        self.count -= len(due)
+        return due
+
+    def advance_to_next(self):
+        """
+        Advance the wheel to the time of the next due task, e.g., when the scheduler is idle.
+
+        Returns:
+            tuple: The new current time and the list of due tasks.
+        """
+        while self.count and not self.ready:
+            self._step(self.current + (1 << (self.bits * self.levels)))
+        return self.current, self.advance(self.current)
+
+    def release(self, now, queues):
+        """
+        Move the tasks that are due at `now` into the scheduler queues.
+
+        Deques (from `create_queues`) get the task appended, heaps (from `create_priority_queues`)
+        get it pushed. Tasks whose priority is outside every range are dropped, like `create_queues` does.
+
+        Parameters:
+            now (int): The current (virtual) time
+            queues (list): The scheduler queues
+
+        Returns:
+            int: The number of released tasks.
+        """
+        due = self.advance(now)
+        for task in due:
+            self._route(queues, task)
+        return len(due)
+
+    def release_next(self, queues):
+        """
+        Idle until the next task is due and release it (and every task due at the same time).
+
+        Parameters:
+            queues (list): The scheduler queues
+
+        Returns:
+            int: The new current time.
+        """
+        now, due = self.advance_to_next()
+        for task in due:
+            self._route(queues, task)
+        return now
+
+    def next_due(self):
+        """
+        Return the time of the next due task without advancing the wheel, or None if the wheel is empty.
+
+        Items at a lower level are always due before the items at a higher level,
+        so only the first non-empty slot has to be inspected.
+        """
+        if self.ready:
+            return self.current
+        for level in range(self.levels):
+            if self.level_counts[level] == 0:
+                continue
+            index = (self.current >> (self.bits * level)) & self.mask
+            for slot in self.slots[level][index + 1:]:
+                if slot:
+                    return min(due_time for due_time, _ in slot)
+        if self.overflow:
+            return min(due_time for due_time, _ in self.overflow)
+        return None
+
+    def _route(self, queues, task):
+        # Released tasks go to the queue whose priority range contains them
+        if self.admission is not None:
+            self.admission.submit(queues, task)
+            return
+        i = find_queue(task, self.priority_ranges)
+        if i is not None:
+            task.admitted_queue = i
+            enqueue(queues[i], task)
+
+
+def schedule_arrivals(tasks, priority_ranges, start_time=0, admission=None):
+    """
+    Create a timer wheel holding the tasks until their `arrival_time`.
+
+    Parameters:
+        tasks: list of Task objects
+        priority_ranges: list of tuples of (low, high) priority ranges
+        admission: optional AdmissionControl that admits the tasks into bounded queues when they arrive
+
+    Returns:
+        TimerWheel: the wheel with every task inserted at its arrival time.
+    """
+    wheel = TimerWheel(priority_ranges, start_time=start_time, admission=admission)
+    for task in tasks:
+        wheel.insert(task, task.arrival_time)
+    return wheel
+
+
+def wait_for_next(clock, queues, *wheels):
+    """
+    Idle until the earliest due task among the wheels and release every task due at that time.
+
+    Parameters:
+        clock (int): The current (virtual) time
+        queues (list): The scheduler queues
+        wheels (TimerWheel): The wheels to wait on; None or empty wheels are ignored
+
+    Returns:
+        int: The new current time.
+    """
+    wheels = [wheel for wheel in wheels if wheel]
+    now = max(clock, min(wheel.next_due() for wheel in wheels))
+    for wheel in wheels:
+        wheel.release(now, queues)
+    return now
+
+
+if __name__ == "__main__":
+    from multi_queue_round_robin import multi_queue_round_robin_scheduler
+
+    # Example: the tasks of multi_queue_round_robin.py arriving over time
+    tasks = [
+        Task("Task1", priority=2, burst_time=10),
+        Task("Task2", priority=5, burst_time=15, arrival_time=3),
+        Task("Task3", priority=8, burst_time=7, arrival_time=12),
+        Task("Task4", priority=4, burst_time=12, arrival_time=100),
+        Task("Task5", priority=6, burst_time=6, arrival_time=100)
+    ]
+
+    priority_ranges = [(1, 3), (4, 6), (7, 10)]
+
+    # Queues start empty, tasks are released by the wheel when they arrive
+    queues = create_queues([], priority_ranges)
+    arrivals = schedule_arrivals(tasks, priority_ranges)
+
+    multi_queue_round_robin_scheduler(queues, [6, 8, 10], 4, arrivals=arrivals)